@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from constraints import load_constraints
+from engine import DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK
+from roster_io import import_roster
+from schedule_export import EXPORT_FORMATS, ScheduleSnapshot, export_schedule
+from scoring import score_schedule
+from solvers import SOLVER_MODES, solve_in_worker
+
+ROSTER_EXTENSIONS = (".csv", ".jsonl", ".ndjson", ".json")
+SUMMARY_FILE_NAME = "summary.json"
+
+
+def find_roster_files(paths):
+    """
+    Expands files and directories into a sorted, de-duplicated list of roster files.
+    Directories contribute the roster files directly inside them.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(entry.path for entry in os.scandir(path)
+                         if entry.is_file() and os.path.splitext(entry.name)[1].lower() in ROSTER_EXTENSIONS)
+        else:
+            files.append(path)
+    return sorted(dict.fromkeys(os.path.abspath(path) for path in files))
+
+
+def output_path(roster_path, output_dir, export_format):
+    """Returns where the schedule of a roster file is written: <output_dir>/<roster name><format extension>."""
+    stem = os.path.splitext(os.path.basename(roster_path))[0]
+    return os.path.join(output_dir, stem + EXPORT_FORMATS[export_format][1])
+
+
+def schedule_roster_file(roster_path, output_dir, mode="greedy", export_format="summary csv",
+                         max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                         max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, seed=None, constraints=None):
+    """
+    Imports one roster file, schedules it and writes the schedule. Returns a summary record;
+    a file that cannot be read or scheduled yields a record with an "error" instead of raising,
+    so one bad roster does not stop the batch.
+    With a seed, each file's randomness is derived from the seed and the file name.
+    """
+    started = time.perf_counter()
+    record = {"roster": roster_path, "mode": mode}
+    try:
+        result = import_roster(roster_path)
+        if not result.employees:
+            raise ValueError(f"No valid employees ({result.error_count} rows rejected). {result.error_summary(3)}".strip())
+        roster = result.to_roster()
+        rng = random.Random(f"{seed}/{os.path.basename(roster_path)}") if seed is not None else None
+        schedule = solve_in_worker(roster, mode, max_employees_per_shift, max_workdays_per_week, rng=rng,
+                                   constraints=constraints)
+        path = output_path(roster_path, output_dir, export_format)
+        export_schedule(ScheduleSnapshot(schedule), path, export_format)
+    except (OSError, ValueError) as e:
+        record.update({"error": str(e), "seconds": time.perf_counter() - started})
+        return record
+
+    record.update({
+        "output": path,
+        "employees": len(result.employees),
+        "rejected_rows": result.error_count,
+        "seed": schedule.seed,
+        "seconds": time.perf_counter() - started,
+    })
+    record.update(score_schedule(schedule))
+    record.update({key: schedule.metrics.details[key] for key in ("understaffed_shifts", "shifts_missing_skill")
+                   if key in schedule.metrics.details})
+    return record
+
+
+def run_batch(roster_paths, output_dir, mode="greedy", export_format="summary csv",
+              max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+              max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, seed=None, max_workers=None, progress=None,
+              constraints=None):
+    """
+    Schedules every roster file across a process pool and returns the summary records in
+    input order. progress, if given, is called with each record as its roster finishes.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(roster_paths), 1))
+    arguments = (output_dir, mode, export_format, max_employees_per_shift, max_workdays_per_week, seed, constraints)
+
+    records = []
+    if max_workers <= 1:
+        for path in roster_paths:
+            records.append(schedule_roster_file(path, *arguments))
+            if progress:
+                progress(records[-1])
+        return records
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(schedule_roster_file, path, *arguments) for path in roster_paths]
+        for future in futures:
+            records.append(future.result())
+            if progress:
+                progress(records[-1])
+    return records
+
+
+def _print_record(record):
+    name = os.path.basename(record["roster"])
+    if "error" in record:
+        print(f"{name:>30}: FAILED {record['error']}")
+        return
+    print(f"{name:>30}: {record['employees']:>7} employees  coverage {record['coverage']:.2f}  "
+          f"cost {record['preference_cost']}  unresolved {record['unresolved']}  "
+          f"rejected rows {record['rejected_rows']}  {record['seconds'] * 1000:.0f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Schedule many roster files headlessly. Each CSV, JSON Lines or JSON roster is scheduled "
+                    "in a process pool, its schedule is written to the output directory, and a summary of all "
+                    "runs is written to summary.json. Exits with status 1 if any roster failed.")
+    parser.add_argument("paths", nargs="+", help="Roster files, or directories of roster files.")
+    parser.add_argument("-o", "--output-dir", default="schedules")
+    parser.add_argument("--mode", choices=list(SOLVER_MODES), default="greedy")
+    parser.add_argument("--format", dest="export_format", choices=list(EXPORT_FORMATS), default="summary csv")
+    parser.add_argument("--max-employees-per-shift", type=int, default=DEFAULT_MAX_EMPLOYEES_PER_SHIFT)
+    parser.add_argument("--max-workdays-per-week", type=int, default=DEFAULT_MAX_WORKDAYS_PER_WEEK)
+    parser.add_argument("--seed", type=int, default=None, help="Makes every run reproducible.")
+    parser.add_argument("--constraints", default=None,
+                        help="JSON file with a list of scheduling rules applied to every roster.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU).")
+
+    args = parser.parse_args(argv)
+    try:
+        constraints = load_constraints(args.constraints) if args.constraints else None
+    except (OSError, ValueError) as e:
+        print(f"Cannot read constraints: {e}")
+        return 1
+    roster_paths = find_roster_files(args.paths)
+    if not roster_paths:
+        print("No roster files found.")
+        return 1
+
+    started = time.perf_counter()
+    records = run_batch(roster_paths, args.output_dir, args.mode, args.export_format,
+                        args.max_employees_per_shift, args.max_workdays_per_week, args.seed, args.workers,
+                        progress=_print_record, constraints=constraints)
+    failed = sum("error" in record for record in records)
+    summary = {
+        "mode": args.mode,
+        "format": args.export_format,
+        "max_employees_per_shift": args.max_employees_per_shift,
+        "max_workdays_per_week": args.max_workdays_per_week,
+        "seed": args.seed,
+        "constraints": constraints.to_records() if constraints else None,
+        "rosters": len(records),
+        "failed": failed,
+        "seconds": time.perf_counter() - started,
+        "results": records,
+    }
+    summary_path = os.path.join(args.output_dir, SUMMARY_FILE_NAME)
+    with open(summary_path, "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+    print(f"Scheduled {len(records) - failed} of {len(records)} rosters; summary written to {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from engine import DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK, Roster
+from schedule_config import DAYS, SHIFTS
+from scoring import score_schedule
+from solvers import SOLVER_MODES, solve
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_TIME_THRESHOLD = 0.10 # Relative slowdown that counts as a regression
+MIN_TIME_DIFFERENCE = 0.002 # Seconds; smaller slowdowns are treated as noise
+
+
+def _uniform_prefs(rng, size):
+    """Every priority equally likely for every slot."""
+    return rng.integers(1, 4, (size, len(DAYS), len(SHIFTS)))
+
+
+def _skewed_prefs(rng, size):
+    """Some slots are much more popular than others (weekday mornings over weekend evenings)."""
+    popularity = np.linspace(0.8, 0.1, len(DAYS) * len(SHIFTS)).reshape(len(DAYS), len(SHIFTS))
+    draws = rng.random((size, len(DAYS), len(SHIFTS)))
+    return np.where(draws < popularity, 1, np.where(draws < popularity + (1 - popularity) / 2, 2, 3))
+
+
+def _monday_morning_prefs(rng, size):
+    """Everyone wants Monday morning; everything else is second or third choice."""
+    prefs = rng.integers(2, 4, (size, len(DAYS), len(SHIFTS)))
+    prefs[:, 0, 0] = 1
+    return prefs
+
+
+DISTRIBUTIONS = {
+    "uniform": _uniform_prefs,
+    "skewed": _skewed_prefs,
+    "monday_morning": _monday_morning_prefs,
+}
+
+
+def synthetic_roster(size, distribution="uniform", seed=0):
+    """Builds a reproducible synthetic roster of the given size and preference distribution."""
+    rng = np.random.default_rng(seed)
+    prefs = DISTRIBUTIONS[distribution](rng, size).astype(np.int8)
+    return Roster([f"Employee {i:06d}" for i in range(size)], prefs)
+
+
+def benchmark_case(size, distribution, mode, seed=0, repeat=3,
+                   max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                   max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK):
+    """
+    Times one (size, distribution, mode) case. Wall and phase times are medians over repeat
+    runs; peak memory comes from one extra run under tracemalloc, so tracing does not
+    distort the timings.
+    """
+    roster = synthetic_roster(size, distribution, seed)
+    wall_times, phase_times = [], {}
+    for run in range(repeat):
+        started = time.perf_counter()
+        schedule = solve(roster, mode, max_employees_per_shift, max_workdays_per_week,
+                         rng=random.Random(f"{seed}/{run}")) # Fresh but reproducible randomness per run
+        wall_times.append(time.perf_counter() - started)
+        for phase, seconds in schedule.phase_times.items():
+            phase_times.setdefault(phase, []).append(seconds)
+
+    tracemalloc.start()
+    try:
+        solve(roster, mode, max_employees_per_shift, max_workdays_per_week, rng=random.Random(seed))
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "size": size,
+        "distribution": distribution,
+        "mode": mode,
+        "seed": seed,
+        "repeat": repeat,
+        "wall_time": statistics.median(wall_times),
+        "phase_times": {phase: statistics.median(times) for phase, times in phase_times.items()},
+        "peak_memory_bytes": peak_memory,
+        "quality": score_schedule(schedule),
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, distributions=tuple(DISTRIBUTIONS), modes=("greedy",), seed=0, repeat=3,
+                   progress=None):
+    """Runs every combination of sizes, distributions and modes and returns the result record."""
+    results = []
+    for mode in modes:
+        for distribution in distributions:
+            for size in sizes:
+                result = benchmark_case(size, distribution, mode, seed, repeat)
+                results.append(result)
+                if progress:
+                    progress(result)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_TIME_THRESHOLD):
+    """
+    Returns a list of regression messages between two result records. A case regresses if it
+    got more than threshold slower (and by more than MIN_TIME_DIFFERENCE), covers fewer
+    slots, or has a higher preference cost.
+    """
+    def case_key(result):
+        return result["size"], result["distribution"], result["mode"]
+
+    baseline_cases = {case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        key = case_key(result)
+        old = baseline_cases.get(key)
+        if old is None:
+            continue
+        label = f"{key[2]}/{key[1]}/{key[0]}"
+        slowdown = result["wall_time"] - old["wall_time"]
+        if slowdown > MIN_TIME_DIFFERENCE and result["wall_time"] > old["wall_time"] * (1 + threshold):
+            regressions.append(f"{label}: wall time {old['wall_time']:.4f}s -> {result['wall_time']:.4f}s "
+                               f"(+{slowdown / old['wall_time']:.0%})")
+        if result["quality"]["coverage"] < old["quality"]["coverage"]:
+            regressions.append(f"{label}: coverage {old['quality']['coverage']:.3f} -> "
+                               f"{result['quality']['coverage']:.3f}")
+        if result["quality"]["preference_cost"] > old["quality"]["preference_cost"]:
+            regressions.append(f"{label}: preference cost {old['quality']['preference_cost']} -> "
+                               f"{result['quality']['preference_cost']}")
+    return regressions
+
+
+def _print_result(result):
+    phases = ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in result["phase_times"].items())
+    print(f"{result['mode']:>10} {result['distribution']:>15} {result['size']:>7}: "
+          f"{result['wall_time'] * 1000:9.1f}ms  peak {result['peak_memory_bytes'] / 1e6:7.1f}MB  "
+          f"coverage {result['quality']['coverage']:.2f}  cost {result['quality']['preference_cost']}  [{phases}]")
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the employee shift scheduler. 'run' schedules seeded synthetic rosters "
+                    "headlessly and records wall time, per-phase time, peak memory and schedule quality; "
+                    "'compare' flags regressions between two results files and exits with status 1 if any.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write a results file.")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS), default=list(DISTRIBUTIONS))
+    run_parser.add_argument("--modes", nargs="+", choices=list(SOLVER_MODES), default=["greedy"])
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=_positive_int, default=3, help="Runs per case; the median is kept.")
+    run_parser.add_argument("--output", default="bench_results.json")
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two results files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_TIME_THRESHOLD,
+                                help="Relative slowdown that counts as a regression (default: %(default)s).")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        record = run_benchmarks(args.sizes, args.distributions, args.modes, args.seed, args.repeat,
+                                progress=_print_result)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=2)
+        print(f"Results written to {args.output}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(args.current, encoding="utf-8") as file:
+        current = json.load(file)
+    regressions = compare_results(baseline, current, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions found.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+import json
+
+import numpy as np
+
+
+def _check_text(value, what):
+    if not isinstance(value, str):
+        raise ValueError(f"{what} must be a string, got {value!r}.")
+
+
+def _check_texts(values, what, optional=True):
+    if values is None and optional:
+        return
+    if not isinstance(values, list):
+        raise ValueError(f"{what} must be a list of strings{' or null' if optional else ''}, got {values!r}.")
+    for value in values:
+        _check_text(value, f"Each of {what}")
+
+
+def _check_integer(value, what, minimum=0):
+    # JSON true/false decode to bool, which is an int subclass
+    if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+        raise ValueError(f"{what} must be an integer of at least {minimum}, got {value!r}.")
+
+
+class RestRule:
+    """No `after` shift on the day following a `before` shift (by default: no Evening, then Morning)."""
+    kind = "rest"
+
+    def __init__(self, before="Evening", after="Morning"):
+        _check_text(before, "before")
+        _check_text(after, "after")
+        self.before = before
+        self.after = after
+
+    def to_record(self):
+        return {"rule": self.kind, "before": self.before, "after": self.after}
+
+
+class MaxConsecutiveDays:
+    """At most `limit` workdays in a row."""
+    kind = "max_consecutive_days"
+
+    def __init__(self, limit):
+        _check_integer(limit, "limit", minimum=1)
+        self.limit = limit
+
+    def to_record(self):
+        return {"rule": self.kind, "limit": self.limit}
+
+
+class MinStaffing:
+    """
+    At least `minimum` employees on each matching shift; days and shifts default to all.
+    Checked when the schedule is complete, and understaffed shifts are filled first in phase 3.
+    """
+    kind = "min_staffing"
+
+    def __init__(self, minimum, shifts=None, days=None):
+        _check_integer(minimum, "minimum")
+        _check_texts(shifts, "shifts")
+        _check_texts(days, "days")
+        self.minimum = minimum
+        self.shifts = shifts
+        self.days = days
+
+    def to_record(self):
+        return {"rule": self.kind, "minimum": self.minimum, "shifts": self.shifts, "days": self.days}
+
+
+class RequiredSkill:
+    """
+    At least `count` of the named holders of `skill` on each matching shift. Other employees may
+    fill a shift only while enough room is left for the holders it still needs.
+    """
+    kind = "required_skill"
+
+    def __init__(self, skill, holders, count=1, shifts=None, days=None):
+        _check_text(skill, "skill")
+        _check_texts(holders, "holders", optional=False)
+        _check_integer(count, "count")
+        _check_texts(shifts, "shifts")
+        _check_texts(days, "days")
+        self.skill = skill
+        self.holders = sorted(holders)
+        self.count = count
+        self.shifts = shifts
+        self.days = days
+
+    def to_record(self):
+        return {"rule": self.kind, "skill": self.skill, "holders": self.holders, "count": self.count,
+                "shifts": self.shifts, "days": self.days}
+
+
+class Unavailable:
+    """Employee `name` cannot work on `day`, either at all or only on `shift`."""
+    kind = "unavailable"
+
+    def __init__(self, name, day, shift=None):
+        _check_text(name, "name")
+        _check_text(day, "day")
+        if shift is not None:
+            _check_text(shift, "shift")
+        self.name = name
+        self.day = day
+        self.shift = shift
+
+    def to_record(self):
+        return {"rule": self.kind, "name": self.name, "day": self.day, "shift": self.shift}
+
+
+RULE_TYPES = {rule.kind: rule for rule in (RestRule, MaxConsecutiveDays, MinStaffing, RequiredSkill, Unavailable)}
+
+# Rules the min-cost flow solver can model: they only remove slots from an employee's choices.
+STATIC_RULES = (Unavailable,)
+
+
+class ConstraintSet:
+    """
+    Scheduling rules declared once, on top of the per-shift and workday limits and the one
+    shift per day that every schedule enforces. compile() turns them into bitmasks and counters
+    for one schedule, so each candidate placement is checked in constant time.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, rule):
+        self.rules.append(rule)
+        return self
+
+    def is_static(self):
+        """Returns True if every rule only forbids slots, independently of other assignments."""
+        return all(isinstance(rule, STATIC_RULES) for rule in self.rules)
+
+    def to_records(self):
+        """Returns the rules as a list of JSON-compatible dicts, in declaration order."""
+        return [rule.to_record() for rule in self.rules]
+
+    @classmethod
+    def from_records(cls, records, names=None):
+        """
+        Builds a constraint set from dicts as written by to_records. Raises ValueError, quoting
+        the record, for a missing or mistyped field, and, if the roster's employee names are
+        given, for a rule naming an employee who is not among them.
+        """
+        rules = []
+        for i, record in enumerate(records, 1):
+            if not isinstance(record, dict) or record.get("rule") not in RULE_TYPES:
+                raise ValueError(f"Constraint {i}: expected an object with 'rule' set to one of: "
+                                 f"{', '.join(RULE_TYPES)}.")
+            fields = {key: value for key, value in record.items() if key != "rule"}
+            try:
+                rules.append(RULE_TYPES[record["rule"]](**fields))
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Constraint {i} ({record['rule']}): {e} Record: {json.dumps(record)}")
+        constraint_set = cls(rules)
+        if names is not None:
+            constraint_set.check_names(names)
+        return constraint_set
+
+    def check_names(self, names):
+        """Raises ValueError for the first rule naming an employee not in names, e.g. after a typo."""
+        known = set(names)
+        for i, rule in enumerate(self.rules, 1):
+            if isinstance(rule, Unavailable):
+                named = [rule.name]
+            elif isinstance(rule, RequiredSkill):
+                named = rule.holders
+            else:
+                continue
+            unknown = [name for name in named if name not in known]
+            if unknown:
+                raise ValueError(f"Constraint {i} ({rule.kind}): unknown employees {', '.join(unknown)}. "
+                                 f"Record: {json.dumps(rule.to_record())}")
+
+    def for_days(self, days):
+        """
+        Returns the rules that apply to a period made of the given days, e.g. a horizon's partial
+        first or last week: unavailability on other days is dropped and day lists are cut down.
+        """
+        records = []
+        for rule in self.rules:
+            record = rule.to_record()
+            if isinstance(rule, Unavailable) and rule.day not in days:
+                continue
+            if record.get("days") is not None:
+                record["days"] = [day for day in record["days"] if day in days]
+                if not record["days"]:
+                    continue
+            records.append(record)
+        return ConstraintSet.from_records(records)
+
+    def compile(self, schedule):
+        """Returns the CompiledConstraints of these rules for a new, empty schedule."""
+        return CompiledConstraints(self, schedule)
+
+
+def load_constraints(path):
+    """Reads a ConstraintSet from a JSON file holding a list of rule objects."""
+    with open(path, encoding="utf-8") as file:
+        records = json.load(file)
+    if isinstance(records, dict):
+        records = records.get("constraints")
+    if not isinstance(records, list):
+        raise ValueError(f"'{path}' must contain a list of constraints.")
+    return ConstraintSet.from_records(records)
+
+
+class CompiledConstraints:
+    """
+    A ConstraintSet compiled against one schedule's roster and limits. Slots are numbered
+    d * shifts + s, and every per-employee rule becomes a bitmask over them:
+
+        blocked[e]    slots the employee is unavailable for, or barred from by carry_over
+        rest_masks[b] slots that taking slot b rules out for the same employee
+        forbidden[e]  union of rest_masks over the employee's current assignments
+        windows[d]    day bitmasks of every run of limit + 1 days through day d
+        skill_bits[e] one bit per RequiredSkill the employee holds
+
+    plus per-slot counters of the skill holders placed. The schedule calls placed/unplaced on
+    every change, so allows() never scans the roster or the schedule.
+    """
+
+    def __init__(self, constraint_set, schedule):
+        self.constraint_set = constraint_set
+        self.schedule = schedule
+        roster = schedule.roster
+        constraint_set.check_names(roster.names)
+        self.num_days, self.num_shifts = len(roster.days), len(roster.shifts)
+        num_slots = self.num_days * self.num_shifts
+        day_index = {day: d for d, day in enumerate(roster.days)}
+        shift_index = {shift: s for s, shift in enumerate(roster.shifts)}
+
+        def lookup(index, names, what):
+            if names is None:
+                return list(index.values())
+            unknown = [name for name in names if name not in index]
+            if unknown:
+                raise ValueError(f"Unknown {what} in constraints: {', '.join(map(str, unknown))}.")
+            return [index[name] for name in names]
+
+        self.unavailable = {} # name -> blocked mask, kept for employees added back later
+        self.rest_masks = [0] * num_slots
+        self.rest_pairs = [] # (before shift, after shift) per RestRule
+        consecutive_limit = None
+        self.minimum = [0] * num_slots
+        self.requirements = [[] for _ in range(num_slots)] # slot -> [(skill bit, count)]
+        self.holders = {} # name -> skill bits
+        skill_rules = 0
+        for rule in constraint_set.rules:
+            if isinstance(rule, Unavailable):
+                d = lookup(day_index, [rule.day], "day")[0]
+                shifts = lookup(shift_index, None if rule.shift is None else [rule.shift], "shift")
+                for s in shifts:
+                    self.unavailable[rule.name] = self.unavailable.get(rule.name, 0) | 1 << (d * self.num_shifts + s)
+            elif isinstance(rule, RestRule):
+                before = lookup(shift_index, [rule.before], "shift")[0]
+                after = lookup(shift_index, [rule.after], "shift")[0]
+                self.rest_pairs.append((before, after))
+                for d in range(self.num_days - 1):
+                    a, b = d * self.num_shifts + before, (d + 1) * self.num_shifts + after
+                    self.rest_masks[a] |= 1 << b
+                    self.rest_masks[b] |= 1 << a
+            elif isinstance(rule, MaxConsecutiveDays):
+                consecutive_limit = min(rule.limit, consecutive_limit or rule.limit)
+            elif isinstance(rule, MinStaffing):
+                self._check_count(rule.minimum, schedule, "min_staffing minimum")
+                for d in lookup(day_index, rule.days, "day"):
+                    for s in lookup(shift_index, rule.shifts, "shift"):
+                        b = d * self.num_shifts + s
+                        self.minimum[b] = max(self.minimum[b], rule.minimum)
+            elif isinstance(rule, RequiredSkill):
+                self._check_count(rule.count, schedule, f"required_skill '{rule.skill}' count")
+                bit = 1 << skill_rules
+                skill_rules += 1
+                for name in rule.holders:
+                    self.holders[name] = self.holders.get(name, 0) | bit
+                for d in lookup(day_index, rule.days, "day"):
+                    for s in lookup(shift_index, rule.shifts, "shift"):
+                        self.requirements[d * self.num_shifts + s].append((bit, rule.count))
+            else:
+                raise ValueError(f"Unsupported constraint {type(rule).__name__}.")
+
+        self.consecutive_limit = consecutive_limit
+        self.has_rest = any(self.rest_masks)
+        self.windows = [[] for _ in range(self.num_days)]
+        if consecutive_limit is not None:
+            run = consecutive_limit + 1
+            for start in range(self.num_days - run + 1):
+                window = ((1 << run) - 1) << start
+                for d in range(start, start + run):
+                    self.windows[d].append(window)
+        self.has_windows = any(self.windows)
+        self.has_requirements = any(self.requirements)
+        self.skill_counts = [dict.fromkeys((bit for bit, _ in slot_requirements), 0)
+                             for slot_requirements in self.requirements]
+
+        names = roster.names
+        self.blocked = [self.unavailable.get(name, 0) for name in names]
+        self.skill_bits = [self.holders.get(name, 0) for name in names]
+        self.forbidden = [0] * len(names)
+        self.carry_windows = {} # e -> day mask that would extend the previous period's run too far
+        self._blocked_slots = None
+
+    @staticmethod
+    def _check_count(count, schedule, what):
+        if not 0 <= count <= schedule.max_employees_per_shift:
+            raise ValueError(f"{what} must be between 0 and the per-shift limit "
+                             f"({schedule.max_employees_per_shift}), got {count}.")
+
+    def add_employee(self, e):
+        """Extends the per-employee masks after employee e was appended to the roster."""
+        name = self.schedule.roster.names[e]
+        self.blocked.append(self.unavailable.get(name, 0))
+        self.skill_bits.append(self.holders.get(name, 0))
+        self.forbidden.append(0)
+        self._blocked_slots = None
+
+    def allows(self, e, d, s):
+        """
+        Returns True if the rules allow employee e on shift s of day d, given the schedule's
+        current assignments. The per-shift limit and one shift per day are checked by the caller.
+        """
+        b = d * self.num_shifts + s
+        if (self.blocked[e] | self.forbidden[e]) >> b & 1:
+            return False
+        if self.has_windows:
+            days = self.schedule.index.day_bits[e] | 1 << d
+            for window in self.windows[d]:
+                if days & window == window:
+                    return False
+            window = self.carry_windows.get(e)
+            if window is not None and days & window == window:
+                return False
+        if self.has_requirements and self.requirements[b]:
+            room_after = self.schedule.max_employees_per_shift - len(self.schedule.slots[d][s]) - 1
+            counts = self.skill_counts[b]
+            for bit, count in self.requirements[b]:
+                if not self.skill_bits[e] & bit and room_after < count - counts[bit]:
+                    return False
+        return True
+
+    def carry_over(self, previous):
+        """
+        Applies the end of the previous period before anything is placed. previous is that
+        period's employees x days assignment array. An employee who worked a rest rule's
+        before-shift on its last day is barred from the after-shift on day 0. A run of workdays
+        reaching the last day counts towards MaxConsecutiveDays.
+        """
+        previous = np.asarray(previous)[:len(self.blocked)]
+        if not previous.size:
+            return
+        last_day = previous[:, -1]
+        for before, after in self.rest_pairs:
+            for e in np.flatnonzero(last_day == before).tolist():
+                self.blocked[e] |= 1 << after
+        if self.consecutive_limit is not None:
+            # Length of the run of workdays ending on the last day: the first gap, counting backwards.
+            unworked = np.pad(previous[:, ::-1] < 0, ((0, 0), (0, 1)), constant_values=True)
+            trailing = unworked.argmax(axis=1)
+            for e in np.flatnonzero(trailing).tolist():
+                span = max(self.consecutive_limit - int(trailing[e]) + 1, 1)
+                if span <= self.num_days:
+                    self.carry_windows[e] = (1 << span) - 1
+            self.has_windows = self.has_windows or bool(self.carry_windows)
+        self._blocked_slots = None
+
+    def placed(self, e, d, s):
+        """Updates the masks and counters after employee e was placed on shift s of day d."""
+        b = d * self.num_shifts + s
+        if self.has_rest:
+            self.forbidden[e] |= self.rest_masks[b]
+        if self.has_requirements:
+            counts = self.skill_counts[b]
+            for bit in counts:
+                if self.skill_bits[e] & bit:
+                    counts[bit] += 1
+
+    def unplaced(self, e, d, s):
+        """Updates the masks and counters after employee e was removed from shift s of day d."""
+        b = d * self.num_shifts + s
+        if self.has_rest:
+            forbidden = 0
+            for day, shift in enumerate(self.schedule.assigned_shift[e].tolist()):
+                if shift >= 0:
+                    forbidden |= self.rest_masks[day * self.num_shifts + shift]
+            self.forbidden[e] = forbidden
+        if self.has_requirements:
+            counts = self.skill_counts[b]
+            for bit in counts:
+                if self.skill_bits[e] & bit:
+                    counts[bit] -= 1
+
+    def shortfall(self, d, s):
+        """Returns how many more employees shift s on day d needs to meet its minimum staffing."""
+        return max(self.minimum[d * self.num_shifts + s] - len(self.schedule.slots[d][s]), 0)
+
+    def violations(self):
+        """
+        Returns the shifts that miss a minimum staffing or required skill, as a list of
+        (day index, shift index, reason) tuples.
+        """
+        problems = []
+        for d in range(self.num_days):
+            for s in range(self.num_shifts):
+                b = d * self.num_shifts + s
+                if self.shortfall(d, s):
+                    problems.append((d, s, "understaffed"))
+                for bit, count in self.requirements[b]:
+                    if self.skill_counts[b][bit] < count:
+                        problems.append((d, s, "missing_skill"))
+                        break
+        return problems
+
+    def blocked_slots(self):
+        """Returns the blocked masks as an employees x slots bool array, for the flow solver."""
+        if self._blocked_slots is None:
+            num_slots = self.num_days * self.num_shifts
+            blocked = np.zeros((len(self.blocked), num_slots), dtype=bool)
+            for e, mask in enumerate(self.blocked):
+                if mask:
+                    blocked[e] = [(mask >> b) & 1 for b in range(num_slots)]
+            self._blocked_slots = blocked
+        return self._blocked_slots
+
@@ -0,0 +1,140 @@
+from bisect import bisect_left, insort
+from itertools import islice
+
+from schedule_config import name_key
+
+
+class EmployeeDirectory:
+    """
+    The GUI's roster: employees by stable internal id, in the order they were added, with a
+    case-folded name index for duplicate checks and incremental prefix search.
+
+    ids_by_key maps each name_key to its id, so lookups, renames, removals and preference
+    edits are O(1) dict operations. The search index is a sorted list of (token, id) pairs,
+    where the tokens are the case-folded name from the start of each word ("ada lovelace",
+    "lovelace"). A prefix query is then one bisect plus a walk over the matches, and keeping the
+    list sorted costs one bisect and one list memmove per edit.
+    """
+
+    def __init__(self):
+        self.entries = {} # id -> (name, {day: {shift: priority}})
+        self.ids_by_key = {} # name_key -> id
+        self._tokens = [] # Sorted (token, id) pairs
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name_key(name) in self.ids_by_key
+
+    @property
+    def name_keys(self):
+        """Case-folded names of all employees, e.g. for import_roster's duplicate check."""
+        return self.ids_by_key.keys()
+
+    def employees(self):
+        """Returns the [(name, {day: {shift: priority}})] list the engine builds rosters from."""
+        return list(self.entries.values())
+
+    def id_of(self, name):
+        """Returns the id of the employee with this name (case-insensitive), or None."""
+        return self.ids_by_key.get(name_key(name))
+
+    def name(self, employee_id):
+        return self.entries[employee_id][0]
+
+    def prefs(self, employee_id):
+        return self.entries[employee_id][1]
+
+    def add(self, name, prefs):
+        """Adds an employee at the end and returns their id. Raises ValueError for a duplicate name."""
+        if name in self:
+            raise ValueError(f"Employee '{name}' already exists.")
+        employee_id = self._register(name, prefs)
+        for token in _tokens(name_key(name)):
+            insort(self._tokens, (token, employee_id))
+        return employee_id
+
+    def extend(self, employees, front=False):
+        """
+        Adds (name, prefs) pairs, skipping names that already exist, and returns the new ids.
+        With front=True they go before the current employees, as for a roster loaded from storage.
+        The search index is re-sorted once for the whole batch.
+        """
+        added, tokens = [], []
+        for name, prefs in employees:
+            if name not in self:
+                employee_id = self._register(name, prefs)
+                added.append(employee_id)
+                tokens += [(token, employee_id) for token in _tokens(name_key(name))]
+        self._tokens += tokens
+        self._tokens.sort()
+        if front and added:
+            new_ids = set(added)
+            order = added + [employee_id for employee_id in self.entries if employee_id not in new_ids]
+            self.entries = {employee_id: self.entries[employee_id] for employee_id in order}
+        return added
+
+    def _register(self, name, prefs):
+        employee_id = self._next_id
+        self._next_id += 1
+        self.entries[employee_id] = (name, prefs)
+        self.ids_by_key[name_key(name)] = employee_id
+        return employee_id
+
+    def remove(self, employee_id):
+        """Removes an employee and returns their name."""
+        name, _ = self.entries.pop(employee_id)
+        key = name_key(name)
+        del self.ids_by_key[key]
+        for token in _tokens(key):
+            del self._tokens[bisect_left(self._tokens, (token, employee_id))]
+        return name
+
+    def rename(self, employee_id, new_name):
+        """
+        Renames an employee, keeping their id and position. Raises ValueError if another
+        employee already has the name; a change of case only is allowed.
+        """
+        old_name, prefs = self.entries[employee_id]
+        old_key, new_key = name_key(old_name), name_key(new_name)
+        if self.ids_by_key.get(new_key, employee_id) != employee_id:
+            raise ValueError(f"Employee '{new_name}' already exists.")
+        for token in _tokens(old_key):
+            del self._tokens[bisect_left(self._tokens, (token, employee_id))]
+        del self.ids_by_key[old_key]
+        self.ids_by_key[new_key] = employee_id
+        for token in _tokens(new_key):
+            insort(self._tokens, (token, employee_id))
+        self.entries[employee_id] = (new_name, prefs)
+
+    def set_prefs(self, employee_id, prefs):
+        """Replaces an employee's {day: {shift: priority}} preferences."""
+        self.entries[employee_id] = (self.entries[employee_id][0], prefs)
+
+    def clear(self):
+        self.entries.clear()
+        self.ids_by_key.clear()
+        self._tokens.clear()
+
+    def search(self, query, offset=0, limit=20):
+        """
+        Returns (ids, total): one page of the employees whose name, or any word of it, starts
+        with query (case-insensitive), and the number of matches. Matches are ordered by the
+        matching word; an empty query pages through everyone in roster order.
+        """
+        prefix = name_key(query)
+        if not prefix:
+            return list(islice(self.entries, offset, offset + limit)), len(self.entries)
+        matches = {}
+        for token, employee_id in islice(self._tokens, bisect_left(self._tokens, (prefix,)), None):
+            if not token.startswith(prefix):
+                break
+            matches[employee_id] = None
+        return list(islice(matches, offset, offset + limit)), len(matches)
+
+
+def _tokens(key):
+    """The case-folded name from the start of each of its words."""
+    return {key[i:] for i in range(len(key)) if key[i] != " " and (i == 0 or key[i - 1] == " ")}
@@ -0,0 +1,586 @@
+import random
+from collections import defaultdict
+
+import numpy as np
+
+from instrumentation import RunMetrics
+from schedule_config import DAYS, SHIFTS, DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK
+
+UNASSIGNED = -1 # Marker in Schedule.assigned_shift for a day with no shift
+PROGRESS_INTERVAL = 1024 # Employees handled between progress reports in per-employee loops
+
+
+def parse_preferences(emp_prefs, days=DAYS, shifts=SHIFTS):
+    """Parses one employee's {day: {shift: priority}} dict into a days x shifts int8 array."""
+    return np.array([[int(emp_prefs[day][shift]) for shift in shifts] for day in days], dtype=np.int8)
+
+
+class Roster:
+    """
+    Dense, index-based representation of the employee roster.
+    Preferences are stored once as an employees x days x shifts int8 array, so the
+    scheduling phases work on integer indices instead of nested string dictionaries.
+    """
+
+    def __init__(self, names=(), prefs=None, days=DAYS, shifts=SHIFTS):
+        self.days = list(days)
+        self.shifts = list(shifts)
+        self.names = list(names)
+        self.index_of = {name: i for i, name in enumerate(self.names)}
+        if len(self.index_of) != len(self.names):
+            raise ValueError("Employee names must be unique.")
+
+        if prefs is None:
+            prefs = np.ones((len(self.names), len(self.days), len(self.shifts)), dtype=np.int8)
+        self.prefs = np.ascontiguousarray(prefs, dtype=np.int8)
+        if self.prefs.shape != (len(self.names), len(self.days), len(self.shifts)):
+            raise ValueError(f"Preference array has shape {self.prefs.shape}, expected "
+                             f"{(len(self.names), len(self.days), len(self.shifts))}.")
+
+        # Removed employees keep their index (so schedules stay valid) and are marked inactive.
+        self.active = np.ones(len(self.names), dtype=bool)
+        # prefs and active are views on these buffers, which add() grows geometrically.
+        self._prefs_buffer = self.prefs
+        self._active_buffer = self.active
+
+    @classmethod
+    def from_employees(cls, employees, days=DAYS, shifts=SHIFTS):
+        """
+        Builds a roster from the GUI's [(name, {day: {shift: priority}})] list.
+        Each priority string is parsed exactly once here.
+        """
+        prefs = np.empty((len(employees), len(days), len(shifts)), dtype=np.int8)
+        for i, (_, emp_prefs) in enumerate(employees):
+            prefs[i] = parse_preferences(emp_prefs, days, shifts)
+        return cls([name for name, _ in employees], prefs, days, shifts)
+
+    def to_employees(self):
+        """Converts the roster back into the GUI's [(name, {day: {shift: priority}})] list."""
+        return [(self.names[i], {day: {shift: str(self.prefs[i, d, s]) for s, shift in enumerate(self.shifts)}
+                                 for d, day in enumerate(self.days)})
+                for i in self.active_indices()]
+
+    def __len__(self):
+        """Size of the index space, including removed employees."""
+        return len(self.names)
+
+    def active_indices(self):
+        """Returns the indices of employees that have not been removed."""
+        return np.flatnonzero(self.active).tolist()
+
+    def add(self, name, prefs):
+        """
+        Appends an employee with a days x shifts preference array and returns their index.
+        Storage grows geometrically, so repeated adds cost amortized O(days * shifts).
+        """
+        if name in self.index_of:
+            raise ValueError(f"Employee '{name}' already exists.")
+        e = len(self.names)
+        if e == len(self._prefs_buffer):
+            self._prefs_buffer = _grown(self._prefs_buffer, 1)
+            self._active_buffer = _grown(self._active_buffer, False)
+        self._prefs_buffer[e] = prefs
+        self._active_buffer[e] = True
+        self.names.append(name)
+        self.index_of[name] = e
+        self.prefs = self._prefs_buffer[:e + 1]
+        self.active = self._active_buffer[:e + 1]
+        return e
+
+    def remove(self, e):
+        """Marks employee e as removed; their index stays reserved."""
+        self.active[e] = False
+        self.index_of.pop(self.names[e], None)
+
+    def without(self, names):
+        """
+        Returns a copy of the roster with the named employees removed. The copy shares the
+        preference array, so it is cheap for what-if runs, and indices stay the same.
+        """
+        unknown = [name for name in names if name not in self.index_of]
+        if unknown:
+            raise ValueError(f"Unknown employees: {', '.join(unknown)}.")
+        copy = Roster.__new__(Roster)
+        copy.__dict__.update(self.__getstate__())
+        copy.names = list(self.names)
+        copy.index_of = dict(self.index_of)
+        copy.active = copy._active_buffer = self.active.copy()
+        for name in names:
+            copy.remove(self.index_of[name])
+        return copy
+
+    def rename(self, e, new_name):
+        """Renames employee e in place. Schedules refer to indices, so they need no update."""
+        if new_name in self.index_of and self.index_of[new_name] != e:
+            raise ValueError(f"Employee '{new_name}' already exists.")
+        self.index_of.pop(self.names[e], None)
+        self.names[e] = new_name
+        self.index_of[new_name] = e
+
+    def __getstate__(self):
+        # Pickle only the live rows; the unpickled views and buffers are then the same arrays.
+        state = self.__dict__.copy()
+        state["_prefs_buffer"] = self.prefs
+        state["_active_buffer"] = self.active
+        return state
+
+
+def _grown(array, fill_value):
+    """Returns a copy of array with at least double the rows, padded with fill_value."""
+    grown = np.full((max(2 * len(array), 8),) + array.shape[1:], fill_value, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class AssignmentIndex:
+    """
+    Incrementally maintained index of who works when, so membership and eligibility
+    checks in the scheduling phases are O(1) instead of scans over the schedule or roster.
+    Keeps a per-employee bitset of assigned days, the set of employees working each day,
+    and a live pool of employees that still have capacity for more workdays.
+    """
+
+    def __init__(self, num_employees, num_days, max_workdays_per_week):
+        self.max_workdays_per_week = max_workdays_per_week
+        self.day_bits = [0] * num_employees # Bit d is set if the employee works on day d
+        self.workdays = [0] * num_employees
+        self.day_members = [set() for _ in range(num_days)]
+
+        # Pool of employees below max workdays, as a list plus positions for O(1) removal.
+        self._pool = list(range(num_employees)) if max_workdays_per_week > 0 else []
+        self._pool_position = {e: i for i, e in enumerate(self._pool)}
+
+    def works_on(self, e, d):
+        """Returns True if employee e already has a shift on day d."""
+        return (self.day_bits[e] >> d) & 1 == 1
+
+    def free_days(self, e, num_days):
+        """Returns the day indices on which employee e has no shift yet."""
+        bits = self.day_bits[e]
+        return [d for d in range(num_days) if not (bits >> d) & 1]
+
+    def has_capacity(self, e):
+        """Returns True if employee e is still in the pool of employees with remaining capacity."""
+        return e in self._pool_position
+
+    @property
+    def pool(self):
+        """Employees with remaining capacity, in no particular order."""
+        return self._pool
+
+    def assign(self, e, d):
+        """Records that employee e works on day d."""
+        self.day_bits[e] |= 1 << d
+        self.day_members[d].add(e)
+        self.workdays[e] += 1
+        if self.workdays[e] >= self.max_workdays_per_week:
+            self.remove_from_pool(e)
+
+    def unassign(self, e, d):
+        """Records that employee e no longer works on day d, returning them to the pool if needed."""
+        self.day_bits[e] &= ~(1 << d)
+        self.day_members[d].discard(e)
+        self.workdays[e] -= 1
+        if self.workdays[e] < self.max_workdays_per_week:
+            self.add_to_pool(e)
+
+    def add_to_pool(self, e):
+        """Adds employee e to the pool; a no-op if e is already in it."""
+        if e not in self._pool_position:
+            self._pool_position[e] = len(self._pool)
+            self._pool.append(e)
+
+    def add_employee(self):
+        """Extends the index with a new employee and returns their index."""
+        self.day_bits.append(0)
+        self.workdays.append(0)
+        e = len(self.workdays) - 1
+        if self.max_workdays_per_week > 0:
+            self.add_to_pool(e)
+        return e
+
+    def remove_from_pool(self, e):
+        """Removes employee e from the pool; a no-op if e is not in it."""
+        position = self._pool_position.pop(e, None)
+        if position is None:
+            return
+        last = self._pool.pop()
+        if last != e:
+            self._pool[position] = last
+            self._pool_position[last] = position
+
+
+class Schedule:
+    """
+    Result of a scheduling run, expressed on roster indices.
+    slots[d][s] lists the employee indices working shift s on day d, and
+    assigned_shift[e, d] holds the shift index employee e works on day d (or UNASSIGNED).
+    constraints, if given, is a constraints.ConstraintSet; it is compiled for this schedule
+    and kept up to date by place/unplace.
+    """
+
+    def __init__(self, roster, max_employees_per_shift, max_workdays_per_week, constraints=None):
+        self.roster = roster
+        self.max_employees_per_shift = max_employees_per_shift
+        self.max_workdays_per_week = max_workdays_per_week
+
+        num_days, num_shifts = len(roster.days), len(roster.shifts)
+        self.slots = [[[] for _ in range(num_shifts)] for _ in range(num_days)]
+        self.assigned_shift = np.full((len(roster), num_days), UNASSIGNED, dtype=np.int8)
+        self._assigned_buffer = self.assigned_shift # Grown by add_employee()
+        self.index = AssignmentIndex(len(roster), num_days, max_workdays_per_week)
+        for e in np.flatnonzero(~roster.active).tolist():
+            self.index.remove_from_pool(e)
+        self.open_slots_per_day = [num_shifts * max_employees_per_shift] * num_days
+        self.total_slots = num_days * num_shifts * max_employees_per_shift
+        self.open_slots = self.total_slots
+        self.unresolved = set()
+        self.seed = None # RNG seed that reproduces this schedule, when it is known
+        self.metrics = RunMetrics() # Phase timers and counters filled in by the solver
+        self.constraints = constraints.compile(self) if constraints else None
+
+    @property
+    def phase_times(self):
+        """Seconds spent in each solver phase, by phase name."""
+        return self.metrics.phase_times
+
+    @property
+    def workdays(self):
+        """Number of assigned workdays per employee index, as an array."""
+        return np.array(self.index.workdays, dtype=np.int32)
+
+    def add_employee(self):
+        """
+        Extends the schedule after an employee was appended to the roster, growing the
+        per-employee arrays geometrically. Returns the new employee's index.
+        """
+        e = self.index.add_employee()
+        if e == len(self._assigned_buffer):
+            self._assigned_buffer = _grown(self._assigned_buffer, UNASSIGNED)
+        self.assigned_shift = self._assigned_buffer[:e + 1]
+        if self.constraints is not None:
+            self.constraints.add_employee(e)
+        return e
+
+    def has_room(self, d, s):
+        """Returns True if shift s on day d is below the per-shift limit."""
+        return len(self.slots[d][s]) < self.max_employees_per_shift
+
+    def can_place(self, e, d, s):
+        """
+        Returns True if employee e, who has no shift on day d yet, may take shift s on day d:
+        the shift has room and the compiled constraints allow it.
+        """
+        return (len(self.slots[d][s]) < self.max_employees_per_shift
+                and (self.constraints is None or self.constraints.allows(e, d, s)))
+
+    def place(self, e, d, s):
+        """Assigns employee e to shift s on day d."""
+        self.slots[d][s].append(e)
+        self.assigned_shift[e, d] = s
+        self.index.assign(e, d)
+        self.open_slots_per_day[d] -= 1
+        self.open_slots -= 1
+        if self.constraints is not None:
+            self.constraints.placed(e, d, s)
+
+    def unplace(self, e, d, s):
+        """Removes employee e from shift s on day d."""
+        self.slots[d][s].remove(e)
+        self.assigned_shift[e, d] = UNASSIGNED
+        self.index.unassign(e, d)
+        self.open_slots_per_day[d] += 1
+        self.open_slots += 1
+        if self.constraints is not None:
+            self.constraints.unplaced(e, d, s)
+
+    def report_progress(self, phase, percent):
+        """Reports solver progress, with the number of slots filled so far, to metrics.progress."""
+        self.metrics.report_progress(phase, percent, self.total_slots - self.open_slots)
+
+    def mark_unresolved(self, e):
+        """Records that employee e could not be fully scheduled and takes them out of the pool."""
+        self.unresolved.add(e)
+        self.index.remove_from_pool(e)
+
+    def assignments(self):
+        """Yields (employee, day, shift) index triples for every assignment."""
+        for d, day_slots in enumerate(self.slots):
+            for s, slot in enumerate(day_slots):
+                for e in slot:
+                    yield e, d, s
+
+    def preference_cost(self):
+        """
+        Returns the total priority value of all assignments (lower is better).
+        Comparable across solver modes for the same roster and limits.
+        """
+        employees, days = np.nonzero(self.assigned_shift != UNASSIGNED)
+        shifts = self.assigned_shift[employees, days]
+        return int(self.roster.prefs[employees, days, shifts].sum(dtype=np.int64))
+
+    def to_dict(self):
+        """
+        Returns the schedule in the GUI's format: schedule[day][shift] = [employee1, employee2, ...].
+        """
+        names = self.roster.names
+        schedule = defaultdict(lambda: defaultdict(list))
+        for d, day in enumerate(self.roster.days):
+            for s, shift in enumerate(self.roster.shifts):
+                schedule[day][shift] = [names[e] for e in self.slots[d][s]]
+        return schedule
+
+    def workdays_by_name(self):
+        """Returns the number of assigned workdays per employee name."""
+        workdays = defaultdict(int)
+        for e in self.roster.active_indices():
+            workdays[self.roster.names[e]] = self.index.workdays[e]
+        return workdays
+
+    def unresolved_names(self):
+        """Returns the names of employees that could not be fully scheduled."""
+        return {self.roster.names[e] for e in self.unresolved}
+
+    def record_violations(self):
+        """Counts the shifts that miss a minimum staffing or required skill into metrics.details."""
+        if self.constraints is not None:
+            reasons = [reason for _, _, reason in self.constraints.violations()]
+            self.metrics.details["understaffed_shifts"] = reasons.count("understaffed")
+            self.metrics.details["shifts_missing_skill"] = reasons.count("missing_skill")
+
+
+class GreedyPlan:
+    """
+    Preprocessing of the greedy scheduler that depends only on the roster's preferences and
+    names, so runs with other limits, seeds or constraints, or on copies of the roster with
+    employees removed (see Roster.without), can share it:
+        best_daily_priority  employees x days array of each employee's best priority per day
+        shift_order          shift_order[e][d] lists the shifts of day d by priority for employee e
+        name_rank            position of each employee in name order
+        name_orders          name_orders[d] lists all employees by best priority on day d, then name
+    Shift orders and daily orders are built on first use, since phase 1 usually stops after
+    the first few hundred employees of each day.
+    """
+
+    def __init__(self, roster):
+        self.num_employees = len(roster)
+        self.best_daily_priority = roster.prefs.min(axis=2)
+        self.shift_order = _ShiftOrders(roster.prefs)
+        self.name_rank = np.empty(self.num_employees, dtype=np.int64) # Position of each employee in name order
+        self.name_rank[np.argsort(np.array(roster.names, dtype=str), kind="stable")] = np.arange(self.num_employees)
+        self.name_orders = _DailyOrders(self.best_daily_priority, self.name_rank)
+
+
+class _ShiftOrders(dict):
+    """Per-employee shift orders, computed on first access: self[e][d] lists shift indices by priority."""
+
+    def __init__(self, prefs):
+        super().__init__()
+        self.prefs = prefs
+
+    def __missing__(self, e):
+        # The stable sort keeps SHIFTS order between equal priorities, like sorted(SHIFTS, key=...).
+        order = np.argsort(self.prefs[e], axis=1, kind="stable").tolist()
+        self[e] = order
+        return order
+
+
+class _DailyOrders(dict):
+    """Phase 1 employee order per day, computed on first access: by best priority, then tie rank."""
+
+    def __init__(self, best_daily_priority, tie_rank):
+        super().__init__()
+        self.best_daily_priority = best_daily_priority
+        self.tie_rank = tie_rank
+
+    def __missing__(self, d):
+        # Same order as sorting (min_priority_for_day, name) tuples.
+        order = np.lexsort((self.tie_rank, self.best_daily_priority[:, d])).tolist()
+        self[d] = order
+        return order
+
+
+def generate_schedule(roster, max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                      max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, rng=None,
+                      day_order=None, employee_order=None, progress=None, constraints=None, plan=None,
+                      previous_assignments=None, wrap_days=True):
+    """
+    Assigns employees to shifts using the three scheduling phases:
+    1. Assign each day based on employees' highest daily priorities.
+    2. Resolve remaining employees by attempting assignments on unassigned days.
+    3. Fill any remaining empty slots randomly.
+    Needs no display; rng may be a random.Random instance for reproducible runs.
+    day_order sets the day sequence of phases 1 and 3. employee_order sets the employee
+    sequence of phase 2 and breaks phase 1 priority ties; by default ties go by name.
+    progress, if given, is called as progress(phase, percent, placed) as the phases advance;
+    an exception raised from it aborts the run.
+    constraints, a constraints.ConstraintSet, adds rules every placement must satisfy.
+    plan, a GreedyPlan of this roster, skips the preprocessing when several runs share a roster.
+    previous_assignments, the employees x days assignment array of the period just before, lets
+    the constraints carry rest and consecutive-day rules across the boundary. With wrap_days
+    False, phase 2 does not treat the first day as the one following the last day.
+    """
+    if rng is None:
+        rng = random # Module-level generator, same as calling random.choice directly
+
+    schedule = Schedule(roster, max_employees_per_shift, max_workdays_per_week, constraints)
+    schedule.metrics.progress = progress
+    num_employees = len(roster)
+    if num_employees == 0:
+        return schedule
+
+    metrics = schedule.metrics
+    with metrics.phase("prepare"):
+        if previous_assignments is not None and schedule.constraints is not None:
+            schedule.constraints.carry_over(previous_assignments)
+        if plan is None:
+            plan = GreedyPlan(roster)
+        elif plan.num_employees != num_employees:
+            raise ValueError(f"The plan covers {plan.num_employees} employees, the roster has {num_employees}.")
+        if employee_order is None:
+            daily_orders = plan.name_orders
+            employee_order = range(num_employees)
+        else:
+            # Rank of each employee for breaking priority ties, from the explicit order.
+            tie_rank = np.empty(num_employees, dtype=np.int64)
+            tie_rank[list(employee_order)] = np.arange(num_employees)
+            daily_orders = _DailyOrders(plan.best_daily_priority, tie_rank)
+        if day_order is None:
+            day_order = range(len(roster.days))
+    schedule.report_progress("prepare", 100)
+
+    with metrics.phase("phase1"):
+        _phase1_best_daily_priority(schedule, daily_orders, plan.shift_order, day_order)
+    with metrics.phase("phase2"):
+        _phase2_resolve_remaining(schedule, plan.best_daily_priority, plan.shift_order, employee_order, wrap_days)
+    with metrics.phase("phase3"):
+        _phase3_random_fill(schedule, rng, day_order)
+    schedule.record_violations()
+    schedule.report_progress("phase3", 100)
+    return schedule
+
+
+def _phase1_best_daily_priority(schedule, daily_orders, shift_order, day_order):
+    """Phase 1: Assign based on employees' highest daily priorities."""
+    index = schedule.index
+    allows = schedule.constraints.allows if schedule.constraints is not None else None
+    placed = no_capacity = shift_full = day_full = blocked = 0
+    for done, d in enumerate(day_order):
+        schedule.report_progress("phase1", 100 * done // len(day_order))
+        order = daily_orders[d]
+        for position, e in enumerate(order):
+            if not schedule.open_slots_per_day[d]:
+                day_full += len(order) - position
+                break
+            if not index.has_capacity(e):
+                no_capacity += 1
+                continue
+            for s in shift_order[e][d]:
+                if not schedule.has_room(d, s):
+                    shift_full += 1
+                elif allows is not None and not allows(e, d, s):
+                    blocked += 1
+                else:
+                    schedule.place(e, d, s)
+                    placed += 1
+                    break
+
+    metrics = schedule.metrics
+    metrics.placed["phase1"] += placed
+    metrics.reject("phase1", "no_remaining_capacity", no_capacity)
+    metrics.reject("phase1", "preferred_shift_full", shift_full)
+    metrics.reject("phase1", "day_full", day_full)
+    metrics.reject("phase1", "constraint", blocked)
+
+
+def _phase2_resolve_remaining(schedule, best_daily_priority, shift_order, employee_order, wrap_days=True):
+    """Phase 2: Resolve remaining employees by attempting assignments on unassigned days."""
+    index = schedule.index
+    num_days = len(schedule.roster.days)
+    placed_total = schedule_full = free_days_full = 0
+    for done, e in enumerate(employee_order):
+        if done % PROGRESS_INTERVAL == 0:
+            schedule.report_progress("phase2", 100 * done // len(employee_order))
+        if not index.has_capacity(e):
+            continue
+        best_for_employee = best_daily_priority[e].tolist()
+        while index.has_capacity(e):
+            if not schedule.open_slots:
+                # Every shift is full, so no later attempt can place this employee.
+                schedule.mark_unresolved(e)
+                schedule_full += 1
+                break
+
+            available_days = index.free_days(e, num_days)
+            if not available_days:
+                break
+            available_days.sort(key=best_for_employee.__getitem__)
+
+            placed = _place_on_first_open_shift(schedule, e, available_days, shift_order)
+            if not placed:
+                # Attempt to assign to the *next consecutive day*
+                next_days = [(d + 1) % num_days for d in available_days if wrap_days or d + 1 < num_days]
+                next_days = [d for d in next_days if not index.works_on(e, d)]
+                placed = _place_on_first_open_shift(schedule, e, next_days, shift_order)
+
+            if not placed:
+                schedule.mark_unresolved(e)
+                free_days_full += 1
+                break
+            placed_total += 1
+
+    metrics = schedule.metrics
+    metrics.placed["phase2"] += placed_total
+    metrics.reject("phase2", "all_shifts_full", schedule_full)
+    metrics.reject("phase2", "free_days_full", free_days_full)
+
+
+def _place_on_first_open_shift(schedule, e, candidate_days, shift_order):
+    """Places employee e on the first open shift, trying days in order and shifts by priority."""
+    for d in candidate_days:
+        if not schedule.open_slots_per_day[d]:
+            continue
+        for s in shift_order[e][d]:
+            if schedule.can_place(e, d, s):
+                schedule.place(e, d, s)
+                return True
+    return False
+
+
+def _phase3_random_fill(schedule, rng, day_order):
+    """
+    Phase 3: Fill Any Remaining Empty Slots Randomly.
+    Candidates are drawn from the index's pool of employees with remaining capacity
+    (unresolved employees were already taken out of it). With constraints, shifts below their
+    minimum staffing are filled first, and a candidate the rules reject for one shift stays
+    available for the day's other shifts.
+    """
+    index = schedule.index
+    metrics = schedule.metrics
+    constraints = schedule.constraints
+    for done, d in enumerate(day_order):
+        schedule.report_progress("phase3", 100 * done // len(day_order))
+        if not schedule.open_slots_per_day[d]:
+            continue
+        day_candidates = [e for e in index.pool if not index.works_on(e, d)]
+        metrics.reject("phase3", "already_working_day", len(index.pool) - len(day_candidates))
+        shifts = range(len(schedule.roster.shifts))
+        if constraints is not None:
+            shifts = sorted(shifts, key=lambda s: -constraints.shortfall(d, s))
+        for s in shifts:
+            rejected = []
+            while schedule.has_room(d, s) and day_candidates:
+                # Swap-remove the chosen employee: they now work on day d.
+                i = rng.randrange(len(day_candidates))
+                chosen = day_candidates[i]
+                day_candidates[i] = day_candidates[-1]
+                day_candidates.pop()
+                if constraints is not None and not constraints.allows(chosen, d, s):
+                    rejected.append(chosen)
+                    continue
+                schedule.place(chosen, d, s)
+                metrics.random_filled += 1
+            metrics.reject("phase3", "constraint", len(rejected))
+            day_candidates += rejected
+        metrics.reject("phase3", "slot_left_open_no_candidates", schedule.open_slots_per_day[d])
+    metrics.placed["phase3"] += metrics.random_filled
@@ -0,0 +1,203 @@
+import argparse
+import calendar
+import random
+import sys
+import time
+
+import numpy as np
+
+from constraints import load_constraints
+from engine import (DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK, GreedyPlan, Roster,
+                    generate_schedule)
+from roster_io import import_roster
+from schedule_config import DAYS, SHIFTS, load_week_layout
+from schedule_export import EXPORT_FORMATS, ScheduleSnapshot, export_schedule
+from scoring import score_schedule
+
+
+class HorizonSchedule:
+    """
+    Result of a multi-week run: one Schedule per week on the same employee indices. The first
+    and last week are shorter when the horizon does not start on the first day of the week or
+    does not end on its last day. roster is the horizon roster: one day per calendar day,
+    labelled "Week <n> <day>", so the combined schedule can be exported like a weekly one.
+    """
+
+    def __init__(self, roster, weeks, day_labels):
+        self.weeks = weeks
+        self.roster = Roster(roster.names, np.concatenate([week.roster.prefs for week in weeks], axis=1),
+                             day_labels, roster.shifts)
+        for e in np.flatnonzero(~roster.active).tolist():
+            self.roster.remove(e)
+        self.assigned_shift = np.concatenate([week.assigned_shift for week in weeks], axis=1)
+
+    @property
+    def workdays(self):
+        """Number of assigned workdays per employee index over the whole horizon, as an array."""
+        return sum(week.workdays for week in self.weeks)
+
+    @property
+    def open_slots(self):
+        return sum(week.open_slots for week in self.weeks)
+
+    def assignments(self):
+        """Yields (employee, horizon day, shift) index triples for every assignment."""
+        offset = 0
+        for week in self.weeks:
+            for e, d, s in week.assignments():
+                yield e, offset + d, s
+            offset += len(week.roster.days)
+
+    def preference_cost(self):
+        return sum(week.preference_cost() for week in self.weeks)
+
+    def unresolved_names(self):
+        """Names of employees that could not be fully scheduled in at least one week."""
+        return set().union(*(week.unresolved_names() for week in self.weeks))
+
+    def to_dict(self):
+        """The GUI's schedule[day][shift] = [names] format, keyed by horizon day label."""
+        schedule = {}
+        for week, labels in zip(self.weeks, self._week_labels()):
+            for label, (_, shifts) in zip(labels, week.to_dict().items()):
+                schedule[label] = shifts
+        return schedule
+
+    def _week_labels(self):
+        offset = 0
+        for week in self.weeks:
+            yield self.roster.days[offset:offset + len(week.roster.days)]
+            offset += len(week.roster.days)
+
+
+def _week_part(roster, start, stop):
+    """Returns the roster restricted to days start..stop-1 of its week, keeping indices and removals."""
+    if (start, stop) == (0, len(roster.days)):
+        return roster
+    part = Roster(roster.names, roster.prefs[:, start:stop], roster.days[start:stop], roster.shifts)
+    for e in np.flatnonzero(~roster.active).tolist():
+        part.remove(e)
+    return part
+
+
+def generate_horizon(roster, num_days, max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                     max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, first_day=0, rng=None,
+                     constraints=None, previous_assignments=None, progress=None):
+    """
+    Schedules num_days consecutive days, starting on day first_day of the roster's week, as a
+    sequence of weekly greedy runs. The weekly preferences and limits apply to every week, so
+    any days/shifts layout of the roster works. Each week continues from where the previous one
+    ended instead of starting from scratch:
+    - Employees are ordered by the workdays they got so far, so priority ties in phase 1 and
+      the phase 2 order favour those who have worked least.
+    - Rest and consecutive-day rules see the previous week's last days (see carry_over), and
+      phase 2 no longer wraps the last day of a week back to its first day.
+    previous_assignments, the assignment array of the week before the horizon, lets the first
+    week carry over as well. The preprocessing is shared by all full weeks and each week costs
+    the same, so the run time grows linearly with num_days.
+    progress(phase, percent, placed) reports the weekly phases as "week <n>: <phase>".
+    """
+    days_per_week = len(roster.days)
+    if num_days < 1:
+        raise ValueError("The horizon needs at least one day.")
+    if not 0 <= first_day < days_per_week:
+        raise ValueError(f"first_day must be between 0 and {days_per_week - 1}.")
+
+    plans = {}
+    worked = np.zeros(len(roster), dtype=np.int64) # Workdays so far, the fairness carry-over
+    weeks, day_labels = [], []
+    previous = previous_assignments
+    start, remaining = first_day, num_days
+    while remaining:
+        stop = min(days_per_week, start + remaining)
+        week_roster = _week_part(roster, start, stop)
+        if (start, stop) not in plans:
+            plans[start, stop] = GreedyPlan(week_roster)
+        plan = plans[start, stop]
+        week_constraints = constraints
+        if constraints and stop - start < days_per_week:
+            week_constraints = constraints.for_days(week_roster.days)
+        week_progress = None
+        if progress is not None:
+            number = len(weeks) + 1
+            week_progress = lambda phase, percent, placed: progress(f"week {number}: {phase}", percent, placed)
+
+        employee_order = np.lexsort((plan.name_rank, worked)).tolist()
+        week = generate_schedule(week_roster, max_employees_per_shift, max_workdays_per_week, rng=rng,
+                                 employee_order=employee_order, progress=week_progress,
+                                 constraints=week_constraints, plan=plan, previous_assignments=previous,
+                                 wrap_days=False)
+        weeks.append(week)
+        day_labels += [f"Week {len(weeks)} {day}" for day in week_roster.days]
+        worked += week.workdays
+        previous = week.assigned_shift
+        remaining -= stop - start
+        start = 0
+    return HorizonSchedule(roster, weeks, day_labels)
+
+
+def month_horizon(year, month):
+    """Returns (first_day, num_days) of a calendar month, for the default Monday-to-Sunday week."""
+    return calendar.monthrange(year, month)
+
+
+def _print_weeks(horizon):
+    for number, week in enumerate(horizon.weeks, 1):
+        score = score_schedule(week)
+        print(f"Week {number:>3}: {len(week.roster.days)} days  coverage {score['coverage']:.2f}  "
+              f"cost {score['preference_cost']}  unresolved {score['unresolved']}  "
+              f"violations {score['violations']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Schedule several weeks, or a calendar month, in one run. Weekly preferences and limits "
+                    "apply to every week; fairness and rest rules carry over from one week to the next.")
+    parser.add_argument("roster", help="Roster file (CSV, JSON Lines or JSON).")
+    length = parser.add_mutually_exclusive_group(required=True)
+    length.add_argument("--weeks", type=int, help="Number of whole weeks to schedule.")
+    length.add_argument("--month", help="Calendar month as YYYY-MM (needs a seven-day, Monday-first week).")
+    parser.add_argument("--layout", default=None,
+                        help='JSON file with the week layout, e.g. {"days": [...], "shifts": [...]}.')
+    parser.add_argument("-o", "--output", required=True, help="File the combined schedule is written to.")
+    parser.add_argument("--format", dest="export_format", choices=list(EXPORT_FORMATS), default="long csv")
+    parser.add_argument("--max-employees-per-shift", type=int, default=DEFAULT_MAX_EMPLOYEES_PER_SHIFT)
+    parser.add_argument("--max-workdays-per-week", type=int, default=DEFAULT_MAX_WORKDAYS_PER_WEEK)
+    parser.add_argument("--seed", type=int, default=None, help="Makes the run reproducible.")
+    parser.add_argument("--constraints", default=None, help="JSON file with scheduling rules for every week.")
+
+    args = parser.parse_args(argv)
+    try:
+        days, shifts = load_week_layout(args.layout) if args.layout else (DAYS, SHIFTS)
+        constraints = load_constraints(args.constraints) if args.constraints else None
+        result = import_roster(args.roster, days=days, shifts=shifts)
+        if args.month:
+            if days != DAYS:
+                raise ValueError("--month needs the default Monday-to-Sunday week; use --weeks with a custom layout.")
+            year, month = (int(part) for part in args.month.split("-"))
+            first_day, num_days = month_horizon(year, month)
+        else:
+            first_day, num_days = 0, args.weeks * len(days)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read input: {e}")
+        return 1
+    if not result.employees:
+        print(f"No valid employees ({result.error_count} rows rejected). {result.error_summary(3)}".strip())
+        return 1
+
+    started = time.perf_counter()
+    rng = random.Random(args.seed) if args.seed is not None else None
+    try:
+        horizon = generate_horizon(result.to_roster(), num_days, args.max_employees_per_shift,
+                                   args.max_workdays_per_week, first_day, rng=rng, constraints=constraints)
+    except ValueError as e:
+        print(f"Cannot schedule: {e}")
+        return 1
+    _print_weeks(horizon)
+    _, rows = export_schedule(ScheduleSnapshot(horizon), args.output, args.export_format)
+    print(f"Scheduled {num_days} days in {time.perf_counter() - started:.2f}s; {rows} rows written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+class RunMetrics:
+    """
+    Per-run instrumentation for the scheduling phases: time spent in each phase, employees
+    placed per phase, slots random-filled in phase 3, and why candidates were rejected
+    (rejections[phase][reason] -> count). Counters are aggregated per phase, so recording
+    them adds no work to the inner loops.
+    """
+
+    def __init__(self):
+        self.phase_times = {}
+        self.placed = Counter()
+        self.random_filled = 0
+        self.rejections = defaultdict(Counter)
+        self.details = {} # Solver-specific extras, e.g. augmentations or variants tried
+        self.progress = None # Optional callback(phase, percent, placed), called by report_progress()
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block and adds it to phase_times[name]."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - started
+
+    def reject(self, phase, reason, count=1):
+        """Records count candidates rejected in phase for the given reason."""
+        if count:
+            self.rejections[phase][reason] += count
+
+    def report_progress(self, phase, percent, placed):
+        """
+        Passes a progress update (percent of the phase done, slots filled so far) to the progress
+        callback, if one is set. Anything the callback raises, e.g. to cancel the run, propagates
+        out of the solver.
+        """
+        if self.progress is not None:
+            self.progress(phase, percent, placed)
+
+    def to_record(self, schedule=None, **context):
+        """
+        Returns the metrics as a JSON-serializable dict. If a schedule is given, its size,
+        coverage and unresolved count are included; extra keyword arguments are added as-is.
+        """
+        record = dict(context)
+        record.update({
+            "phase_times": dict(self.phase_times),
+            "total_time": sum(self.phase_times.values()),
+            "placed": dict(self.placed),
+            "random_filled": self.random_filled,
+            "rejections": {phase: dict(reasons) for phase, reasons in self.rejections.items()},
+        })
+        if self.details:
+            record["details"] = dict(self.details)
+        if schedule is not None:
+            roster = schedule.roster
+            total_slots = len(roster.days) * len(roster.shifts) * schedule.max_employees_per_shift
+            record.update({
+                "employees": len(roster.active_indices()),
+                "filled_slots": total_slots - schedule.open_slots,
+                "total_slots": total_slots,
+                "unresolved": len(schedule.unresolved),
+            })
+        return record
+
+    def to_json(self, schedule=None, **context):
+        """Returns to_record() as a single-line JSON string."""
+        return json.dumps(self.to_record(schedule, **context), sort_keys=True)
+
+
+@contextmanager
+def profiled(output_path=None, top=25):
+    """
+    Runs the enclosed block under cProfile. The raw profile is dumped to output_path (for
+    pstats/snakeviz) if given; the yielded dict receives a text summary of the top functions
+    by cumulative time under "summary" when the block exits.
+    """
+    profiler = cProfile.Profile()
+    result = {}
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        if output_path:
+            profiler.dump_stats(output_path)
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(top)
+        result["summary"] = summary.getvalue()
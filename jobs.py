@@ -0,0 +1,114 @@
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's progress callback once the job has been cancelled."""
+
+
+class JobExecutor:
+    """
+    Runs background jobs one at a time on a single worker thread and reports back through a
+    thread-safe event queue, so the GUI thread never shares state with a running job.
+
+    submit() while a job is running does not start a second one: the request is kept as the
+    pending job, and further submits replace it, so any number of repeated requests collapse
+    into one follow-up run. With coalesce=False, pending jobs queue up and all of them run, in
+    order. cancel() stops the running job at its next progress report and drops the pending ones.
+
+    The GUI drains events with poll() (e.g. from root.after). Each event is a tuple
+    (kind, job_id, payload):
+        ("progress", job_id, (phase, percent, placed))
+        ("done", job_id, result)
+        ("cancelled", job_id, None)
+        ("error", job_id, exception)
+    """
+
+    def __init__(self, coalesce=True):
+        self.events = queue.Queue()
+        self.coalesce = coalesce
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._running = None # (job_id, cancel event) of the job on the worker thread
+        self._pending = deque() # (job_id, function, args) to run when the current job ends
+        self._thread = None
+
+    def submit(self, function, *args):
+        """
+        Schedules function(*args, progress=callback) and returns its job id. The callback
+        takes (phase, percent, placed) and raises JobCancelled after cancel().
+        """
+        with self._lock:
+            job_id = next(self._ids)
+            if self.coalesce:
+                self._pending.clear()
+            self._pending.append((job_id, function, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+        return job_id
+
+    def cancel(self):
+        """Cancels the running job and drops the pending ones. Returns True if anything was cancelled."""
+        with self._lock:
+            cancelled = bool(self._pending) or self._running is not None
+            while self._pending:
+                self.events.put(("cancelled", self._pending.popleft()[0], None))
+            if self._running is not None:
+                self._running[1].set()
+        return cancelled
+
+    def busy(self):
+        """Returns True while a job is running or waiting to run."""
+        with self._lock:
+            return self._thread is not None
+
+    def wait(self, timeout=None):
+        """Blocks until no job is running or pending, for at most timeout seconds. Returns True if idle."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                thread = self._thread
+            if thread is None:
+                return True
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            thread.join(remaining)
+
+    def poll(self):
+        """Returns all events published since the last call, oldest first, without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _work(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                job_id, function, args = self._pending.popleft()
+                cancel_event = threading.Event()
+                self._running = (job_id, cancel_event)
+
+            def progress(phase, percent, placed):
+                if cancel_event.is_set():
+                    raise JobCancelled()
+                self.events.put(("progress", job_id, (phase, percent, placed)))
+
+            try:
+                event = ("done", job_id, function(*args, progress=progress))
+            except JobCancelled:
+                event = ("cancelled", job_id, None)
+            except Exception as e:
+                event = ("error", job_id, e)
+            with self._lock:
+                self._running = None
+            self.events.put(event)
@@ -0,0 +1,128 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK, GreedyPlan, generate_schedule
+from scoring import score_schedule
+
+DEFAULT_NUM_STARTS = 32
+
+
+def generate_variant(roster, seed, max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                     max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, constraints=None, plan=None):
+    """
+    Runs one seeded variant of the greedy scheduler. The seed drives the phase 1/3 day order,
+    the phase 2 employee order and the phase 3 random fill, so the same seed always
+    reproduces the same schedule. plan is an optional GreedyPlan shared by the variants.
+    """
+    rng = random.Random(seed)
+    day_order = rng.sample(range(len(roster.days)), len(roster.days))
+    employee_order = rng.sample(range(len(roster)), len(roster))
+    schedule = generate_schedule(roster, max_employees_per_shift, max_workdays_per_week, rng=rng,
+                                 day_order=day_order, employee_order=employee_order, constraints=constraints,
+                                 plan=plan)
+    schedule.seed = seed
+    return schedule
+
+
+def rank_key(score):
+    """
+    Sort key for scores, best first: fewest rule violations (understaffed shifts or missing
+    skills), then highest coverage, then lowest preference cost, then fairest.
+    """
+    return (score["violations"], -score["coverage"], score["preference_cost"], score["workday_variance"])
+
+
+class MultiStartResult:
+    """
+    Outcome of a best-of-N run: the winning schedule, its seed, and the score of every variant
+    as (seed, score) pairs so any of them can be reproduced with generate_variant.
+    """
+
+    def __init__(self, best, best_seed, base_seed, runs):
+        self.best = best
+        self.best_seed = best_seed
+        self.base_seed = base_seed
+        self.runs = runs
+
+
+# Roster, limits, constraints and greedy plan shared by all tasks in a worker process, set once by
+# the pool initializer so the roster is pickled and preprocessed per worker instead of per task.
+_worker_state = None
+
+
+def _init_worker(roster, max_employees_per_shift, max_workdays_per_week, constraints=None):
+    global _worker_state
+    _worker_state = (roster, max_employees_per_shift, max_workdays_per_week, constraints, GreedyPlan(roster))
+
+
+def _score_variant(seed):
+    roster, max_employees_per_shift, max_workdays_per_week, constraints, plan = _worker_state
+    return seed, score_schedule(generate_variant(roster, seed, max_employees_per_shift, max_workdays_per_week,
+                                                 constraints, plan))
+
+
+def variant_seeds(base_seed, num_starts):
+    """Derives the per-variant seeds from a base seed."""
+    rng = random.Random(base_seed)
+    return [rng.getrandbits(32) for _ in range(num_starts)]
+
+
+def run_multistart(roster, num_starts=DEFAULT_NUM_STARTS, max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                   max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, base_seed=None, max_workers=None,
+                   progress=None, constraints=None):
+    """
+    Runs num_starts seeded variants across a process pool, scores each one and keeps the best.
+    base_seed defaults to a fresh random seed; it is recorded on the result together with every
+    variant seed. The winner is regenerated in this process from its seed.
+    progress(phase, percent, placed) is called as variants finish, with the slots filled by the
+    best variant so far; if it raises, variants that have not started yet are cancelled.
+    """
+    if num_starts < 1:
+        raise ValueError("num_starts must be at least 1.")
+    if base_seed is None:
+        base_seed = random.SystemRandom().getrandbits(32)
+    seeds = variant_seeds(base_seed, num_starts)
+    max_workers = min(max_workers or os.cpu_count() or 1, num_starts)
+
+    total_slots = len(roster.days) * len(roster.shifts) * max_employees_per_shift
+    runs = []
+
+    def record(run):
+        runs.append(run)
+        if progress is not None:
+            best_coverage = max(score["coverage"] for _, score in runs)
+            progress("multistart", 100 * len(runs) // num_starts, round(best_coverage * total_slots))
+
+    if max_workers <= 1:
+        _init_worker(roster, max_employees_per_shift, max_workdays_per_week, constraints)
+        for seed in seeds:
+            record(_score_variant(seed))
+    else:
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                   initargs=(roster, max_employees_per_shift, max_workdays_per_week, constraints))
+        try:
+            chunksize = max(1, num_starts // (max_workers * 4))
+            for run in pool.map(_score_variant, seeds, chunksize=chunksize):
+                record(run)
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    # Ties go to the earliest seed, so the choice does not depend on worker timing.
+    best_position = min(range(len(runs)), key=lambda i: (rank_key(runs[i][1]), i))
+    best_seed = runs[best_position][0]
+    best = generate_variant(roster, best_seed, max_employees_per_shift, max_workdays_per_week, constraints)
+    best.metrics.details.update({"variants": len(runs), "base_seed": base_seed, "best_seed": best_seed})
+    return MultiStartResult(best, best_seed, base_seed, runs)
+
+
+def multistart_schedule(roster, max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                        max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, rng=None, progress=None,
+                        constraints=None):
+    """
+    Solver-mode entry point: best of DEFAULT_NUM_STARTS variants. If rng is given, the base seed
+    is drawn from it so the whole run is reproducible.
+    """
+    base_seed = rng.getrandbits(32) if rng is not None else None
+    return run_multistart(roster, DEFAULT_NUM_STARTS, max_employees_per_shift, max_workdays_per_week,
+                          base_seed=base_seed, progress=progress, constraints=constraints).best
@@ -0,0 +1,81 @@
+import customtkinter as ctk
+
+CELL_WIDTH = 110
+CELL_HEIGHT = 28
+DAY_COLUMN_WIDTH = 100
+CELL_GAP = 6
+# Cell colors by priority level, most preferred first; extra levels reuse the last color
+LEVEL_COLORS = ("#DCE8FB", "#FFF3CD", "#F6D5D9")
+
+
+class PreferenceGrid(ctk.CTkCanvas):
+    """
+    Day x shift grid of priority levels drawn on a single canvas, replacing one option menu and
+    one StringVar per cell. Clicking a cell cycles it to the next level; right-clicking goes back.
+    """
+
+    def __init__(self, master, days, shifts, levels, default=None, **kwargs):
+        width = DAY_COLUMN_WIDTH + len(shifts) * (CELL_WIDTH + CELL_GAP)
+        height = (len(days) + 1) * (CELL_HEIGHT + CELL_GAP)
+        super().__init__(master, width=width, height=height, highlightthickness=0, bg="#F0F0F0", **kwargs)
+        self.days = list(days)
+        self.shifts = list(shifts)
+        self.levels = list(levels)
+        self.default = default if default is not None else self.levels[0]
+        self._values = [[self.default] * len(self.shifts) for _ in self.days]
+        self._cells = {} # (day index, shift index) -> (rectangle id, text id)
+        self._positions = {} # canvas item id -> (day index, shift index)
+
+        for s, shift in enumerate(self.shifts):
+            self.create_text(self._x(s) + CELL_WIDTH // 2, CELL_HEIGHT // 2 + CELL_GAP, text=shift,
+                             font=("Helvetica", 12, "bold"))
+        for d, day in enumerate(self.days):
+            y = self._y(d)
+            self.create_text(10, y + CELL_HEIGHT // 2, text=day, anchor="w", font=("Helvetica", 12))
+            for s in range(len(self.shifts)):
+                rectangle = self.create_rectangle(self._x(s), y, self._x(s) + CELL_WIDTH, y + CELL_HEIGHT,
+                                                  outline="#6495ED", width=1)
+                text = self.create_text(self._x(s) + CELL_WIDTH // 2, y + CELL_HEIGHT // 2, font=("Helvetica", 12))
+                self._cells[d, s] = (rectangle, text)
+                self._positions[rectangle] = self._positions[text] = (d, s)
+                self._draw(d, s)
+
+        self.bind("<Button-1>", lambda event: self._on_click(event, 1))
+        self.bind("<Button-3>", lambda event: self._on_click(event, -1))
+
+    def _x(self, s):
+        return DAY_COLUMN_WIDTH + s * (CELL_WIDTH + CELL_GAP)
+
+    def _y(self, d):
+        return (d + 1) * (CELL_HEIGHT + CELL_GAP)
+
+    def _draw(self, d, s):
+        rectangle, text = self._cells[d, s]
+        level = self.levels.index(self._values[d][s])
+        self.itemconfigure(rectangle, fill=LEVEL_COLORS[min(level, len(LEVEL_COLORS) - 1)])
+        self.itemconfigure(text, text=self._values[d][s])
+
+    def _on_click(self, event, step):
+        items = self.find_overlapping(event.x, event.y, event.x, event.y)
+        for item in items:
+            if item in self._positions:
+                d, s = self._positions[item]
+                level = self.levels.index(self._values[d][s])
+                self._values[d][s] = self.levels[(level + step) % len(self.levels)]
+                self._draw(d, s)
+                return
+
+    def get(self):
+        """Returns the preferences as {day: {shift: level}}."""
+        return {day: dict(zip(self.shifts, row)) for day, row in zip(self.days, self._values)}
+
+    def set(self, prefs):
+        """Shows {day: {shift: level}} preferences; missing cells get the default level."""
+        for d, day in enumerate(self.days):
+            for s, shift in enumerate(self.shifts):
+                self._values[d][s] = prefs.get(day, {}).get(shift) or self.default
+                self._draw(d, s)
+
+    def reset(self):
+        """Sets every cell back to the default level."""
+        self.set({})
@@ -0,0 +1,219 @@
+import numpy as np
+
+from engine import UNASSIGNED
+
+
+class ScheduleRepairer:
+    """
+    Keeps a generated schedule up to date as the roster is edited, touching only the
+    affected slots instead of regenerating the whole week. Unaffected assignments stay put.
+
+    Employees with spare capacity are kept in per-slot preference buckets
+    (buckets[d][s][priority] -> ordered set of employee indices), so refilling a freed slot
+    picks the best-preferring available employee without scanning the roster. Buckets are
+    only updated when an employee gains or loses spare capacity, at O(days * shifts) each.
+    """
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+        roster = schedule.roster
+        self._num_days, self._num_shifts = len(roster.days), len(roster.shifts)
+        self._levels = sorted(np.unique(roster.prefs).tolist())
+        self._buckets = [[{p: {} for p in self._levels} for _ in range(self._num_shifts)]
+                         for _ in range(self._num_days)]
+        self._bucketed = set()
+
+        workdays = schedule.workdays
+        spare = np.flatnonzero(roster.active & (workdays < schedule.max_workdays_per_week))
+        if len(spare):
+            spare_prefs = roster.prefs[spare]
+            for d in range(self._num_days):
+                for s in range(self._num_shifts):
+                    column = spare_prefs[:, d, s]
+                    for p in self._levels:
+                        self._buckets[d][s][p] = dict.fromkeys(spare[column == p].tolist())
+            self._bucketed.update(spare.tolist())
+
+    def remove_employee(self, e):
+        """
+        Removes employee e from the roster, frees their shifts and refills each freed slot
+        with the best available employee. Returns the set of employee indices touched.
+        """
+        schedule = self.schedule
+        freed = [(d, int(s)) for d, s in enumerate(schedule.assigned_shift[e].tolist()) if s != UNASSIGNED]
+        for d, s in freed:
+            schedule.unplace(e, d, s)
+        schedule.roster.remove(e)
+        schedule.unresolved.discard(e)
+        schedule.index.remove_from_pool(e)
+        self._refresh(e)
+
+        touched = {e}
+        for d, s in freed:
+            chosen = self._best_candidate(d, s)
+            if chosen is not None:
+                self._place(chosen, d, s)
+                touched.add(chosen)
+        return touched
+
+    def add_employee(self, name, prefs):
+        """
+        Adds a new hire with a days x shifts preference array. They first take open slots,
+        best priority first; any remaining capacity goes to slots where an incumbent has a
+        strictly worse priority than the new hire, and the displaced incumbent is moved to an
+        open slot if one fits. Returns the set of employee indices touched.
+        """
+        schedule = self.schedule
+        roster = schedule.roster
+        e = roster.add(name, prefs)
+        schedule.add_employee()
+        self._add_levels(roster.prefs[e])
+        self._refresh(e)
+        return self._place_hire(e)
+
+    def update_preferences(self, e, prefs):
+        """
+        Gives employee e a new days x shifts preference array, keeping their index. Their
+        shifts are freed and refilled as for a removal, after which they are placed as a new
+        hire with the new preferences. Returns the set of employee indices touched.
+        """
+        schedule = self.schedule
+        freed = [(d, int(s)) for d, s in enumerate(schedule.assigned_shift[e].tolist()) if s != UNASSIGNED]
+        for d, s in freed:
+            schedule.unplace(e, d, s)
+        self._unbucket(e) # Buckets are keyed by the old preferences
+        schedule.roster.prefs[e] = prefs
+        self._add_levels(schedule.roster.prefs[e])
+        self._refresh(e)
+
+        touched = {e}
+        for d, s in freed:
+            chosen = self._best_candidate(d, s)
+            if chosen is not None:
+                self._place(chosen, d, s)
+                touched.add(chosen)
+        return touched | self._place_hire(e)
+
+    def _place_hire(self, e):
+        """Places e on open slots, then on slots of worse-preferring incumbents (see add_employee). Returns the indices touched."""
+        schedule = self.schedule
+        roster = schedule.roster
+        touched = {e}
+        # Hire's slots by priority, then day, then shift.
+        hire_prefs = roster.prefs[e]
+        order = np.lexsort((np.tile(np.arange(self._num_shifts), self._num_days),
+                            np.repeat(np.arange(self._num_days), self._num_shifts),
+                            hire_prefs.ravel()))
+        candidates = [divmod(int(slot), self._num_shifts) for slot in order]
+
+        for d, s in candidates:
+            if not self._has_spare(e):
+                break
+            if not schedule.index.works_on(e, d) and schedule.can_place(e, d, s):
+                self._place(e, d, s)
+
+        for d, s in candidates:
+            if not self._has_spare(e):
+                break
+            if schedule.index.works_on(e, d) or not schedule.slots[d][s]:
+                continue
+            incumbent = max(schedule.slots[d][s], key=lambda other: roster.prefs[other, d, s])
+            if roster.prefs[incumbent, d, s] <= hire_prefs[d, s]:
+                continue
+            self._unplace(incumbent, d, s)
+            if not schedule.can_place(e, d, s):
+                self._place(incumbent, d, s) # The constraints keep the incumbent in place
+                continue
+            self._place(e, d, s)
+            self._place_in_open_slot(incumbent)
+            touched.add(incumbent)
+
+        self._update_unresolved(e)
+        return touched
+
+    def rename_employee(self, e, new_name):
+        """Renames employee e. Assignments refer to indices, so this is O(1)."""
+        self.schedule.roster.rename(e, new_name)
+        return {e}
+
+    def _has_spare(self, e):
+        schedule = self.schedule
+        return schedule.roster.active[e] and schedule.index.workdays[e] < schedule.max_workdays_per_week
+
+    def _add_levels(self, prefs):
+        """Adds empty buckets for priority levels in prefs that no employee had so far."""
+        for p in np.unique(prefs).tolist():
+            if p not in self._levels:
+                self._levels = sorted(self._levels + [p])
+                for day_buckets in self._buckets:
+                    for slot_buckets in day_buckets:
+                        slot_buckets[p] = {}
+
+    def _unbucket(self, e):
+        """Drops e from every bucket."""
+        if e not in self._bucketed:
+            return
+        prefs = self.schedule.roster.prefs[e].tolist()
+        for d in range(self._num_days):
+            for s in range(self._num_shifts):
+                self._buckets[d][s][prefs[d][s]].pop(e, None)
+        self._bucketed.discard(e)
+
+    def _refresh(self, e):
+        """Adds e to or drops e from the buckets after their spare capacity changed."""
+        has_spare = self._has_spare(e)
+        if has_spare == (e in self._bucketed):
+            return
+        prefs = self.schedule.roster.prefs[e].tolist()
+        for d in range(self._num_days):
+            for s in range(self._num_shifts):
+                bucket = self._buckets[d][s][prefs[d][s]]
+                if has_spare:
+                    bucket[e] = None
+                else:
+                    bucket.pop(e, None)
+        if has_spare:
+            self._bucketed.add(e)
+        else:
+            self._bucketed.discard(e)
+
+    def _best_candidate(self, d, s):
+        """Returns the best-preferring employee with spare capacity who is free on day d and allowed on the slot."""
+        schedule = self.schedule
+        for p in self._levels:
+            for e in self._buckets[d][s][p]:
+                if not schedule.index.works_on(e, d) and schedule.can_place(e, d, s):
+                    return e
+        return None
+
+    def _place(self, e, d, s):
+        self.schedule.place(e, d, s)
+        self._refresh(e)
+        self._update_unresolved(e)
+
+    def _unplace(self, e, d, s):
+        self.schedule.unplace(e, d, s)
+        self._refresh(e)
+        self._update_unresolved(e)
+
+    def _place_in_open_slot(self, e):
+        """Places e on their best open slot on a free day, if any. O(days * shifts)."""
+        schedule = self.schedule
+        prefs = schedule.roster.prefs[e]
+        best = None
+        for d in range(self._num_days):
+            if schedule.index.works_on(e, d) or not schedule.open_slots_per_day[d]:
+                continue
+            for s in range(self._num_shifts):
+                if schedule.can_place(e, d, s) and (best is None or prefs[d, s] < prefs[best]):
+                    best = (d, s)
+        if best is not None:
+            self._place(e, *best)
+
+    def _update_unresolved(self, e):
+        schedule = self.schedule
+        attainable = min(schedule.max_workdays_per_week, self._num_days)
+        if schedule.roster.active[e] and schedule.index.workdays[e] < attainable:
+            schedule.mark_unresolved(e)
+        else:
+            schedule.unresolved.discard(e)
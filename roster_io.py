@@ -0,0 +1,225 @@
+import csv
+import json
+import os
+import re
+
+import numpy as np
+
+from engine import Roster
+from schedule_config import DAYS, SHIFTS, PRIORITY_LEVELS, name_key
+
+DEFAULT_PRIORITY = "1" # Used for preferences left blank, same as the GUI dropdown default
+MAX_REPORTED_ERRORS = 1000 # Errors beyond this are counted but not stored
+_JSON_CHUNK_SIZE = 1 << 16
+
+
+def _column_key(text):
+    """Normalizes a 'Monday Morning' / 'monday_morning' / 'Monday:Morning' column name."""
+    return "".join(re.findall(r"[a-z0-9]+", text.casefold()))
+
+
+class ImportResult:
+    """
+    Outcome of a bulk roster import.
+    employees: accepted rows in the GUI's [(name, {day: {shift: priority}})] format.
+    prefs: the same preferences as an employees x days x shifts int8 array.
+    errors: up to MAX_REPORTED_ERRORS (line number, message) pairs; error_count has the total.
+    """
+
+    def __init__(self, employees, prefs, errors, error_count, rows_read, days=DAYS, shifts=SHIFTS):
+        self.employees = employees
+        self.prefs = prefs
+        self.errors = errors
+        self.error_count = error_count
+        self.rows_read = rows_read
+        self.days = days
+        self.shifts = shifts
+
+    def to_roster(self):
+        """Returns the accepted employees as an engine Roster."""
+        return Roster([name for name, _ in self.employees], self.prefs, self.days, self.shifts)
+
+    def error_summary(self, limit=10):
+        """Returns the first few errors as text, one per line."""
+        lines = [f"Line {line}: {message}" for line, message in self.errors[:limit]]
+        if self.error_count > limit:
+            lines.append(f"... and {self.error_count - limit} more.")
+        return "\n".join(lines)
+
+
+def iter_roster_records(path, days=DAYS, shifts=SHIFTS):
+    """
+    Streams (line number, name, {day: {shift: priority}}, error) records from a CSV, JSON Lines
+    or JSON array file without reading it into memory. error is None for well-formed records.
+
+    CSV files need a 'name' column plus one column per day and shift, e.g. 'Monday Morning'.
+    JSON records look like {"name": ..., "preferences": {"Monday": {"Morning": 1, ...}, ...}}.
+    Blank or missing preferences default to DEFAULT_PRIORITY.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return _iter_csv_records(path, days, shifts)
+    if extension in (".jsonl", ".ndjson"):
+        return _iter_jsonl_records(path, days, shifts)
+    if extension == ".json":
+        return _iter_json_array_records(path, days, shifts)
+    raise ValueError(f"Unsupported roster file type '{extension}'. Use .csv, .jsonl or .json.")
+
+
+def _iter_csv_records(path, days, shifts):
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = {_column_key(column): i for i, column in enumerate(header)}
+        if "name" not in columns:
+            yield 1, None, None, "Header has no 'name' column."
+            return
+        name_column = columns["name"]
+        pref_columns = [[columns.get(_column_key(day + shift)) for shift in shifts] for day in days]
+
+        for row in reader:
+            line = reader.line_num
+            if not any(cell.strip() for cell in row):
+                continue
+            name = row[name_column].strip() if name_column < len(row) else ""
+            prefs = {day: {shift: (row[column].strip() if column is not None and column < len(row) else "")
+                           for shift, column in zip(shifts, day_columns)}
+                     for day, day_columns in zip(days, pref_columns)}
+            yield line, name, prefs, None
+
+
+def _json_record(line, record, days, shifts):
+    if not isinstance(record, dict):
+        return line, None, None, "Record is not a JSON object."
+    name = record.get("name")
+    name = name.strip() if isinstance(name, str) else ""
+    raw_prefs = record.get("preferences") or {}
+    if not isinstance(raw_prefs, dict):
+        return line, name, None, "'preferences' is not an object."
+    prefs = {}
+    for day in days:
+        day_prefs = raw_prefs.get(day) or {}
+        if not isinstance(day_prefs, dict):
+            return line, name, None, f"Preferences for {day} are not an object."
+        # A null priority counts as blank, like a missing one
+        prefs[day] = {shift: "" if day_prefs.get(shift) is None else str(day_prefs[shift]).strip() for shift in shifts}
+    return line, name, prefs, None
+
+
+def _iter_jsonl_records(path, days, shifts):
+    with open(path, encoding="utf-8") as file:
+        for line, text in enumerate(file, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except json.JSONDecodeError as e:
+                yield line, None, None, f"Invalid JSON: {e.msg}."
+                continue
+            yield _json_record(line, record, days, shifts)
+
+
+def _iter_json_array_records(path, days, shifts):
+    """Decodes the objects of a top-level JSON array one at a time, reading the file in chunks."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as file:
+        buffer, position, line = "", 0, 1
+        opened = at_eof = False
+        while True:
+            # Skip whitespace and array punctuation, reading more of the file as needed.
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n,[]":
+                    if buffer[position] == "]":
+                        return
+                    opened = opened or buffer[position] == "["
+                    line += buffer[position] == "\n"
+                    position += 1
+                if position < len(buffer) or at_eof:
+                    break
+                buffer, position, at_eof = _read_more(file, buffer, position)
+            if position == len(buffer):
+                return
+            if not opened:
+                yield line, None, None, "JSON roster files must contain an array of records."
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if at_eof:
+                    yield line, None, None, f"Invalid JSON: {e.msg}."
+                    return
+                # Most likely a record cut off at the end of the buffer.
+                buffer, position, at_eof = _read_more(file, buffer, position)
+                continue
+            yield _json_record(line, record, days, shifts)
+            line += buffer.count("\n", position, end)
+            position = end
+
+
+def _read_more(file, buffer, position):
+    """Drops the consumed part of buffer and appends the next chunk of file."""
+    chunk = file.read(_JSON_CHUNK_SIZE)
+    return buffer[position:] + chunk, 0, not chunk
+
+
+def import_roster(path, existing_names=(), days=DAYS, shifts=SHIFTS):
+    """
+    Imports a roster file in one streaming pass: validates each record, rejects duplicates
+    (case-insensitive, against existing_names and earlier rows) and builds both the GUI
+    preference dicts and the int8 preference array as it goes. Invalid rows are collected
+    into a batch error report instead of stopping the import.
+    """
+    return _collect(iter_roster_records(path, days, shifts), existing_names, days, shifts)
+
+
+def import_records(records, existing_names=(), days=DAYS, shifts=SHIFTS):
+    """
+    Imports already decoded JSON roster records, e.g. from a request body, with the same
+    validation as import_roster. Error line numbers are 1-based record positions.
+    """
+    return _collect((_json_record(line, record, days, shifts) for line, record in enumerate(records, start=1)),
+                    existing_names, days, shifts)
+
+
+def _collect(parsed_records, existing_names, days, shifts):
+    seen = {name_key(name) for name in existing_names}
+    employees, errors = [], []
+    error_count = rows_read = 0
+    prefs = np.empty((1024, len(days), len(shifts)), dtype=np.int8)
+
+    for line, name, record_prefs, error in parsed_records:
+        rows_read += 1
+        if error is None:
+            error = _validate(name, record_prefs, seen)
+        if error is not None:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append((line, error))
+            continue
+
+        for day in days:
+            for shift in shifts:
+                record_prefs[day][shift] = record_prefs[day][shift] or DEFAULT_PRIORITY
+        if len(employees) == len(prefs):
+            prefs = np.concatenate([prefs, np.empty_like(prefs)])
+        prefs[len(employees)] = [[int(record_prefs[day][shift]) for shift in shifts] for day in days]
+        seen.add(name_key(name))
+        employees.append((name, record_prefs))
+
+    return ImportResult(employees, prefs[:len(employees)].copy(), errors, error_count, rows_read, days, shifts)
+
+
+def _validate(name, prefs, seen):
+    """Returns an error message for an invalid record, or None."""
+    if not name:
+        return "Employee name is required."
+    if name_key(name) in seen:
+        return f"Duplicate employee '{name}'."
+    for day, day_prefs in prefs.items():
+        for shift, priority in day_prefs.items():
+            if priority and priority not in PRIORITY_LEVELS:
+                return f"Invalid priority '{priority}' for {day} {shift}; expected one of {', '.join(PRIORITY_LEVELS)}."
+    return None
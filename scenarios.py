@@ -0,0 +1,205 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from constraints import load_constraints
+from engine import DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK, GreedyPlan, generate_schedule
+from roster_io import import_roster
+from scoring import score_schedule
+from solvers import SOLVER_MODES, solve_in_worker
+
+TABLE_COLUMNS = ( # (heading, record key, format) of the comparison table
+    ("Scenario", "scenario", "{}"),
+    ("Per shift", "max_employees_per_shift", "{}"),
+    ("Workdays", "max_workdays_per_week", "{}"),
+    ("Removed", "removed", "{}"),
+    ("Coverage", "coverage", "{:.1%}"),
+    ("Open slots", "open_slots", "{}"),
+    ("Unresolved", "unresolved", "{}"),
+    ("Cost", "preference_cost", "{}"),
+    ("ms", "milliseconds", "{:.0f}"),
+)
+
+
+class Scenario:
+    """
+    One what-if variant of a roster: the staffing limits to use and the employees to leave out.
+    """
+
+    def __init__(self, max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                 max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, removed=(), name=None):
+        self.max_employees_per_shift = max_employees_per_shift
+        self.max_workdays_per_week = max_workdays_per_week
+        self.removed = tuple(removed)
+        self.name = name or self.describe()
+
+    def describe(self):
+        """Short label such as "3/shift, 4 days, without Alice"."""
+        label = f"{self.max_employees_per_shift}/shift, {self.max_workdays_per_week} days"
+        if self.removed:
+            label += f", without {', '.join(self.removed)}"
+        return label
+
+
+def scenario_grid(max_employees_per_shift=(DEFAULT_MAX_EMPLOYEES_PER_SHIFT,),
+                  max_workdays_per_week=(DEFAULT_MAX_WORKDAYS_PER_WEEK,), removals=((),)):
+    """
+    Returns a Scenario for every combination of the given per-shift limits, workday limits and
+    removals (each removal is a tuple of employee names; () keeps the full roster).
+    """
+    return [Scenario(per_shift, workdays, removed)
+            for removed, per_shift, workdays in itertools.product(removals, max_employees_per_shift,
+                                                                  max_workdays_per_week)]
+
+
+# Roster, solver settings, constraints and greedy plan shared by every scenario in a worker
+# process, set once by the pool initializer, as in multistart.
+_worker_state = None
+
+
+def _init_worker(roster, mode, seed, constraints):
+    global _worker_state
+    plan = GreedyPlan(roster) if mode == "greedy" else None
+    _worker_state = (roster, mode, seed, constraints, plan)
+
+
+def run_scenario(scenario):
+    """
+    Solves one scenario with the worker's shared state and returns its comparison record. A
+    scenario that cannot be solved, e.g. because it removes an unknown employee, yields a record
+    with an "error" instead of raising.
+    """
+    roster, mode, seed, constraints, plan = _worker_state
+    started = time.perf_counter()
+    record = {
+        "scenario": scenario.name,
+        "max_employees_per_shift": scenario.max_employees_per_shift,
+        "max_workdays_per_week": scenario.max_workdays_per_week,
+        "removed": list(scenario.removed),
+    }
+    try:
+        variant = roster.without(scenario.removed) if scenario.removed else roster
+        # Every scenario draws from the same seed, so differences come from the parameters alone.
+        rng = random.Random(seed) if seed is not None else None
+        if plan is not None:
+            schedule = generate_schedule(variant, scenario.max_employees_per_shift, scenario.max_workdays_per_week,
+                                         rng=rng, constraints=constraints, plan=plan)
+        else:
+            schedule = solve_in_worker(variant, mode, scenario.max_employees_per_shift,
+                                       scenario.max_workdays_per_week, rng=rng, constraints=constraints)
+    except ValueError as e:
+        record.update({"error": str(e), "milliseconds": (time.perf_counter() - started) * 1000})
+        return record
+
+    record.update(score_schedule(schedule))
+    record.update({
+        "open_slots": schedule.open_slots,
+        "unresolved_names": sorted(schedule.unresolved_names()),
+        "milliseconds": (time.perf_counter() - started) * 1000,
+    })
+    return record
+
+
+def run_sweep(roster, scenarios, mode="greedy", seed=None, max_workers=None, progress=None, constraints=None):
+    """
+    Solves every scenario of one roster across a process pool and returns their records in
+    scenario order. The roster is sent to each worker once and preprocessed once per worker
+    (see GreedyPlan); scenarios only copy the roster's active flags when they remove employees.
+    progress, if given, is called with each record as its scenario finishes.
+    """
+    if mode not in SOLVER_MODES:
+        raise ValueError(f"Unknown solver mode '{mode}'. Choose from: {', '.join(SOLVER_MODES)}.")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(32)
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(scenarios), 1))
+    records = []
+    if max_workers <= 1:
+        _init_worker(roster, mode, seed, constraints)
+        for scenario in scenarios:
+            records.append(run_scenario(scenario))
+            if progress:
+                progress(records[-1])
+        return records
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(roster, mode, seed, constraints)) as pool:
+        for record in pool.map(run_scenario, scenarios):
+            records.append(record)
+            if progress:
+                progress(record)
+    return records
+
+
+def format_table(records):
+    """Formats sweep records as a plain-text comparison table, one row per scenario."""
+    rows = []
+    for record in records:
+        if "error" not in record:
+            rows.append([template.format(", ".join(record[key]) if key == "removed" else record[key])
+                         for _, key, template in TABLE_COLUMNS])
+    headings = [heading for heading, _, _ in TABLE_COLUMNS]
+    widths = [max(len(cell) for cell in column) for column in zip(headings, *rows)]
+
+    def line(cells):
+        return "  ".join(cell.ljust(width) if i == 0 else cell.rjust(width)
+                         for i, (cell, width) in enumerate(zip(cells, widths)))
+
+    lines = [line(headings)]
+    rows = iter(rows)
+    for record in records:
+        lines.append(f"{record['scenario'].ljust(widths[0])}  FAILED: {record['error']}" if "error" in record
+                     else line(next(rows)))
+    return "\n".join(lines)
+
+
+def _int_list(text):
+    return [int(value) for value in text.split(",") if value.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare what-if scenarios for one roster: every combination of the given per-shift and "
+                    "workday limits and employee removals is scheduled in a process pool, and a table of "
+                    "coverage and unresolved employees is printed.")
+    parser.add_argument("roster", help="Roster file (CSV, JSON Lines or JSON).")
+    parser.add_argument("--max-employees-per-shift", type=_int_list, default=[DEFAULT_MAX_EMPLOYEES_PER_SHIFT],
+                        help="Comma-separated per-shift limits, e.g. 2,3,4.")
+    parser.add_argument("--max-workdays-per-week", type=_int_list, default=[DEFAULT_MAX_WORKDAYS_PER_WEEK],
+                        help="Comma-separated workday limits, e.g. 4,5.")
+    parser.add_argument("--remove", action="append", default=[], metavar="NAMES",
+                        help="Comma-separated employees to leave out, as one extra scenario per option; "
+                             "the full roster is always compared too.")
+    parser.add_argument("--mode", choices=list(SOLVER_MODES), default="greedy")
+    parser.add_argument("--seed", type=int, default=None, help="Seed shared by all scenarios.")
+    parser.add_argument("--constraints", default=None, help="JSON file with scheduling rules for every scenario.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the records to this JSON file.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU).")
+
+    args = parser.parse_args(argv)
+    try:
+        constraints = load_constraints(args.constraints) if args.constraints else None
+        result = import_roster(args.roster)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read input: {e}")
+        return 1
+    if not result.employees:
+        print(f"No valid employees ({result.error_count} rows rejected). {result.error_summary(3)}".strip())
+        return 1
+
+    removals = [()] + [tuple(name.strip() for name in names.split(",") if name.strip()) for names in args.remove]
+    scenarios = scenario_grid(args.max_employees_per_shift, args.max_workdays_per_week, removals)
+    records = run_sweep(result.to_roster(), scenarios, args.mode, args.seed, args.workers, constraints=constraints)
+    print(format_table(records))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as file:
+            json.dump(records, file, indent=2)
+    return 1 if any("error" in record for record in records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
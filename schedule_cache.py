@@ -0,0 +1,223 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from engine import DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK, Schedule
+from solvers import solve
+
+CACHE_FORMAT_VERSION = 1 # Bump when the cached payload or any solver's output changes
+DEFAULT_MEMORY_ENTRIES = 64
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+STALE_TEMPORARY_SECONDS = 3600 # Age after which a leftover .tmp file of an interrupted write is deleted
+
+
+def schedule_key(roster, mode, max_employees_per_shift, max_workdays_per_week, seed=None, constraints=None):
+    """
+    Stable content hash of everything that determines a solver's output: the active employees
+    in roster order with their preferences, the day/shift definitions, the limits, the solver
+    mode, the seed and the constraints, if any.
+    """
+    active = roster.active_indices()
+    digest = hashlib.sha256()
+    header = {
+        "version": CACHE_FORMAT_VERSION,
+        "days": roster.days,
+        "shifts": roster.shifts,
+        "names": [roster.names[e] for e in active],
+        "mode": mode,
+        "max_employees_per_shift": max_employees_per_shift,
+        "max_workdays_per_week": max_workdays_per_week,
+        "seed": seed,
+    }
+    if constraints:
+        header["constraints"] = constraints.to_records()
+    digest.update(json.dumps(header, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    digest.update(np.ascontiguousarray(roster.prefs[active]).tobytes())
+    return digest.hexdigest()
+
+
+def _to_payload(schedule):
+    """Serializes a schedule using positions among the roster's active employees."""
+    position = {e: i for i, e in enumerate(schedule.roster.active_indices())}
+    return {
+        "slots": [[[position[e] for e in slot] for slot in day_slots] for day_slots in schedule.slots],
+        "unresolved": sorted(position[e] for e in schedule.unresolved),
+        "seed": schedule.seed,
+    }
+
+
+def _from_payload(payload, roster, max_employees_per_shift, max_workdays_per_week, constraints=None):
+    """Rebuilds a fresh, independently mutable Schedule from a cached payload."""
+    active = roster.active_indices()
+    schedule = Schedule(roster, max_employees_per_shift, max_workdays_per_week, constraints)
+    for d, day_slots in enumerate(payload["slots"]):
+        for s, slot in enumerate(day_slots):
+            for i in slot:
+                schedule.place(active[i], d, s)
+    for i in payload["unresolved"]:
+        schedule.mark_unresolved(active[i])
+    schedule.seed = payload["seed"]
+    schedule.record_violations()
+    schedule.metrics.details["cache_hit"] = True
+    return schedule
+
+
+class ScheduleCache:
+    """
+    Two-tier cache of solver results keyed by schedule_key: an in-memory LRU of up to
+    memory_entries payloads, and an optional directory of JSON files trimmed to disk_bytes by
+    evicting the least recently used files. Hit and miss counters are available from stats().
+    """
+
+    def __init__(self, memory_entries=DEFAULT_MEMORY_ENTRIES, disk_dir=None, disk_bytes=DEFAULT_DISK_BYTES):
+        self.memory_entries = memory_entries
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def solve(self, roster, mode="greedy", max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+              max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, seed=None, progress=None, constraints=None):
+        """
+        Returns the schedule for these inputs from the cache, or solves and stores it.
+        A seed makes the solver's randomness reproducible; without one, the first result
+        computed for an input is the one that keeps being returned. progress is passed to the
+        solver on a miss; a run aborted from it stores nothing.
+        """
+        key = schedule_key(roster, mode, max_employees_per_shift, max_workdays_per_week, seed, constraints)
+        payload = self.get(key)
+        if payload is None:
+            rng = random.Random(seed) if seed is not None else None
+            schedule = solve(roster, mode, max_employees_per_shift, max_workdays_per_week, rng=rng, progress=progress,
+                             constraints=constraints)
+            self.put(key, _to_payload(schedule))
+            return schedule
+        return _from_payload(payload, roster, max_employees_per_shift, max_workdays_per_week, constraints)
+
+    def get(self, key):
+        """Returns the cached payload for key, or None, updating the hit/miss counters."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, payload)
+        return payload
+
+    def put(self, key, payload):
+        """Stores a payload in memory and, if configured, on disk."""
+        with self._lock:
+            self._remember(key, payload)
+        if self.disk_dir:
+            self._write_disk(key, payload)
+
+    def clear(self):
+        """Drops the in-memory tier; the disk tier is left alone."""
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self):
+        """Returns the hit/miss counters and the current size of each tier."""
+        with self._lock:
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+            }
+        if self.disk_dir:
+            stats["disk_bytes"] = sum(size for _, size, _ in self._disk_entries())
+        return stats
+
+    def _remember(self, key, payload):
+        self._memory[key] = payload
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                payload = json.load(file)
+            os.utime(path) # Mark as recently used for eviction
+            return payload
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, payload):
+        # Write to a temporary file and rename, so readers never see a partial entry.
+        try:
+            descriptor, temporary = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(payload, file, separators=(",", ":"))
+            os.replace(temporary, self._path(key))
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+            return
+        self._evict_disk()
+
+    def _disk_entries(self):
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict_disk(self):
+        """
+        Deletes least recently used files until the disk tier fits in disk_bytes, and temporary
+        files left behind by writes interrupted more than STALE_TEMPORARY_SECONDS ago.
+        """
+        stale = time.time() - STALE_TEMPORARY_SECONDS
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".tmp"):
+                try:
+                    if entry.stat().st_mtime < stale:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,39 @@
+# Week layout, limits and option names shared by every module. This module must stay free of
+# heavy imports: the GUI builds its main window from it before NumPy or the solvers are loaded.
+import json
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+SHIFTS = ["Morning", "Afternoon", "Evening"]
+PRIORITY_LEVELS = ("1", "2", "3") # 1 is the highest preference, 3 the lowest
+
+DEFAULT_MAX_EMPLOYEES_PER_SHIFT = 2
+DEFAULT_MAX_WORKDAYS_PER_WEEK = 5
+
+# Names of solvers.SOLVER_MODES and schedule_export.EXPORT_FORMATS, for menus that are shown
+# before those modules are imported. Keep them in sync with the registries.
+SOLVER_MODE_NAMES = ("greedy", "optimal", "multistart")
+EXPORT_FORMAT_NAMES = ("summary csv", "long csv", "pivot csv", "jsonl", "npz")
+
+
+def name_key(name):
+    """Case-folded key used to detect duplicate employee names."""
+    return name.strip().casefold()
+
+
+def load_week_layout(path):
+    """
+    Reads a custom week layout from a JSON file such as
+    {"days": ["Mon", "Tue", ...], "shifts": ["Early", "Late"]} and returns (days, shifts).
+    Missing keys fall back to DAYS and SHIFTS.
+    """
+    with open(path, encoding="utf-8") as file:
+        layout = json.load(file)
+    if not isinstance(layout, dict):
+        raise ValueError(f"'{path}' must contain an object with 'days' and/or 'shifts'.")
+    days, shifts = layout.get("days", DAYS), layout.get("shifts", SHIFTS)
+    for key, names in (("days", days), ("shifts", shifts)):
+        if not isinstance(names, list) or not names or not all(isinstance(name, str) and name for name in names):
+            raise ValueError(f"'{key}' must be a non-empty list of names.")
+        if len(set(names)) != len(names):
+            raise ValueError(f"'{key}' contains duplicate names.")
+    return list(days), list(shifts)
@@ -0,0 +1,164 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from engine import UNASSIGNED
+
+EXPORT_CHUNK_ROWS = 4096 # Rows formatted and written per batch
+EXPORT_BUFFER_BYTES = 1 << 20 # Write buffer of the output file
+
+
+class ScheduleSnapshot:
+    """
+    Columnar copy of a schedule's assignments, taken on the UI thread so the export can run
+    in the background while the live schedule keeps changing.
+    employee/day/shift/priority: one entry per assignment, ordered by day, shift and slot.
+    assigned_shift: shift index per active employee and day (or UNASSIGNED), for the pivot.
+    """
+
+    def __init__(self, schedule):
+        roster = schedule.roster
+        assignments = np.array(list(schedule.assignments()), dtype=np.int64).reshape(-1, 3)
+        self.employee = assignments[:, 0].astype(np.int32)
+        # Horizons have one day per calendar day, so the day index may not fit in int8
+        self.day = assignments[:, 1].astype(_index_dtype(len(roster.days)))
+        self.shift = assignments[:, 2].astype(_index_dtype(len(roster.shifts)))
+        self.priority = roster.prefs[self.employee, self.day, self.shift]
+        self.names = list(roster.names)
+        self.active = roster.active_indices()
+        self.assigned_shift = schedule.assigned_shift[self.active].copy()
+        self.days = list(roster.days)
+        self.shifts = list(roster.shifts)
+
+    def __len__(self):
+        return len(self.employee)
+
+
+def _index_dtype(count):
+    """Smallest signed integer type that holds the indices 0..count-1."""
+    for dtype in (np.int8, np.int16):
+        if count <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.int32
+
+
+def _chunks(rows, progress, phase, total):
+    """Groups rows into lists of EXPORT_CHUNK_ROWS, reporting progress after each one."""
+    chunk, written = [], 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == EXPORT_CHUNK_ROWS:
+            yield chunk
+            written += len(chunk)
+            chunk = []
+            if progress is not None:
+                progress(phase, 100 * written // max(total, 1), written)
+    if chunk:
+        yield chunk
+
+
+def _summary_rows(snapshot):
+    """One row per day and shift with the names joined by commas (the original export format)."""
+    names = snapshot.names
+    for d, day in enumerate(snapshot.days):
+        for s, shift in enumerate(snapshot.shifts):
+            slot = snapshot.employee[(snapshot.day == d) & (snapshot.shift == s)]
+            yield [day, shift, ", ".join(names[e] for e in slot.tolist())]
+
+
+def _long_rows(snapshot):
+    """One row per assignment."""
+    names, days, shifts = snapshot.names, snapshot.days, snapshot.shifts
+    for e, d, s, p in zip(snapshot.employee.tolist(), snapshot.day.tolist(), snapshot.shift.tolist(),
+                          snapshot.priority.tolist()):
+        yield [names[e], days[d], shifts[s], p]
+
+
+def _pivot_rows(snapshot):
+    """One row per employee with their shift on each day and their number of workdays."""
+    shifts = snapshot.shifts + [""] # UNASSIGNED (-1) picks the trailing blank
+    names = snapshot.names
+    for e, week in zip(snapshot.active, snapshot.assigned_shift.tolist()):
+        yield [names[e]] + [shifts[s] for s in week] + [sum(s != UNASSIGNED for s in week)]
+
+
+def _write_csv(path, header, rows, progress, phase, total):
+    with open(path, "w", newline="", encoding="utf-8", buffering=EXPORT_BUFFER_BYTES) as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for chunk in _chunks(rows, progress, phase, total):
+            writer.writerows(chunk)
+    return total
+
+
+def export_summary_csv(snapshot, path, progress=None):
+    """Writes Day, Shift, Employees rows, one per shift slot."""
+    return _write_csv(path, ["Day", "Shift", "Employees"], _summary_rows(snapshot), progress, "summary",
+                      len(snapshot.days) * len(snapshot.shifts))
+
+
+def export_long_csv(snapshot, path, progress=None):
+    """Writes Employee, Day, Shift, Priority rows, one per assignment."""
+    return _write_csv(path, ["Employee", "Day", "Shift", "Priority"], _long_rows(snapshot), progress, "long",
+                      len(snapshot))
+
+
+def export_pivot_csv(snapshot, path, progress=None):
+    """Writes one row per employee: their shift on each day (blank if off) and their workdays."""
+    return _write_csv(path, ["Employee"] + snapshot.days + ["Workdays"], _pivot_rows(snapshot), progress, "pivot",
+                      len(snapshot.active))
+
+
+def export_jsonl(snapshot, path, progress=None):
+    """Writes one {"employee", "day", "shift", "priority"} JSON object per assignment and line."""
+    with open(path, "w", encoding="utf-8", buffering=EXPORT_BUFFER_BYTES) as file:
+        for chunk in _chunks(_long_rows(snapshot), progress, "jsonl", len(snapshot)):
+            file.write("".join(json.dumps({"employee": name, "day": day, "shift": shift, "priority": priority}) + "\n"
+                               for name, day, shift, priority in chunk))
+    return len(snapshot)
+
+
+def export_npz(snapshot, path, progress=None):
+    """
+    Writes a compressed NumPy archive with one column per field: employee, day and shift indices,
+    priority, plus the names, days and shifts they index into. Load with np.load(path).
+    """
+    with open(path, "wb") as file: # A file object keeps np.savez from appending ".npz" to the name
+        np.savez_compressed(file, employee=snapshot.employee, day=snapshot.day, shift=snapshot.shift,
+                            priority=snapshot.priority, names=np.array(snapshot.names, dtype=str),
+                            days=np.array(snapshot.days, dtype=str), shifts=np.array(snapshot.shifts, dtype=str))
+    if progress is not None:
+        progress("npz", 100, len(snapshot))
+    return len(snapshot)
+
+
+# Export formats by name: (writer, default file extension, file dialog label)
+EXPORT_FORMATS = {
+    "summary csv": (export_summary_csv, ".csv", "CSV files"),
+    "long csv": (export_long_csv, ".csv", "CSV files"),
+    "pivot csv": (export_pivot_csv, ".csv", "CSV files"),
+    "jsonl": (export_jsonl, ".jsonl", "JSON Lines files"),
+    "npz": (export_npz, ".npz", "NumPy archives"),
+}
+
+
+def export_schedule(snapshot, path, export_format="summary csv", progress=None):
+    """
+    Writes a schedule snapshot to path in one of EXPORT_FORMATS and returns (path, rows written).
+    The file is written next to its destination and renamed into place when complete, so a
+    failed or cancelled export never leaves a partial file behind.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}'. Choose from: {', '.join(EXPORT_FORMATS)}.")
+    writer = EXPORT_FORMATS[export_format][0]
+    temporary = f"{path}.part"
+    try:
+        rows = writer(snapshot, temporary, progress)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    return path, rows
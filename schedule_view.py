@@ -0,0 +1,184 @@
+import sys
+
+import customtkinter as ctk
+
+from engine import UNASSIGNED
+
+CELL_ROWS = 8 # Names rendered per schedule cell; longer lists scroll
+LINE_HEIGHT = 17 # Pixels per name at the cell font size
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    A fixed-height list of names that only renders the rows in view.
+    One label shows items[first:first + rows]; scrolling re-texts that label instead of
+    creating a widget per name, so a cell with thousands of names costs the same as one with ten.
+    """
+
+    def __init__(self, master, rows=CELL_ROWS):
+        super().__init__(master, fg_color="white", corner_radius=8)
+        self.rows = rows
+        self.items = []
+        self.first = 0
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.label = ctk.CTkLabel(self, text="", height=rows * LINE_HEIGHT, anchor="n",
+                                  wraplength=130, justify="center", text_color="black",
+                                  font=("Helvetica", 11))
+        self.label.grid(row=0, column=0, padx=(15, 5), pady=10, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar, width=12)
+
+        # Mouse wheel: <MouseWheel> on Windows and macOS, buttons 4/5 on X11
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.label.bind(sequence, self._on_mouse_wheel)
+
+    def set_items(self, items):
+        """Replaces the list contents, keeping the scroll position where possible."""
+        self.items = items
+        self.first = max(0, min(self.first, len(items) - self.rows))
+        if len(items) > self.rows:
+            self.scrollbar.grid(row=0, column=1, padx=(0, 3), pady=8, sticky="ns")
+        else:
+            self.scrollbar.grid_remove()
+        self._render()
+
+    def scroll_to(self, first):
+        """Shows the rows starting at index first."""
+        first = max(0, min(first, len(self.items) - self.rows))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def _render(self):
+        self.label.configure(text="\n".join(self.items[self.first:self.first + self.rows]))
+        if len(self.items) > self.rows:
+            self.scrollbar.set(self.first / len(self.items), (self.first + self.rows) / len(self.items))
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.items)))
+        elif unit == "pages":
+            self.scroll_to(self.first + int(amount) * self.rows)
+        else:
+            self.scroll_to(self.first + int(amount))
+
+    def _on_mouse_wheel(self, event):
+        if event.num == 4:
+            step = -1
+        elif event.num == 5:
+            step = 1
+        elif sys.platform == "darwin":
+            step = -event.delta
+        else:
+            step = -int(event.delta / 40)
+        self.scroll_to(self.first + step)
+
+
+class ScheduleView:
+    """
+    Persistent weekly schedule window. The grid of cells is built once; closing the window only
+    hides it, and refresh() re-texts just the cells whose names changed. Below the grid, an
+    employee lookup reads one employee's week straight from the schedule's per-employee
+    assigned_shift row instead of scanning every cell.
+    """
+
+    def __init__(self, root, days, shifts):
+        self.root = root
+        self.days = days
+        self.shifts = shifts
+        self.schedule = None # Engine Schedule currently shown, or None for an empty grid
+        self._shown = {} # (day index, shift index) -> tuple of names currently rendered
+
+        top = self.top = ctk.CTkToplevel(root)
+        top.title("WEEKLY SCHEDULE")
+        top.transient(root)
+        top.geometry("1000x560")
+        top.configure(fg_color="#F8F8F8")
+        top.protocol("WM_DELETE_WINDOW", self.hide)
+
+        # Configure grid column and row weights for better resizing behavior
+        top.grid_columnconfigure(0, weight=0)
+        for i in range(1, len(days) + 1):
+            top.grid_columnconfigure(i, weight=1)
+        for j in range(1, len(shifts) + 1):
+            top.grid_rowconfigure(j, weight=1)
+
+        # Top-left empty cell for alignment
+        ctk.CTkLabel(top, text="", width=10).grid(row=0, column=0)
+
+        # Create day headers
+        for i, day in enumerate(days):
+            ctk.CTkLabel(top, text=day, font=("Segoe UI", 14, "bold")).grid(row=0, column=i+1, padx=8, pady=8, sticky="nsew")
+
+        # Create shift headers and the reusable schedule cells
+        self.cells = {}
+        for j, shift in enumerate(shifts):
+            ctk.CTkLabel(top, text=shift, font=("Arial", 14, "bold")).grid(row=j+1, column=0, padx=8, pady=8, sticky="nsew")
+            for i in range(len(days)):
+                cell = VirtualList(top)
+                cell.grid(row=j+1, column=i+1, padx=5, pady=5, sticky="nsew")
+                self.cells[i, j] = cell
+
+        # Per-employee view
+        lookup = ctk.CTkFrame(top, fg_color="transparent")
+        lookup.grid(row=len(shifts)+1, column=0, columnspan=len(days)+1, pady=(10, 0))
+        ctk.CTkLabel(lookup, text="Employee:", font=("Helvetica", 13, "bold")).pack(side="left", padx=(0, 10))
+        self.employee_entry = ctk.CTkEntry(lookup, corner_radius=8, font=("Helvetica", 12), width=200)
+        self.employee_entry.pack(side="left")
+        self.employee_entry.bind("<Return>", lambda event: self.show_employee())
+        ctk.CTkButton(lookup, text="SHOW WEEK", command=self.show_employee, font=("Arial", 12, "bold"),
+                      corner_radius=10, fg_color="#3683D9", hover_color="#2A6BAB", width=100).pack(side="left", padx=10)
+        self.employee_week = ctk.CTkLabel(top, text="", font=("Helvetica", 12), text_color="black", wraplength=900)
+        self.employee_week.grid(row=len(shifts)+2, column=0, columnspan=len(days)+1, pady=5)
+
+        # Add a close button at the bottom of the schedule window
+        ctk.CTkButton(top, text="CLOSE", command=self.hide, font=("Arial", 13, "bold"),
+                      corner_radius=10, fg_color="#4682B4", hover_color="#36648B").grid(row=len(shifts)+3, column=0, columnspan=len(days)+1, pady=15)
+
+        top.resizable(True, True)
+
+    def refresh(self, schedule):
+        """
+        Shows an engine Schedule (or an empty grid for None), updating only the cells whose
+        list of names differs from what is on screen.
+        """
+        self.schedule = schedule
+        for (i, j), cell in self.cells.items():
+            if schedule is None:
+                names = ()
+            else:
+                names = tuple(schedule.roster.names[e] for e in schedule.slots[i][j])
+            if self._shown.get((i, j)) != names:
+                self._shown[i, j] = names
+                cell.set_items(list(names))
+        if self.employee_week.cget("text"):
+            self.show_employee()
+
+    def show_employee(self):
+        """Shows the week of the employee named in the lookup entry."""
+        name = self.employee_entry.get().strip()
+        if not name:
+            self.employee_week.configure(text="")
+            return
+        schedule = self.schedule
+        roster = schedule.roster if schedule is not None else None
+        e = roster.index_of.get(name) if roster is not None else None
+        if e is None or not roster.active[e]:
+            self.employee_week.configure(text=f"'{name}' is not in the current schedule.")
+            return
+        week = []
+        for d, s in enumerate(schedule.assigned_shift[e].tolist()):
+            week.append(f"{self.days[d]}: {self.shifts[s] if s != UNASSIGNED else '-'}")
+        self.employee_week.configure(text=f"{name} ({schedule.index.workdays[e]} days)    " + "   |   ".join(week))
+
+    def show(self):
+        """Brings the window up; it stays modal like the other dialogs while it is open."""
+        self.top.deiconify()
+        self.top.lift()
+        self.top.grab_set()
+
+    def hide(self):
+        """Hides the window, keeping its widgets for the next show()."""
+        self.top.grab_release()
+        self.top.withdraw()
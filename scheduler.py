@@ -1,17 +1,31 @@
+import time
+_STARTED = time.perf_counter() # Start of the startup timing report
+
 import customtkinter as ctk
-import tkinter.messagebox as messagebox
+import tkinter.messagebox as messagebox # Already imported by customtkinter, so these cost nothing extra
 import tkinter.filedialog as filedialog
-import random
-import csv
+import os
+import sys
 from collections import defaultdict
-import threading
 
-DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-SHIFTS = ["Morning", "Afternoon", "Evening"]
+# Only what the main window needs is imported here. NumPy, the solvers, storage and the
+# secondary windows are imported by the methods that use them, on first use.
+from employee_directory import EmployeeDirectory
+from jobs import JobExecutor
+from preference_grid import PreferenceGrid
+from schedule_config import (DAYS, SHIFTS, PRIORITY_LEVELS, DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                             DEFAULT_MAX_WORKDAYS_PER_WEEK, SOLVER_MODE_NAMES, EXPORT_FORMAT_NAMES)
+
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".employee_scheduler.db")
+_IMPORTED = time.perf_counter()
 
 class SchedulerApp:
-    MAX_EMPLOYEES_PER_SHIFT = 2 # Max employees allowed per shift for any given shift on any day
-    MAX_WORKDAYS_PER_WEEK = 5 # Max days an employee can work in a week
+    MAX_EMPLOYEES_PER_SHIFT = DEFAULT_MAX_EMPLOYEES_PER_SHIFT # Max employees allowed per shift for any given shift on any day
+    MAX_WORKDAYS_PER_WEEK = DEFAULT_MAX_WORKDAYS_PER_WEEK # Max days an employee can work in a week
+    JOB_POLL_INTERVAL_MS = 50 # How often the UI drains progress events of a running generation
+    EMPLOYEE_PAGE_SIZE = 15 # Rows per page of the employee manager's search results
+    SEARCH_DELAY_MS = 150 # Typing pause after which the employee search runs
+    IMPORT_REPAIR_CHUNK = 250 # Imported employees fitted into the schedule per main-loop turn
 
     def __init__(self, root):
         """
@@ -19,6 +33,10 @@ class SchedulerApp:
         Sets up the main window, appearance mode, and core data structures.
         Aesthetics: Sets root window background and overall theme.
         """
+        # Seconds spent in each startup step, shown in the RUN METRICS window
+        self.startup_times = {"imports": _IMPORTED - _STARTED}
+        self._startup_mark = _IMPORTED
+
         # Set the overall appearance and color theme
         ctk.set_appearance_mode("light")
         ctk.set_default_color_theme("blue")
@@ -34,7 +52,9 @@ class SchedulerApp:
         # Set a softer background color for the main window
         self.root.configure(fg_color="#E8E8E8")
         
-        self.employees = [] # List to store employee data: [(name, {day: {shift: priority}})]
+        # Employees by stable id, with the case-folded name index behind duplicate checks and search
+        self.directory = EmployeeDirectory()
+        self.selected_employee = None # Id of the employee shown in the employee manager
 
         # Main frame to contain all UI elements, now using grid for centering
         self.main_frame = ctk.CTkFrame(self.root, corner_radius=15)
@@ -44,17 +64,88 @@ class SchedulerApp:
         self.main_frame.grid_columnconfigure(0, weight=1)
         self.main_frame.grid_rowconfigure(0, weight=0) # input_frame
         self.main_frame.grid_rowconfigure(1, weight=0) # button_frame
-        
+        self.mark_startup("window")
+
         self.build_input_frame()
+        self.mark_startup("input_frame")
         self.build_button_frame()
-        
+        self.mark_startup("button_frame")
+
         # defaultdict for storing the final schedule: schedule[day][shift] = [employee1, employee2, ...]
         self.schedule = defaultdict(lambda: defaultdict(list))
         
         # defaultdict to keep track of total workdays assigned to each employee
         self.workdays = defaultdict(int)
 
+        # Repairs the last generated schedule in place on roster edits (None until a schedule exists)
+        self.repairer = None
+
+        # Weekly schedule window, created on first use and reused afterwards
+        self.schedule_view = None
+
+        # Secondary windows by name, built on first open and then only hidden and shown again
+        self.windows = {}
+
+        # Metrics record of the last generation run, shown by show_run_metrics
+        self.last_run_metrics = None
+
+        # Solver results keyed by roster and settings; set SCHEDULER_CACHE_DIR to also keep them on disk.
+        # Created by the first generation job, so the solvers are not imported at startup.
+        self.schedule_cache = None
+
         self.progress_label = None # Initialize progress label as None
+        self.progress_frame = None
+        self.progress_bar = None
+
+        # Single background executor for generation runs; events are drained by poll_generation_jobs
+        self.jobs = JobExecutor()
+        self.generation_job = None # Id of the latest submitted generation job
+        self.job_poll_scheduled = None # Pending root.after id of poll_generation_jobs
+        self.roster_version = 0 # Bumped on every roster edit, to detect results of an outdated roster
+
+        # Roster and schedule history persist in a local SQLite database (SCHEDULER_DB overrides the path).
+        # All database work runs in order on its own thread, which also opens the store. The saved
+        # roster is loaded once the window has been drawn (see finish_startup).
+        self.store = None
+        self.store_jobs = JobExecutor(coalesce=False)
+        self.store_poll_scheduled = None # Pending root.after id of poll_store_jobs
+        self.store_callbacks = {} # Storage job id -> function called with its result (see query_store)
+        self.roster_load_job = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Exports run one after another in the background; none of them is dropped
+        self.export_jobs = JobExecutor(coalesce=False)
+        self.export_poll_scheduled = None # Pending root.after id of poll_export_jobs
+
+        # Roster files are read in the background; the imported employees are then fitted into the
+        # current schedule a chunk at a time (see repair_imported), so the window stays responsive
+        self.import_jobs = JobExecutor(coalesce=False)
+        self.import_poll_scheduled = None # Pending root.after id of poll_import_jobs
+
+        # What-if sweeps run in the background; a new sweep replaces a pending one
+        self.sweep_jobs = JobExecutor()
+        self.sweep_poll_scheduled = None # Pending root.after id of poll_sweep_jobs
+        self.mark_startup("state")
+        self.root.after_idle(self.finish_startup)
+
+    def mark_startup(self, step):
+        """Records the time since the previous startup step under step."""
+        now = time.perf_counter()
+        self.startup_times[step] = now - self._startup_mark
+        self._startup_mark = now
+
+    def finish_startup(self):
+        """
+        Runs once the main window is first idle: completes the startup timing report and starts
+        loading the saved roster. Set SCHEDULER_STARTUP_REPORT to print the report to stderr.
+        """
+        self.mark_startup("first_idle")
+        self.startup_times["total"] = self._startup_mark - _STARTED
+        if os.environ.get("SCHEDULER_STARTUP_REPORT"):
+            print("Startup: " + ", ".join(f"{step} {seconds * 1000:.1f} ms"
+                                          for step, seconds in self.startup_times.items()), file=sys.stderr)
+        self.roster_load_job = self.store_jobs.submit(self._load_saved_roster)
+        self.poll_store_jobs()
 
     def build_input_frame(self):
         """
@@ -72,24 +163,17 @@ class SchedulerApp:
         self.name_entry = ctk.CTkEntry(top_row, corner_radius=8, font=("Helvetica", 12))
         self.name_entry.pack(side="left", fill="x", expand=True)
 
-        # Dictionary to store references to priority StringVar objects for each shift per day
-        self.shift_priority_vars = defaultdict(dict) 
-
         # Frame to hold the main content: left column for day/shift/priority, right for legend
         content_frame = ctk.CTkFrame(frame, fg_color="transparent")
         content_frame.pack(fill="x", expand=True, pady=(10, 20))
 
-        # Container for preference input rows (no scrolling)
+        # Container for the preference grid (no scrolling)
         self.preference_input_container = ctk.CTkFrame(content_frame, corner_radius=15, fg_color="#F0F0F0")
         self.preference_input_container.pack(side="left", fill="x", padx=(15, 15), pady=15)
 
-        # Headers for Day, Morning, Afternoon, Evening (with priorities)
-        headers = ctk.CTkFrame(self.preference_input_container, fg_color="transparent")
-        headers.pack(fill="x", pady=(8, 5))
-        ctk.CTkLabel(headers, text="Day", width=80, anchor="w", font=("Helvetica", 12, "bold")).pack(side="left", padx=(10,5))
-        ctk.CTkLabel(headers, text="Morning", width=110, anchor="center", font=("Helvetica", 12, "bold")).pack(side="left", padx=(15,15))
-        ctk.CTkLabel(headers, text="Afternoon", width=110, anchor="center", font=("Helvetica", 12, "bold")).pack(side="left", padx=(15,15))
-        ctk.CTkLabel(headers, text="Evening", width=110, anchor="center", font=("Helvetica", 12, "bold")).pack(side="left", padx=(15,15))
+        # Priority per day and shift, drawn on one canvas instead of one option menu per cell
+        self.preference_grid = PreferenceGrid(self.preference_input_container, DAYS, SHIFTS, PRIORITY_LEVELS)
+        self.preference_grid.pack(padx=10, pady=8)
 
         # Right column for Priority Legend
         right_column = ctk.CTkFrame(content_frame, corner_radius=15, fg_color="#F0F0F0")
@@ -98,24 +182,10 @@ class SchedulerApp:
         ctk.CTkLabel(right_column, text="1 - Highest Preference", font=("Helvetica", 12), wraplength=150).pack(anchor="w", padx=25, pady=4)
         ctk.CTkLabel(right_column, text="2 - Medium Preference", font=("Helvetica", 12), wraplength=150).pack(anchor="w", padx=25, pady=4)
         ctk.CTkLabel(right_column, text="3 - Lowest Preference\n(Assigned if no other option)", font=("Helvetica", 12), justify="left", wraplength=150).pack(anchor="w", padx=25, pady=4)
+        ctk.CTkLabel(right_column, text="Click a cell to change its priority; right-click to go back.", font=("Helvetica", 11),
+                     text_color="gray30", justify="left", wraplength=150).pack(anchor="w", padx=25, pady=(10, 4))
 
-
-        for day in DAYS:
-            row = ctk.CTkFrame(self.preference_input_container, fg_color="transparent")
-            row.pack(fill="x", pady=2)
-            ctk.CTkLabel(row, text=day, width=80, anchor="w", font=("Helvetica", 12)).pack(side="left", padx=(10, 5))
-
-            for shift in SHIFTS:
-                priority = ctk.StringVar(value="1")
-                dropdown = ctk.CTkOptionMenu(row, variable=priority, values=["1", "2", "3"], 
-                                             fg_color="white", button_color="#6495ED",
-                                             button_hover_color="#5580C2",
-                                             text_color="black", 
-                                             width=110, corner_radius=8, font=("Helvetica", 12))
-                dropdown.pack(side="left", padx=(15, 15))
-                self.shift_priority_vars[day][shift] = priority
-
-        # Frame for Add and Edit/Remove Employee buttons
+        # Frame for Add and Manage Employee buttons
         employee_button_frame = ctk.CTkFrame(frame, fg_color="transparent")
         employee_button_frame.pack(pady=15)
         
@@ -123,14 +193,48 @@ class SchedulerApp:
         ctk.CTkButton(employee_button_frame, text="ADD EMPLOYEE", command=self.add_employee, font=("Helvetica", 13, "bold"), 
                       corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(side="left", padx=5)
         
-        # Edit/Remove Employees button
-        ctk.CTkButton(employee_button_frame, text="EDIT/REMOVE EMPLOYEES", command=self.edit_employees, font=("Arial", 13, "bold"),
+        # Manage Employees button (search, edit and remove)
+        ctk.CTkButton(employee_button_frame, text="MANAGE EMPLOYEES", command=self.edit_employees, font=("Arial", 13, "bold"),
+                      corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(side="left", padx=5)
+
+        # Bulk import button (CSV / JSON Lines / JSON roster files)
+        ctk.CTkButton(employee_button_frame, text="IMPORT ROSTER", command=self.import_roster_file, font=("Arial", 13, "bold"),
                       corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(side="left", padx=5)
 
     def build_button_frame(self):
         """
         Creates the horizontal frame for the main action buttons.
         """
+        # Solver mode selection: "greedy" runs the three phases, "optimal" the min-cost flow solver
+        mode_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        mode_frame.pack(pady=(5, 0))
+        ctk.CTkLabel(mode_frame, text="Solver:", font=("Helvetica", 13, "bold")).pack(side="left", padx=(0, 10))
+        self.solver_mode = ctk.StringVar(value="greedy")
+        ctk.CTkOptionMenu(mode_frame, variable=self.solver_mode, values=list(SOLVER_MODE_NAMES),
+                          fg_color="white", button_color="#6495ED",
+                          button_hover_color="#5580C2", text_color="black",
+                          width=130, corner_radius=8, font=("Helvetica", 12)).pack(side="left")
+
+        # Export format used by EXPORT SCHEDULE
+        ctk.CTkLabel(mode_frame, text="Export:", font=("Helvetica", 13, "bold")).pack(side="left", padx=(15, 10))
+        self.export_format = ctk.StringVar(value="summary csv")
+        ctk.CTkOptionMenu(mode_frame, variable=self.export_format, values=list(EXPORT_FORMAT_NAMES),
+                          fg_color="white", button_color="#6495ED",
+                          button_hover_color="#5580C2", text_color="black",
+                          width=130, corner_radius=8, font=("Helvetica", 12)).pack(side="left")
+
+        # Run Metrics button: timings and counters of the last generation
+        ctk.CTkButton(mode_frame, text="RUN METRICS", command=self.show_run_metrics, font=("Arial", 12, "bold"),
+                      corner_radius=10, fg_color="#4682B4", hover_color="#36648B", width=110).pack(side="left", padx=(15, 0))
+
+        # What-if button: compares schedules under other staffing limits or without some employees
+        ctk.CTkButton(mode_frame, text="WHAT-IF", command=self.show_what_if, font=("Arial", 12, "bold"),
+                      corner_radius=10, fg_color="#4682B4", hover_color="#36648B", width=90).pack(side="left", padx=(10, 0))
+
+        # History button: saved schedules, roster snapshots and per-employee history
+        ctk.CTkButton(mode_frame, text="HISTORY", command=self.show_history, font=("Arial", 12, "bold"),
+                      corner_radius=10, fg_color="#4682B4", hover_color="#36648B", width=90).pack(side="left", padx=(10, 0))
+
         button_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
         button_frame.pack(pady=10)
         
@@ -164,362 +268,946 @@ class SchedulerApp:
             messagebox.showerror("INPUT ERROR", "Employee name is required.")
             return
         
-        if any(emp_name.lower() == name.lower() for emp_name, _ in self.employees):
+        if name in self.directory:
             messagebox.showerror("DUPLICATE ERROR", f"Employee '{name}' already exists. Please use a unique name.")
             return
 
-        prefs = {day: {shift: self.shift_priority_vars[day][shift].get() for shift in SHIFTS} for day in DAYS}
-        self.employees.append((name, prefs))
-        
+        from engine import parse_preferences
+
+        prefs = self.preference_grid.get()
+        self.directory.add(name, prefs)
+        self.roster_version += 1
+        self.persist("save_employees", [(name, parse_preferences(prefs))])
+
+        # Fit the new hire into the existing schedule instead of regenerating it
+        if self.repairer:
+            self.apply_schedule_repair(self.repairer.add_employee(name, parse_preferences(prefs)))
+
         self.name_entry.delete(0, 'end')
-        
-        # Reset priority dropdowns to default values (1) for next employee input
-        for day in DAYS:
-            for shift in SHIFTS:
-                self.shift_priority_vars[day][shift].set("1")
-                
+
+        # Reset the priority grid to the default value (1) for next employee input
+        self.preference_grid.reset()
+
         messagebox.showinfo("SUCCESS", f"Employee '{name}' added successfully.")
 
+    def import_roster_file(self):
+        """
+        Bulk-imports employees from a CSV, JSON Lines or JSON roster file.
+        Rows are validated and streamed in one pass in the background; apply_imported_roster adds
+        them once the file is read, and rejected rows are reported together at the end.
+        """
+        file_path = filedialog.askopenfilename(filetypes=[("Roster files", "*.csv *.jsonl *.ndjson *.json"),
+                                                          ("All files", "*.*")])
+        if not file_path:
+            return
+
+        # Duplicates are checked against a copy of the names; employees added meanwhile are skipped later
+        self.import_jobs.submit(self._import_roster_job, file_path, set(self.directory.name_keys))
+        self.poll_import_jobs()
+
+    def _import_roster_job(self, file_path, existing_names, progress=None):
+        """Job function: reads and validates a roster file."""
+        from roster_io import import_roster
+
+        return import_roster(file_path, existing_names=existing_names)
+
+    def poll_import_jobs(self):
+        """Applies finished imports on the main thread; reschedules itself while a file is being read."""
+        if self.import_poll_scheduled is not None:
+            self.root.after_cancel(self.import_poll_scheduled)
+            self.import_poll_scheduled = None
+        busy = self.import_jobs.busy()
+        for kind, _, payload in self.import_jobs.poll():
+            if kind == "done":
+                self.apply_imported_roster(payload)
+            elif kind == "error":
+                messagebox.showerror("IMPORT ERROR", f"Failed to import roster: {payload}")
+        if busy:
+            self.import_poll_scheduled = self.root.after(self.JOB_POLL_INTERVAL_MS, self.poll_import_jobs)
+
+    def apply_imported_roster(self, result):
+        """Adds the employees of a finished import, saves them and starts fitting them into the schedule."""
+        added = {self.directory.name(employee_id) for employee_id in self.directory.extend(result.employees)}
+        employees = [(name, prefs) for (name, _), prefs in zip(result.employees, result.prefs) if name in added]
+        if employees:
+            self.roster_version += 1
+            self.persist("save_employees", employees)
+            if self.repairer:
+                self.repair_imported(self.repairer, employees)
+
+        summary = f"Imported {len(employees)} of {result.rows_read} employees."
+        if result.error_count:
+            messagebox.showwarning("IMPORT FINISHED WITH ERRORS",
+                                   f"{summary}\n{result.error_count} rows were rejected:\n\n{result.error_summary()}")
+        else:
+            messagebox.showinfo("IMPORT SUCCESSFUL", summary)
+
+    def repair_imported(self, repairer, employees, start=0):
+        """
+        Fits the next IMPORT_REPAIR_CHUNK imported employees into the schedule, then yields to the
+        event loop until the next chunk. Stops if the schedule was replaced or cleared meanwhile.
+        """
+        if repairer is not self.repairer:
+            return
+        roster = repairer.schedule.roster
+        touched = set()
+        for name, prefs in employees[start:start + self.IMPORT_REPAIR_CHUNK]:
+            # Skip employees removed meanwhile, or already placed by an edit in between
+            if name in self.directory and name not in roster.index_of:
+                touched |= repairer.add_employee(name, prefs)
+        self.apply_schedule_repair(touched)
+        if start + self.IMPORT_REPAIR_CHUNK < len(employees):
+            self.root.after(1, self.repair_imported, repairer, employees, start + self.IMPORT_REPAIR_CHUNK)
+
     def show_progress_label(self):
-        """Displays a temporary label to indicate that the schedule is generating."""
+        """Displays the generation progress: current phase, a progress bar and a CANCEL button."""
         if not self.progress_label:
-            self.progress_label = ctk.CTkLabel(self.main_frame, text="GENERATING SCHEDULE...", 
+            self.progress_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+            self.progress_frame.pack(pady=20)
+            self.progress_label = ctk.CTkLabel(self.progress_frame, text="GENERATING SCHEDULE...",
                                                font=("Arial", 16, "bold"), text_color="#2A6BAB")
-            self.progress_label.pack(pady=20)
+            self.progress_label.pack()
+            self.progress_bar = ctk.CTkProgressBar(self.progress_frame, width=400, progress_color="#3683D9")
+            self.progress_bar.set(0)
+            self.progress_bar.pack(side="left", pady=10, padx=(0, 10))
+            ctk.CTkButton(self.progress_frame, text="CANCEL", command=self.cancel_generation, font=("Arial", 12, "bold"),
+                          corner_radius=10, fg_color="#DC143C", hover_color="#B22222", width=90).pack(side="left")
             self.root.update_idletasks()  # Force the UI to update immediately
 
+    def update_progress_label(self, phase, percent, placed):
+        """Shows a progress event from the generation job."""
+        if self.progress_label:
+            self.progress_label.configure(text=f"GENERATING SCHEDULE... {phase.upper()} {percent}% "
+                                               f"({placed} SLOTS FILLED)")
+            self.progress_bar.set(percent / 100)
+
     def hide_progress_label(self):
-        """Hides the progress label."""
+        """Hides the progress display."""
         if self.progress_label:
-            self.progress_label.destroy()
+            self.progress_frame.destroy()
+            self.progress_frame = None
             self.progress_label = None
+            self.progress_bar = None
 
     def run_generate_schedule_thread(self):
         """
-        Starts the schedule generation in a separate thread to prevent the UI from freezing.
+        Submits a schedule generation job to the background executor to prevent the UI from freezing.
+        Clicking again while a run is in progress does not start a parallel run: the requests are
+        coalesced into a single follow-up run on the latest roster.
         """
-        if not self.employees:
+        if not self.directory:
             messagebox.showwarning("NO EMPLOYEES", "Please add employees before generating a schedule.")
             return
 
+        from engine import Roster
+
         self.show_progress_label()
-        
-        # Start the generation process in a new thread
-        thread = threading.Thread(target=self._generate_schedule_worker)
-        thread.start()
 
-    def _generate_schedule_worker(self):
+        # Snapshot the roster and read the Tk variable here, on the main thread, and hand both to the job
+        roster = Roster.from_employees(self.directory.employees())
+        self.generation_job = self.jobs.submit(self._generate_schedule_worker, roster, self.solver_mode.get(),
+                                               self.roster_version)
+        self.poll_generation_jobs()
+
+    def cancel_generation(self):
+        """Stops the running generation job at its next progress report."""
+        if self.jobs.cancel() and self.progress_label:
+            self.progress_label.configure(text="CANCELLING...")
+
+    def poll_generation_jobs(self):
         """
-        Worker function for the thread to generate the schedule.
-        This function contains the core scheduling logic.
+        Applies the events published by the generation job, on the main thread.
+        Reschedules itself with root.after while a job is running or waiting.
         """
-        # Call the original generate_schedule logic
-        self.generate_schedule_logic()
-        
-        # Use root.after to safely update the UI from the thread
-        self.root.after(100, self.hide_progress_label)
-        self.root.after(200, self.show_schedule)
-        self.root.after(300, lambda: messagebox.showinfo("SCHEDULE GENERATED", "The weekly schedule has been generated successfully!"))
+        if self.job_poll_scheduled is not None:
+            self.root.after_cancel(self.job_poll_scheduled)
+            self.job_poll_scheduled = None
+        busy = self.jobs.busy() # Checked before draining, so no event of a finished job is missed
+        progress = None
+        for kind, job_id, payload in self.jobs.poll():
+            if kind == "progress":
+                progress = payload # Only the latest progress event is worth drawing
+            elif job_id != self.generation_job:
+                continue # Superseded by a newer request that is still pending or running
+            elif kind == "done":
+                result, mode, cost_report, roster_version = payload
+                if roster_version != self.roster_version:
+                    # The roster was edited during the run; generate again for the current roster
+                    self.run_generate_schedule_thread()
+                    return
+                self.apply_generated_schedule(result, mode, cost_report)
+            elif kind == "cancelled":
+                self.hide_progress_label()
+                messagebox.showinfo("GENERATION CANCELLED", "Schedule generation was cancelled. The previous schedule was kept.")
+            else:
+                self.hide_progress_label()
+                messagebox.showerror("GENERATION ERROR", f"Failed to generate the schedule: {payload}")
+        if progress is not None and busy:
+            self.update_progress_label(*progress)
+        if busy:
+            self.job_poll_scheduled = self.root.after(self.JOB_POLL_INTERVAL_MS, self.poll_generation_jobs)
 
-    def generate_schedule_logic(self):
+    def _generate_schedule_worker(self, roster, mode, roster_version, progress=None):
         """
-        Contains the core logic for assigning employees to shifts.
-        This method is called by the threading worker.
+        Job function run on the executor's worker thread.
+        It only reads its own roster snapshot; the UI state is updated by apply_generated_schedule.
         """
-        self.schedule.clear()
-        self.workdays.clear()
-        
-        for day in DAYS:
-            for shift in SHIFTS:
-                self.schedule[day][shift] = []
-
-        day_indices = {day: i for i, day in enumerate(DAYS)}
-        final_unresolved_employees = set()
-
-        # Phase 1: Assign based on employees' highest daily priorities.
-        for day in DAYS:
-            assigned_on_current_day_pass1 = set()
-            employees_sorted_by_best_daily_priority = []
-            for name, prefs in self.employees:
-                min_priority_for_day = min(int(prefs[day][s]) for s in SHIFTS)
-                employees_sorted_by_best_daily_priority.append((min_priority_for_day, name, prefs))
-            
-            employees_sorted_by_best_daily_priority.sort()
-
-            for min_prio, name, prefs in employees_sorted_by_best_daily_priority:
-                if self.workdays[name] >= self.MAX_WORKDAYS_PER_WEEK or name in assigned_on_current_day_pass1:
-                    continue
-
-                sorted_shifts_for_employee_on_day = sorted(SHIFTS, key=lambda s: int(prefs[day][s]))
-                
-                assigned_this_employee_for_day = False
-                for target_shift in sorted_shifts_for_employee_on_day:
-                    if len(self.schedule[day][target_shift]) < self.MAX_EMPLOYEES_PER_SHIFT:
-                        self.schedule[day][target_shift].append(name)
-                        self.workdays[name] += 1
-                        assigned_on_current_day_pass1.add(name)
-                        assigned_this_employee_for_day = True
-                        break
-
-        # Phase 2: Resolve remaining employees by attempting assignments on unassigned days.
-        for name, prefs in self.employees:
-            while self.workdays[name] < self.MAX_WORKDAYS_PER_WEEK:
-                assigned_in_this_loop_pass2 = False
-                
-                available_days_for_employee = []
-                for day_to_check in DAYS:
-                    if not any(name in self.schedule[day_to_check][s] for s in SHIFTS):
-                        available_days_for_employee.append(day_to_check)
-                
-                if not available_days_for_employee:
-                    break 
-
-                available_days_for_employee.sort(key=lambda d: min(int(prefs[d][s]) for s in SHIFTS))
-
-                for target_day in available_days_for_employee:
-                    sorted_shifts_for_target_day = sorted(SHIFTS, key=lambda s: int(prefs[target_day][s]))
-                    for target_shift in sorted_shifts_for_target_day:
-                        if len(self.schedule[target_day][target_shift]) < self.MAX_EMPLOYEES_PER_SHIFT:
-                            self.schedule[target_day][target_shift].append(name)
-                            self.workdays[name] += 1
-                            assigned_in_this_loop_pass2 = True
-                            break
-                    if assigned_in_this_loop_pass2:
-                        break
-                
-                if assigned_in_this_loop_pass2:
-                    continue
-
-                # Attempt to assign to the *next consecutive day*
-                assigned_on_next_day = False
-                for original_day_candidate in available_days_for_employee:
-                    current_day_idx = day_indices[original_day_candidate]
-                    next_day_idx = (current_day_idx + 1) % len(DAYS)
-                    next_day = DAYS[next_day_idx]
-
-                    if not any(name in self.schedule[next_day][s] for s in SHIFTS):
-                        sorted_shifts_for_next_day = sorted(SHIFTS, key=lambda s: int(prefs[next_day][s]))
-                        for next_day_shift in sorted_shifts_for_next_day:
-                            if len(self.schedule[next_day][next_day_shift]) < self.MAX_EMPLOYEES_PER_SHIFT:
-                                self.schedule[next_day][next_day_shift].append(name)
-                                self.workdays[name] += 1
-                                assigned_on_next_day = True
-                                assigned_in_this_loop_pass2 = True
-                                break
-                    if assigned_on_next_day:
-                        break
-                
-                if not assigned_in_this_loop_pass2:
-                    final_unresolved_employees.add(name)
-                    break
-
-        # Phase 3: Fill Any Remaining Empty Slots Randomly.
-        for day in DAYS:
-            for shift in SHIFTS:
-                while len(self.schedule[day][shift]) < self.MAX_EMPLOYEES_PER_SHIFT:
-                    eligible_candidates_for_random_fill = []
-                    for emp_name, _ in self.employees:
-                        if self.workdays[emp_name] < self.MAX_WORKDAYS_PER_WEEK and \
-                           emp_name not in self.schedule[day][shift] and \
-                           emp_name not in final_unresolved_employees and \
-                           not any(emp_name in self.schedule[day][s] for s in SHIFTS if s != shift):
-                            eligible_candidates_for_random_fill.append(emp_name)
-
-                    if eligible_candidates_for_random_fill:
-                        chosen = random.choice(eligible_candidates_for_random_fill)
-                        self.schedule[day][shift].append(chosen)
-                        self.workdays[chosen] += 1
-                    else:
-                        break
+        # Call the original generate_schedule logic, under cProfile if SCHEDULER_PROFILE names an output file
+        profile_path = os.environ.get("SCHEDULER_PROFILE")
+        if profile_path:
+            from instrumentation import profiled
+            with profiled(profile_path):
+                result, cost_report = self.generate_schedule_logic(roster, mode, progress)
+        else:
+            result, cost_report = self.generate_schedule_logic(roster, mode, progress)
+        return result, mode, cost_report, roster_version
+
+    def generate_schedule_logic(self, roster, mode="greedy", progress=None):
+        """
+        Runs the headless scheduling engine on a roster snapshot.
+        This method is called by the job worker and must not touch the UI.
+        Returns the schedule and a short report of the total preference cost, next to the greedy
+        result when another solver mode was used.
+        """
+        if self.schedule_cache is None:
+            from schedule_cache import ScheduleCache
+            self.schedule_cache = ScheduleCache(disk_dir=os.environ.get("SCHEDULER_CACHE_DIR"))
+        # Extra scheduling rules (rest, consecutive days, staffing, skills, unavailability) are read
+        # from the JSON file named by SCHEDULER_CONSTRAINTS on every run, so edits apply right away.
+        constraints_path = os.environ.get("SCHEDULER_CONSTRAINTS")
+        constraints = None
+        if constraints_path:
+            from constraints import load_constraints
+            constraints = load_constraints(constraints_path)
+        result = self.schedule_cache.solve(roster, mode, self.MAX_EMPLOYEES_PER_SHIFT, self.MAX_WORKDAYS_PER_WEEK,
+                                           progress=progress, constraints=constraints)
+
+        cost_report = f"Preference cost ({mode}): {result.preference_cost()}"
+        if result.seed is not None:
+            cost_report += f" (seed {result.seed})"
+        if mode != "greedy":
+            greedy_result = self.schedule_cache.solve(roster, "greedy", self.MAX_EMPLOYEES_PER_SHIFT, self.MAX_WORKDAYS_PER_WEEK,
+                                                      progress=progress, constraints=constraints)
+            cost_report += f"\nPreference cost (greedy): {greedy_result.preference_cost()}"
+        if constraints:
+            details = result.metrics.details
+            cost_report += (f"\nConstraints: {len(constraints)} rules, {details['understaffed_shifts']} understaffed shifts, "
+                            f"{details['shifts_missing_skill']} shifts missing a required skill")
+        from scoring import score_schedule
+        score = score_schedule(result)
+        cost_report += (f"\nCoverage: {score['coverage']:.0%}, preference satisfaction: "
+                        f"{score['mean_satisfaction']:.0%}, workday variance: {score['workday_variance']:.2f}")
+        cache_stats = self.schedule_cache.stats()
+        cost_report += (f"\nCache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, "
+                        f"{cache_stats['misses']} misses")
+        return result, cost_report
+
+    def apply_generated_schedule(self, result, mode, cost_report):
+        """
+        Stores a completed generation run and reports it. Runs on the main thread.
+        """
+        from repair import ScheduleRepairer
+        from schedule_export import ScheduleSnapshot
+
+        self.schedule = result.to_dict()
+        self.workdays = result.workdays_by_name()
+        self.repairer = ScheduleRepairer(result)
+        self.record_run_metrics(result, mode)
+        self.hide_progress_label()
+        self.persist("save_schedule", ScheduleSnapshot(result), mode, result.preference_cost(),
+                     self.MAX_EMPLOYEES_PER_SHIFT, self.MAX_WORKDAYS_PER_WEEK, result.seed)
 
         # Provide feedback to the user about the scheduling outcome.
+        final_unresolved_employees = result.unresolved_names()
         if final_unresolved_employees:
             unique_unresolved = ", ".join(sorted(list(final_unresolved_employees)))
             messagebox.showwarning("PARTIAL SCHEDULE",
                                    f"The following employees could not be fully scheduled due to persistent conflicts or reaching max workdays:\n"
                                    f"{unique_unresolved}\n\n"
                                    f"Consider adjusting their preferences, adding more employees, or modifying the max shift limit.")
+        self.show_schedule()
+        messagebox.showinfo("SCHEDULE GENERATED", "The weekly schedule has been generated successfully!\n\n" + cost_report)
 
-    def show_schedule(self):
+    def _load_saved_roster(self, progress=None):
+        """Storage job: reads the saved roster and converts it to the GUI's employee format."""
+        return self._get_store().load_roster().to_employees()
+
+    def _get_store(self):
+        """Returns the ScheduleStore, opening it on first use. Only called on the storage thread."""
+        if self.store is None:
+            from storage import ScheduleStore
+            self.store = ScheduleStore(os.environ.get("SCHEDULER_DB") or DEFAULT_DB_PATH)
+        return self.store
+
+    def persist(self, method_name, *args):
+        """Queues a call of the ScheduleStore method method_name on the storage thread, after every earlier one."""
+        self.store_jobs.submit(self._run_store_call, method_name, args)
+        self.poll_store_jobs()
+
+    def query_store(self, callback, method_name, *args):
+        """Like persist, but calls callback with the method's result on the main thread once it is done."""
+        job_id = self.store_jobs.submit(self._run_store_call, method_name, args)
+        self.store_callbacks[job_id] = callback
+        self.poll_store_jobs()
+
+    def _run_store_call(self, method_name, args, progress=None):
+        return getattr(self._get_store(), method_name)(*args)
+
+    def _restore_roster_job(self, snapshot_id, progress=None):
+        """Storage job: restores a roster snapshot and returns it in the GUI's employee format."""
+        return self._get_store().restore_roster(snapshot_id).to_employees()
+
+    def poll_store_jobs(self):
         """
-        Creates a new top-level window to display the generated weekly schedule.
-        The schedule is presented in a grid format with days as columns and shifts as rows.
-        Aesthetics: Enhanced fonts, padding, and slightly different background for the schedule popup.
+        Applies the saved roster once it is loaded and reports storage errors, on the main thread.
+        Reschedules itself while storage work is queued.
         """
-        top = ctk.CTkToplevel(self.root)
-        top.title("WEEKLY SCHEDULE")
-        top.transient(self.root)
-        top.grab_set()
-        top.lift()
-        top.geometry("1000x500")
-        top.configure(fg_color="#F8F8F8")
+        if self.store_poll_scheduled is not None:
+            self.root.after_cancel(self.store_poll_scheduled)
+            self.store_poll_scheduled = None
+        busy = self.store_jobs.busy()
+        for kind, job_id, payload in self.store_jobs.poll():
+            if kind == "done" and job_id == self.roster_load_job:
+                # Employees added while loading were saved after the load; keep them after the saved ones.
+                if self.directory.extend(payload, front=True):
+                    self.roster_version += 1
+                self.roster_load_job = None
+            elif kind == "done" and job_id in self.store_callbacks:
+                self.store_callbacks.pop(job_id)(payload)
+            elif kind == "error":
+                self.store_callbacks.pop(job_id, None)
+                messagebox.showerror("STORAGE ERROR", f"Failed to access the scheduler database: {payload}")
+        if busy:
+            self.store_poll_scheduled = self.root.after(self.JOB_POLL_INTERVAL_MS, self.poll_store_jobs)
 
-        # Configure grid column and row weights for better resizing behavior
-        top.grid_columnconfigure(0, weight=0)
-        for i in range(1, len(DAYS) + 1):
-            top.grid_columnconfigure(i, weight=1)
-        for j in range(1, len(SHIFTS) + 1):
-            top.grid_rowconfigure(j, weight=1)
-
-        # Top-left empty cell for alignment
-        ctk.CTkLabel(top, text="", width=10).grid(row=0, column=0) 
-
-        # Create day headers
-        for i, day in enumerate(DAYS):
-            ctk.CTkLabel(top, text=day, font=("Segoe UI", 14, "bold")).grid(row=0, column=i+1, padx=8, pady=8, sticky="nsew")
-
-        # Create shift headers and populate schedule cells
-        for j, shift in enumerate(SHIFTS):
-            ctk.CTkLabel(top, text=shift, font=("Arial", 14, "bold")).grid(row=j+1, column=0, padx=8, pady=8, sticky="nsew")
-            for i, day in enumerate(DAYS):
-                emp_list = "\n".join(self.schedule[day][shift]) 
-                label = ctk.CTkLabel(top, text=emp_list, 
-                                     padx=15, pady=10,
-                                     wraplength=130, justify="center",
-                                     fg_color="white", corner_radius=8, text_color="black",
-                                     font=("Helvetica", 11))
-                label.grid(row=j+1, column=i+1, padx=5, pady=5, sticky="nsew")
-                
-        # Add a close button at the bottom of the schedule window
-        ctk.CTkButton(top, text="CLOSE", command=top.destroy, font=("Arial", 13, "bold"),
-                      corner_radius=10, fg_color="#4682B4", hover_color="#36648B").grid(row=len(SHIFTS)+1, column=0, columnspan=len(DAYS)+1, pady=15)
-
-        top.resizable(True, True)
+    def on_close(self):
+        """Finishes pending database writes before closing the application."""
+        self.jobs.cancel()
+        self.sweep_jobs.cancel()
+        self.import_jobs.cancel()
+        self.store_jobs.wait()
+        if self.store is not None:
+            self.store.close()
+        self.root.destroy()
 
-    def export_schedule(self):
+    def record_run_metrics(self, result, mode):
         """
-        Exports the current weekly schedule to a CSV (Comma Separated Values) file.
-        Allows the user to choose the file location and name.
+        Keeps the metrics of a generation run for the metrics panel and, if SCHEDULER_METRICS_LOG
+        names a file, appends them to it as one JSON line.
         """
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
-        if not file_path:
+        self.last_run_metrics = result.metrics.to_record(result, mode=mode)
+        log_path = os.environ.get("SCHEDULER_METRICS_LOG")
+        if log_path:
+            try:
+                with open(log_path, "a", encoding="utf-8") as log:
+                    log.write(result.metrics.to_json(result, mode=mode) + "\n")
+            except OSError:
+                pass # Metrics logging must never break schedule generation
+
+    def show_run_metrics(self):
+        """
+        Opens a window with the timings, placement counts and rejection reasons of the last run,
+        followed by the startup timing report.
+        """
+        top = self.windows.get("metrics")
+        if top is None:
+            top = self.build_window("metrics", "RUN METRICS", "520x480")
+            top.textbox = ctk.CTkTextbox(top, font=("Courier", 12), corner_radius=8)
+            top.textbox.pack(fill="both", expand=True, padx=15, pady=(15, 5))
+            ctk.CTkButton(top, text="CLOSE", command=lambda: self.hide_window(top), font=("Arial", 13, "bold"),
+                          corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(pady=10)
+
+        metrics = self.last_run_metrics
+        if not metrics:
+            lines = ["NO SCHEDULE HAS BEEN GENERATED YET."]
+        else:
+            lines = [f"Solver: {metrics['mode']}",
+                     f"Employees: {metrics['employees']}",
+                     f"Filled slots: {metrics['filled_slots']} / {metrics['total_slots']}",
+                     f"Unresolved employees: {metrics['unresolved']}",
+                     f"Total time: {metrics['total_time'] * 1000:.1f} ms", "", "Phase times:"]
+            lines += [f"  {phase}: {seconds * 1000:.1f} ms" for phase, seconds in metrics["phase_times"].items()]
+            lines += ["", "Placed per phase:"]
+            lines += [f"  {phase}: {count}" for phase, count in metrics["placed"].items()]
+            lines += [f"  random fill (phase 3): {metrics['random_filled']}", "", "Rejected candidates:"]
+            for phase, reasons in metrics["rejections"].items():
+                lines += [f"  {phase} / {reason}: {count}" for reason, count in reasons.items()]
+            if metrics.get("details"):
+                lines += ["", "Details:"] + [f"  {key}: {value}" for key, value in metrics["details"].items()]
+        lines += ["", "Startup times:"]
+        lines += [f"  {step}: {seconds * 1000:.1f} ms" for step, seconds in self.startup_times.items()]
+
+        top.textbox.configure(state="normal")
+        top.textbox.delete("1.0", "end")
+        top.textbox.insert("1.0", "\n".join(lines))
+        top.textbox.configure(state="disabled")
+        self.show_window(top, modal=False)
+
+    def show_what_if(self):
+        """
+        Opens the what-if window: comma-separated per-shift and workday limits plus employees to
+        leave out. RUN SWEEP schedules every combination in the background and lists coverage
+        and unresolved employees per scenario.
+        """
+        top = self.windows.get("what_if")
+        if top is None:
+            top = self.build_window("what_if", "WHAT-IF SCENARIOS", "760x520")
+            form = ctk.CTkFrame(top, fg_color="transparent")
+            form.pack(fill="x", padx=15, pady=(15, 5))
+            top.entries = {}
+            fields = [("per_shift", "Employees per shift:", str(self.MAX_EMPLOYEES_PER_SHIFT)),
+                      ("workdays", "Max workdays:", str(self.MAX_WORKDAYS_PER_WEEK)),
+                      ("removed", "Without (names):", "")]
+            for row, (key, label, default) in enumerate(fields):
+                ctk.CTkLabel(form, text=label, font=("Helvetica", 13, "bold")).grid(row=row, column=0, sticky="w", pady=3)
+                entry = ctk.CTkEntry(form, width=420, corner_radius=8, font=("Helvetica", 12))
+                entry.insert(0, default)
+                entry.grid(row=row, column=1, sticky="w", padx=(10, 0), pady=3)
+                top.entries[key] = entry
+            top.textbox = ctk.CTkTextbox(top, font=("Courier", 12), corner_radius=8)
+            top.textbox.pack(fill="both", expand=True, padx=15, pady=5)
+            button_frame = ctk.CTkFrame(top, fg_color="transparent")
+            button_frame.pack(pady=10)
+            ctk.CTkButton(button_frame, text="RUN SWEEP", command=self.run_what_if, font=("Arial", 13, "bold"),
+                          corner_radius=10, fg_color="#3683D9", hover_color="#2A6BAB").pack(side="left", padx=10)
+            ctk.CTkButton(button_frame, text="CLOSE", command=lambda: self.hide_window(top), font=("Arial", 13, "bold"),
+                          corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(side="left", padx=10)
+        self.show_window(top, modal=False)
+
+    def run_what_if(self):
+        """Reads the what-if form and submits the scenario sweep for the current roster."""
+        if not self.directory:
+            messagebox.showwarning("NO EMPLOYEES", "Please add employees before comparing scenarios.")
             return
-        
+        from engine import Roster
+        from scenarios import scenario_grid
+
+        top = self.windows["what_if"]
         try:
-            with open(file_path, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Day", "Shift", "Employees"])
-                
-                for day in DAYS:
-                    for shift in SHIFTS:
-                        writer.writerow([day, shift, ", ".join(self.schedule[day][shift])])
-            messagebox.showinfo("EXPORT SUCCESSFUL", f"Schedule successfully exported to:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("EXPORT ERROR", f"Failed to export schedule: {e}")
+            per_shift = [int(value) for value in top.entries["per_shift"].get().split(",") if value.strip()]
+            workdays = [int(value) for value in top.entries["workdays"].get().split(",") if value.strip()]
+        except ValueError:
+            messagebox.showerror("INVALID INPUT", "Limits must be comma-separated whole numbers, e.g. 2,3,4.")
+            return
+        if not per_shift or not workdays:
+            messagebox.showerror("INVALID INPUT", "Enter at least one value for each limit.")
+            return
+        removed = tuple(name.strip() for name in top.entries["removed"].get().split(",") if name.strip())
+        removals = [(), removed] if removed else [()]
 
-    def edit_employees(self):
+        roster = Roster.from_employees(self.directory.employees())
+        scenarios = scenario_grid(per_shift, workdays, removals)
+        self.set_what_if_text(f"Scheduling {len(scenarios)} scenarios...")
+        self.sweep_jobs.submit(self._run_sweep_job, roster, scenarios, self.solver_mode.get())
+        self.poll_sweep_jobs()
+
+    def _run_sweep_job(self, roster, scenarios, mode, progress=None):
+        """Job function: runs the sweep with the constraints file in effect, returns the comparison table."""
+        from scenarios import format_table, run_sweep
+
+        constraints_path = os.environ.get("SCHEDULER_CONSTRAINTS")
+        constraints = None
+        if constraints_path:
+            from constraints import load_constraints
+            constraints = load_constraints(constraints_path)
+        return format_table(run_sweep(roster, scenarios, mode, constraints=constraints))
+
+    def poll_sweep_jobs(self):
+        """Shows finished sweeps in the what-if window; reschedules itself while a sweep is running."""
+        if self.sweep_poll_scheduled is not None:
+            self.root.after_cancel(self.sweep_poll_scheduled)
+            self.sweep_poll_scheduled = None
+        busy = self.sweep_jobs.busy()
+        for kind, _, payload in self.sweep_jobs.poll():
+            if kind == "done":
+                self.set_what_if_text(payload)
+            elif kind == "error":
+                self.set_what_if_text(f"Failed to compare scenarios: {payload}")
+        if busy:
+            self.sweep_poll_scheduled = self.root.after(self.JOB_POLL_INTERVAL_MS, self.poll_sweep_jobs)
+
+    def set_what_if_text(self, text):
+        """Replaces the contents of the what-if window's read-only result box."""
+        textbox = self.windows["what_if"].textbox
+        textbox.configure(state="normal")
+        textbox.delete("1.0", "end")
+        textbox.insert("1.0", text)
+        textbox.configure(state="disabled")
+
+    def show_history(self):
         """
-        Opens a new window to select an employee for editing or removal.
+        Opens the history window: saved schedule versions, roster snapshots taken before a reset
+        or restore, and the assignments and preference versions of one employee. The lists are
+        read from the database each time the window is shown.
         """
-        top = ctk.CTkToplevel(self.root)
-        top.title("EDIT/REMOVE EMPLOYEES")
-        top.transient(self.root)
-        top.grab_set()
-        top.lift()
-        top.geometry("400x150")
-        top.configure(fg_color="#F8F8F8")
+        top = self.windows.get("history")
+        if top is None:
+            top = self.build_window("history", "HISTORY", "820x600")
+            form = ctk.CTkFrame(top, fg_color="transparent")
+            form.pack(fill="x", padx=15, pady=(15, 5))
+            menu_style = dict(fg_color="white", button_color="#6495ED", button_hover_color="#5580C2",
+                              text_color="black", width=420, corner_radius=8, font=("Helvetica", 12))
+            top.labels = {} # Menu text -> schedule or snapshot id
 
-        if not self.employees:
-            ctk.CTkLabel(top, text="NO EMPLOYEES TO EDIT.", font=("Helvetica", 12, "bold")).pack(padx=10, pady=20)
-            ctk.CTkButton(top, text="CLOSE", command=top.destroy, font=("Arial", 12, "bold"),
+            ctk.CTkLabel(form, text="Saved schedules:", font=("Helvetica", 13, "bold")).grid(row=0, column=0, sticky="w", pady=3)
+            top.schedule_choice = ctk.StringVar(value="")
+            top.schedule_menu = ctk.CTkOptionMenu(form, variable=top.schedule_choice, values=[""], **menu_style)
+            top.schedule_menu.grid(row=0, column=1, padx=10, pady=3)
+            ctk.CTkButton(form, text="VIEW", command=self.view_saved_schedule, font=("Arial", 12, "bold"), width=150,
+                          corner_radius=10, fg_color="#4682B4", hover_color="#36648B").grid(row=0, column=2, pady=3)
+
+            ctk.CTkLabel(form, text="Roster snapshots:", font=("Helvetica", 13, "bold")).grid(row=1, column=0, sticky="w", pady=3)
+            top.snapshot_choice = ctk.StringVar(value="")
+            top.snapshot_menu = ctk.CTkOptionMenu(form, variable=top.snapshot_choice, values=[""], **menu_style)
+            top.snapshot_menu.grid(row=1, column=1, padx=10, pady=3)
+            ctk.CTkButton(form, text="RESTORE ROSTER", command=self.restore_roster_snapshot, font=("Arial", 12, "bold"),
+                          width=150, corner_radius=10, fg_color="#DC143C", hover_color="#B22222").grid(row=1, column=2, pady=3)
+
+            ctk.CTkLabel(form, text="Employee:", font=("Helvetica", 13, "bold")).grid(row=2, column=0, sticky="w", pady=3)
+            top.employee_entry = ctk.CTkEntry(form, width=420, corner_radius=8, font=("Helvetica", 12))
+            top.employee_entry.grid(row=2, column=1, padx=10, pady=3)
+            top.employee_entry.bind("<Return>", lambda event: self.show_employee_history())
+            ctk.CTkButton(form, text="SHOW HISTORY", command=self.show_employee_history, font=("Arial", 12, "bold"),
+                          width=150, corner_radius=10, fg_color="#4682B4", hover_color="#36648B").grid(row=2, column=2, pady=3)
+
+            top.textbox = ctk.CTkTextbox(top, font=("Courier", 12), corner_radius=8)
+            top.textbox.pack(fill="both", expand=True, padx=15, pady=5)
+            ctk.CTkButton(top, text="CLOSE", command=lambda: self.hide_window(top), font=("Arial", 13, "bold"),
                           corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(pady=10)
+
+        self.query_store(self.set_schedule_versions, "schedule_versions")
+        self.query_store(self.set_roster_snapshots, "roster_snapshots")
+        self.show_window(top, modal=False)
+
+    def set_schedule_versions(self, versions):
+        """Fills the history window's saved schedule menu, newest first."""
+        top = self.windows["history"]
+        labels = [f"#{version['id']}  {version['week']}  {version['created_at']}  {version['mode']}, "
+                  f"cost {version['preference_cost']}" for version in versions]
+        top.labels.update((label, version["id"]) for label, version in zip(labels, versions))
+        top.schedule_menu.configure(values=labels or ["NO SAVED SCHEDULES"])
+        top.schedule_choice.set(labels[0] if labels else "NO SAVED SCHEDULES")
+
+    def set_roster_snapshots(self, snapshots):
+        """Fills the history window's roster snapshot menu, newest first."""
+        top = self.windows["history"]
+        labels = [f"#{snapshot['id']}  {snapshot['created_at']}  before {snapshot['reason']}, "
+                  f"{snapshot['employees']} employees" for snapshot in snapshots]
+        top.labels.update((label, snapshot["id"]) for label, snapshot in zip(labels, snapshots))
+        top.snapshot_menu.configure(values=labels or ["NO ROSTER SNAPSHOTS"])
+        top.snapshot_choice.set(labels[0] if labels else "NO ROSTER SNAPSHOTS")
+
+    def set_history_text(self, text):
+        """Replaces the contents of the history window's read-only text box."""
+        textbox = self.windows["history"].textbox
+        textbox.configure(state="normal")
+        textbox.delete("1.0", "end")
+        textbox.insert("1.0", text)
+        textbox.configure(state="disabled")
+
+    def view_saved_schedule(self):
+        """Shows the saved schedule selected in the history window."""
+        top = self.windows["history"]
+        schedule_id = top.labels.get(top.schedule_choice.get())
+        if schedule_id is None:
             return
 
-        ctk.CTkLabel(top, text="SELECT AN EMPLOYEE:", font=("Helvetica", 12)).pack(pady=(15, 5))
-        employee_names = [name for name, _ in self.employees]
-        
-        selected_name = ctk.StringVar(value=employee_names[0])
-        dropdown = ctk.CTkOptionMenu(top, variable=selected_name, values=employee_names,
-                                     fg_color="white", button_color="#6495ED",
-                                     button_hover_color="#5580C2", text_color="black",
-                                     corner_radius=8, font=("Helvetica", 12))
-        dropdown.pack(pady=10)
-
-        def open_edit_name_window():
-            """Opens the window to edit the name for the selected employee."""
-            name_to_edit = selected_name.get()
-            top.destroy() # Close the selection window
-            self.edit_employee_name(name_to_edit)
-
-        def remove_employee_action():
-            """Removes the selected employee from the list."""
-            name_to_remove = selected_name.get()
-            if messagebox.askyesno("CONFIRM REMOVAL", f"Are you sure you want to remove '{name_to_remove}'?"):
-                self.employees = [emp for emp in self.employees if emp[0] != name_to_remove]
-                messagebox.showinfo("REMOVED", f"Employee '{name_to_remove}' has been removed.")
-                top.destroy()
-
-        button_frame = ctk.CTkFrame(top, fg_color="transparent")
-        button_frame.pack(pady=10)
+        def show(schedule):
+            lines = [top.schedule_choice.get(), ""]
+            for day, shifts in schedule.items():
+                lines.append(day)
+                lines += [f"  {shift}: {', '.join(names) or '-'}" for shift, names in shifts.items()]
+            self.set_history_text("\n".join(lines))
+
+        self.query_store(show, "load_schedule", schedule_id)
 
-        ctk.CTkButton(button_frame, text="EDIT NAME", command=open_edit_name_window, font=("Arial", 13, "bold"),
-                      corner_radius=10, fg_color="#3683D9", hover_color="#2A6BAB").pack(side="left", padx=5)
-        ctk.CTkButton(button_frame, text="REMOVE EMPLOYEE", command=remove_employee_action, font=("Arial", 13, "bold"),
-                      corner_radius=10, fg_color="#DC143C", hover_color="#B22222").pack(side="left", padx=5)
+    def show_employee_history(self):
+        """Shows the newest assignments and saved preference versions of the employee named in the history window."""
+        name = self.windows["history"].employee_entry.get().strip()
+        if not name:
+            return
+
+        def show_assignments(history):
+            lines = [f"Assignments of {name}:"]
+            lines += [f"  #{schedule_id}  {week}  {day} {shift}" for schedule_id, week, day, shift in history]
+            if not history:
+                lines.append("  none")
+            self.query_store(lambda versions: show_versions(lines, versions), "employee_versions", name)
 
-    def edit_employee_name(self, employee_name):
+        def show_versions(lines, versions):
+            lines += ["", "Saved preferences:"]
+            for saved_at, prefs in versions:
+                lines.append(f"  {saved_at}")
+                lines += [f"    {day}: " + ", ".join(f"{shift} {level}" for shift, level in shifts.items())
+                          for day, shifts in prefs.items()]
+            if not versions:
+                lines.append("  none")
+            self.set_history_text("\n".join(lines))
+
+        self.query_store(show_assignments, "employee_history", name)
+
+    def restore_roster_snapshot(self):
+        """Replaces the roster with the snapshot selected in the history window, after a confirmation."""
+        top = self.windows["history"]
+        snapshot_id = top.labels.get(top.snapshot_choice.get())
+        if snapshot_id is None:
+            return
+        if not messagebox.askyesno("CONFIRM RESTORE", f"Replace the current roster with snapshot {top.snapshot_choice.get()}?\n\n"
+                                   "The current roster is kept as a snapshot, and the current schedule is cleared."):
+            return
+        self.clear_roster_state()
+        self.roster_load_job = self.store_jobs.submit(self._restore_roster_job, snapshot_id)
+        self.poll_store_jobs()
+        self.query_store(self.set_roster_snapshots, "roster_snapshots")
+
+    def build_window(self, key, title, geometry):
         """
-        Creates a new window to edit the name of a specific employee.
+        Creates an empty secondary window and caches it under key. Closing it only hides it;
+        show_window brings it back without rebuilding its widgets.
         """
         top = ctk.CTkToplevel(self.root)
-        top.title(f"EDIT NAME: {employee_name.upper()}")
+        top.title(title)
         top.transient(self.root)
-        top.grab_set()
-        top.lift()
-        top.geometry("400x150")
+        top.geometry(geometry)
         top.configure(fg_color="#F8F8F8")
-        
-        # Name editing section
-        name_frame = ctk.CTkFrame(top, fg_color="transparent")
-        name_frame.pack(pady=20)
-        ctk.CTkLabel(name_frame, text="New Name:", font=("Helvetica", 13, "bold")).pack(side="left", padx=(0, 10))
-        new_name_entry = ctk.CTkEntry(name_frame, corner_radius=8, font=("Helvetica", 12))
-        new_name_entry.insert(0, employee_name)
-        new_name_entry.pack(side="left")
-
-        def save_name_change():
-            """Saves the edited name."""
-            new_name = new_name_entry.get().strip()
-            if not new_name:
-                messagebox.showerror("INPUT ERROR", "Name cannot be empty.")
+        top.protocol("WM_DELETE_WINDOW", lambda: self.hide_window(top))
+        self.windows[key] = top
+        return top
+
+    def show_window(self, top, modal=True):
+        """Brings a cached window back up; modal windows grab input like the original dialogs."""
+        top.deiconify()
+        top.lift()
+        if modal:
+            top.grab_set()
+
+    def hide_window(self, top):
+        """Hides a cached window, keeping its widgets for the next show_window."""
+        top.grab_release()
+        top.withdraw()
+
+    def apply_schedule_repair(self, touched):
+        """
+        Refreshes self.schedule and the workdays of the touched employees after an incremental repair.
+        """
+        schedule = self.repairer.schedule
+        roster = schedule.roster
+        self.schedule = schedule.to_dict()
+        for e in touched:
+            if roster.active[e]:
+                self.workdays[roster.names[e]] = schedule.index.workdays[e]
+        if self.schedule_view is not None:
+            self.schedule_view.refresh(schedule)
+
+    def show_schedule(self):
+        """
+        Shows the weekly schedule window, with days as columns and shifts as rows.
+        The window is built on first use and then kept: later calls only update the cells that changed.
+        """
+        if self.schedule_view is None:
+            from schedule_view import ScheduleView
+            self.schedule_view = ScheduleView(self.root, DAYS, SHIFTS)
+        self.schedule_view.refresh(self.repairer.schedule if self.repairer else None)
+        self.schedule_view.show()
+
+    def export_schedule(self):
+        """
+        Exports the current schedule in the format chosen next to the solver selector.
+        Allows the user to choose the file location and name. The file is written in the
+        background; completion is reported by poll_export_jobs.
+        """
+        if not self.repairer:
+            messagebox.showwarning("NO SCHEDULE", "Please generate a schedule before exporting it.")
+            return
+        from schedule_export import EXPORT_FORMATS, ScheduleSnapshot, export_schedule
+
+        export_format = self.export_format.get()
+        _, extension, label = EXPORT_FORMATS[export_format]
+        file_path = filedialog.asksaveasfilename(defaultextension=extension, filetypes=[(label, f"*{extension}")])
+        if not file_path:
+            return
+
+        # Snapshot on the main thread; later roster edits do not affect the export in progress
+        snapshot = ScheduleSnapshot(self.repairer.schedule)
+        self.export_jobs.submit(export_schedule, snapshot, file_path, export_format)
+        self.poll_export_jobs()
+
+    def poll_export_jobs(self):
+        """Reports finished exports on the main thread; reschedules itself while exports are running."""
+        if self.export_poll_scheduled is not None:
+            self.root.after_cancel(self.export_poll_scheduled)
+            self.export_poll_scheduled = None
+        busy = self.export_jobs.busy()
+        for kind, _, payload in self.export_jobs.poll():
+            if kind == "done":
+                file_path, rows = payload
+                messagebox.showinfo("EXPORT SUCCESSFUL", f"Schedule successfully exported to:\n{file_path}\n({rows} rows)")
+            elif kind == "error":
+                messagebox.showerror("EXPORT ERROR", f"Failed to export schedule: {payload}")
+        if busy:
+            self.export_poll_scheduled = self.root.after(self.JOB_POLL_INTERVAL_MS, self.poll_export_jobs)
+
+    def edit_employees(self):
+        """
+        Opens the employee manager: a search box with a paged list of matching employees, and the
+        selected employee's name and preferences for editing, next to a REMOVE button.
+        The window is built on first use; later calls only refresh the results.
+        """
+        top = self.windows.get("edit")
+        if top is None:
+            top = self.build_window("edit", "MANAGE EMPLOYEES", "940x560")
+            search_frame = ctk.CTkFrame(top, fg_color="transparent")
+            search_frame.pack(fill="x", padx=15, pady=(15, 5))
+            ctk.CTkLabel(search_frame, text="Search:", font=("Helvetica", 13, "bold")).pack(side="left", padx=(0, 10))
+            top.search_entry = ctk.CTkEntry(search_frame, width=300, corner_radius=8, font=("Helvetica", 12),
+                                            placeholder_text="Name or any word of it")
+            top.search_entry.pack(side="left")
+            top.search_entry.bind("<KeyRelease>", lambda event: self.search_employees_soon())
+            top.count_label = ctk.CTkLabel(search_frame, text="", font=("Helvetica", 12), text_color="gray30")
+            top.count_label.pack(side="left", padx=15)
+
+            body = ctk.CTkFrame(top, fg_color="transparent")
+            body.pack(fill="both", expand=True, padx=15, pady=5)
+
+            # One reusable button per row of a page; paging only changes their labels
+            results_frame = ctk.CTkFrame(body, corner_radius=10, fg_color="#F0F0F0", width=320)
+            results_frame.pack(side="left", fill="y", padx=(0, 15))
+            top.result_buttons = []
+            for row in range(self.EMPLOYEE_PAGE_SIZE):
+                button = ctk.CTkButton(results_frame, text="", anchor="w", width=290, height=24, corner_radius=8,
+                                       fg_color="white", hover_color="#DCE8FB", text_color="black",
+                                       font=("Helvetica", 12), command=lambda row=row: self.select_employee(row))
+                button.pack(padx=10, pady=2)
+                top.result_buttons.append(button)
+            page_frame = ctk.CTkFrame(results_frame, fg_color="transparent")
+            page_frame.pack(pady=8)
+            ctk.CTkButton(page_frame, text="<", width=40, command=lambda: self.show_employee_page(-1), corner_radius=8,
+                          fg_color="#4682B4", hover_color="#36648B").pack(side="left")
+            top.page_label = ctk.CTkLabel(page_frame, text="", width=120, font=("Helvetica", 12))
+            top.page_label.pack(side="left", padx=10)
+            ctk.CTkButton(page_frame, text=">", width=40, command=lambda: self.show_employee_page(1), corner_radius=8,
+                          fg_color="#4682B4", hover_color="#36648B").pack(side="left")
+
+            details = ctk.CTkFrame(body, corner_radius=10, fg_color="#F0F0F0")
+            details.pack(side="left", fill="both", expand=True)
+            name_frame = ctk.CTkFrame(details, fg_color="transparent")
+            name_frame.pack(pady=(15, 5))
+            ctk.CTkLabel(name_frame, text="Name:", font=("Helvetica", 13, "bold")).pack(side="left", padx=(0, 10))
+            top.name_entry = ctk.CTkEntry(name_frame, width=300, corner_radius=8, font=("Helvetica", 12))
+            top.name_entry.pack(side="left")
+            top.name_entry.bind("<Return>", lambda event: self.save_employee_changes())
+            top.preference_grid = PreferenceGrid(details, DAYS, SHIFTS, PRIORITY_LEVELS)
+            top.preference_grid.pack(padx=10, pady=(8, 0))
+            top.version_label = ctk.CTkLabel(details, text="", font=("Helvetica", 11), text_color="gray30")
+            top.version_label.pack()
+
+            button_frame = ctk.CTkFrame(details, fg_color="transparent")
+            button_frame.pack(pady=10)
+            ctk.CTkButton(button_frame, text="OLDER PREFERENCES", command=self.show_older_preferences, font=("Arial", 13, "bold"),
+                          corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(side="left", padx=5)
+            ctk.CTkButton(button_frame, text="SAVE CHANGES", command=self.save_employee_changes, font=("Arial", 13, "bold"),
+                          corner_radius=10, fg_color="#3CB371", hover_color="#2E8B57").pack(side="left", padx=5)
+            ctk.CTkButton(button_frame, text="REMOVE EMPLOYEE", command=self.remove_selected_employee, font=("Arial", 13, "bold"),
+                          corner_radius=10, fg_color="#DC143C", hover_color="#B22222").pack(side="left", padx=5)
+            ctk.CTkButton(button_frame, text="CLOSE", command=lambda: self.hide_window(top), font=("Arial", 13, "bold"),
+                          corner_radius=10, fg_color="#4682B4", hover_color="#36648B").pack(side="left", padx=5)
+            top.page = 0
+            top.result_ids = []
+            top.search_scheduled = None
+            top.versions = None # Saved preferences of the selected employee, newest first, once fetched
+            top.version_index = 0
+
+        self.refresh_employee_results()
+        self.show_window(top)
+        top.search_entry.focus_set()
+
+    def search_employees_soon(self):
+        """Restarts the search from the first page once typing pauses for SEARCH_DELAY_MS."""
+        top = self.windows["edit"]
+        if top.search_scheduled is not None:
+            self.root.after_cancel(top.search_scheduled)
+        top.search_scheduled = self.root.after(self.SEARCH_DELAY_MS, self.refresh_employee_results, True)
+
+    def refresh_employee_results(self, first_page=False):
+        """Shows the current page of employees matching the search box in the manager window."""
+        top = self.windows["edit"]
+        top.search_scheduled = None
+        if first_page:
+            top.page = 0
+        page_size = self.EMPLOYEE_PAGE_SIZE
+        ids, total = self.directory.search(top.search_entry.get(), top.page * page_size, page_size)
+        if not ids and top.page:
+            # The page emptied after a removal or a new search; go back to the last one
+            top.page = max((total - 1) // page_size, 0)
+            ids, total = self.directory.search(top.search_entry.get(), top.page * page_size, page_size)
+        top.result_ids = ids
+        for row, button in enumerate(top.result_buttons):
+            if row < len(ids):
+                selected = ids[row] == self.selected_employee
+                button.configure(text=self.directory.name(ids[row]), state="normal",
+                                 fg_color="#DCE8FB" if selected else "white")
+            else:
+                button.configure(text="", state="disabled", fg_color="transparent")
+        pages = max((total + page_size - 1) // page_size, 1)
+        top.page_label.configure(text=f"Page {top.page + 1} of {pages}")
+        top.count_label.configure(text=f"{total} of {len(self.directory)} employees" if self.directory
+                                  else "NO EMPLOYEES YET.")
+
+    def show_employee_page(self, step):
+        """Moves the manager's result list step pages forward or back."""
+        top = self.windows["edit"]
+        pages = max((self.directory.search(top.search_entry.get(), 0, 0)[1] - 1) // self.EMPLOYEE_PAGE_SIZE + 1, 1)
+        top.page = min(max(top.page + step, 0), pages - 1)
+        self.refresh_employee_results()
+
+    def select_employee(self, row):
+        """Shows the employee in the given result row for editing."""
+        top = self.windows["edit"]
+        self.selected_employee = top.result_ids[row]
+        top.name_entry.delete(0, "end")
+        top.name_entry.insert(0, self.directory.name(self.selected_employee))
+        top.preference_grid.set(self.directory.prefs(self.selected_employee))
+        top.versions = None
+        top.version_label.configure(text="")
+        self.refresh_employee_results()
+
+    def show_older_preferences(self):
+        """
+        Puts the selected employee's previously saved preferences in the grid, one version further
+        back per click. SAVE CHANGES keeps them as the employee's preferences.
+        """
+        top = self.windows["edit"]
+        if self.selected_employee not in self.directory.entries:
+            messagebox.showerror("INPUT ERROR", "Select an employee first.")
+            return
+        employee_id = self.selected_employee
+
+        def show(versions):
+            if self.selected_employee != employee_id:
+                return # Another employee was selected meanwhile
+            if top.versions is None:
+                top.versions, top.version_index = versions, 0 # versions[0] holds the current preferences
+            if top.version_index + 1 >= len(top.versions):
+                messagebox.showinfo("NO OLDER PREFERENCES", "There are no older saved preferences for this employee.")
                 return
+            top.version_index += 1
+            saved_at, prefs = top.versions[top.version_index]
+            top.preference_grid.set(prefs)
+            top.version_label.configure(text=f"Preferences saved {saved_at}; SAVE CHANGES to keep them.")
+
+        if top.versions is None:
+            self.query_store(show, "employee_versions", self.directory.name(employee_id))
+        else:
+            show(top.versions)
+
+    def save_employee_changes(self):
+        """Saves the name and preferences edited in the manager window for the selected employee."""
+        from engine import parse_preferences
+
+        top = self.windows["edit"]
+        employee_id = self.selected_employee
+        if employee_id not in self.directory.entries:
+            messagebox.showerror("INPUT ERROR", "Select an employee first.")
+            return
+        employee_name = self.directory.name(employee_id)
+        new_name = top.name_entry.get().strip()
+        prefs = top.preference_grid.get()
+        if not new_name:
+            messagebox.showerror("INPUT ERROR", "Name cannot be empty.")
+            return
+        renamed = new_name != employee_name
+        prefs_changed = prefs != self.directory.prefs(employee_id)
+        if not renamed and not prefs_changed:
+            messagebox.showinfo("NO CHANGES", f"Nothing to save for '{employee_name}'.")
+            return
 
-            # Check for duplicate name, excluding the original employee
-            if new_name.lower() != employee_name.lower() and any(emp_name.lower() == new_name.lower() for emp_name, _ in self.employees):
+        e = self.schedule_index(employee_id) # Repairs keep the index, so one lookup covers both edits
+        if renamed:
+            try:
+                self.directory.rename(employee_id, new_name)
+            except ValueError:
                 messagebox.showerror("DUPLICATE ERROR", f"Employee '{new_name}' already exists.")
                 return
+            self.persist("rename_employee", employee_name, new_name)
+            # Rename in place: the schedule refers to employees by index
+            if employee_name in self.workdays:
+                self.workdays[new_name] = self.workdays.pop(employee_name)
+            if e is not None:
+                self.apply_schedule_repair(self.repairer.rename_employee(e, new_name))
+        if prefs_changed:
+            self.directory.set_prefs(employee_id, prefs)
+            self.persist("save_employees", [(new_name, parse_preferences(prefs))])
+            # Re-place only this employee and the slots they free
+            if e is not None:
+                self.apply_schedule_repair(self.repairer.update_preferences(e, parse_preferences(prefs)))
+            elif self.repairer:
+                # Not in the schedule yet (loaded after it was generated): fit them in as a new hire
+                self.apply_schedule_repair(self.repairer.add_employee(new_name, parse_preferences(prefs)))
+        self.roster_version += 1
+        top.versions = None
+        top.version_label.configure(text="")
+        self.refresh_employee_results()
+        messagebox.showinfo("SUCCESS", f"Employee '{new_name}' has been updated.")
 
-            # Find the employee and update their name in the main list
-            for i, (name, prefs) in enumerate(self.employees):
-                if name == employee_name:
-                    self.employees[i] = (new_name, prefs)
-                    break
-            
-            messagebox.showinfo("SUCCESS", f"Employee name changed from '{employee_name}' to '{new_name}'.")
-            top.destroy()
+    def remove_selected_employee(self):
+        """Removes the employee selected in the manager window."""
+        top = self.windows["edit"]
+        employee_id = self.selected_employee
+        if employee_id not in self.directory.entries:
+            messagebox.showerror("INPUT ERROR", "Select an employee first.")
+            return
+        name_to_remove = self.directory.name(employee_id)
+        if messagebox.askyesno("CONFIRM REMOVAL", f"Are you sure you want to remove '{name_to_remove}'?"):
+            e = self.schedule_index(employee_id)
+            self.directory.remove(employee_id)
+            self.selected_employee = None
+            self.roster_version += 1
+            self.persist("remove_employee", name_to_remove)
+            self.workdays.pop(name_to_remove, None)
+            # Free the removed employee's shifts and refill only those slots
+            if e is not None: # Someone the schedule does not know holds no shifts to free
+                self.apply_schedule_repair(self.repairer.remove_employee(e))
+            top.name_entry.delete(0, "end")
+            top.preference_grid.reset()
+            self.refresh_employee_results()
+            messagebox.showinfo("REMOVED", f"Employee '{name_to_remove}' has been removed.")
 
-        button_frame = ctk.CTkFrame(top, fg_color="transparent")
-        button_frame.pack(pady=10)
-        
-        ctk.CTkButton(button_frame, text="SAVE CHANGES", command=save_name_change, font=("Arial", 13, "bold"),
-                      corner_radius=10, fg_color="#3CB371", hover_color="#2E8B57").pack(side="left", padx=10)
-        ctk.CTkButton(button_frame, text="CANCEL", command=top.destroy, font=("Arial", 13, "bold"),
-                      corner_radius=10, fg_color="#DC143C", hover_color="#B22222").pack(side="left", padx=10)
+    def schedule_index(self, employee_id):
+        """
+        Returns the employee's index in the current schedule's roster, or None if there is no
+        schedule or it was generated without them (e.g. they were loaded from storage afterwards).
+        """
+        if not self.repairer:
+            return None
+        return self.repairer.schedule.roster.index_of.get(self.directory.name(employee_id))
 
     def reset_all_data(self):
         """
         Resets all employee and schedule data after a user confirmation.
         """
-        if messagebox.askyesno("CONFIRM RESET", "ARE YOU SURE YOU WANT TO RESET ALL EMPLOYEE DATA AND CLEAR THE SCHEDULE? THIS ACTION CANNOT BE UNDONE."):
-            self.employees = []
-            self.schedule.clear()
-            self.workdays.clear()
+        if messagebox.askyesno("CONFIRM RESET", "ARE YOU SURE YOU WANT TO RESET ALL EMPLOYEE DATA AND CLEAR THE SCHEDULE? "
+                               "THE ROSTER CAN BE RESTORED LATER FROM HISTORY."):
+            self.clear_roster_state()
+            self.persist("remove_all_employees")
             messagebox.showinfo("DATA RESET", "ALL EMPLOYEE DATA AND THE CURRENT SCHEDULE HAVE BEEN CLEARED.")
             # Clear the name entry and reset priorities
             self.name_entry.delete(0, 'end')
-            for day in DAYS:
-                for shift in SHIFTS:
-                    self.shift_priority_vars[day][shift].set("1")
+            self.preference_grid.reset()
+
+    def clear_roster_state(self):
+        """Drops the roster, the current schedule and any run in progress, before a reset or restore."""
+        self.jobs.cancel()
+        self.generation_job = None
+        self.hide_progress_label()
+        self.roster_load_job = None # A roster still being loaded must not come back after the reset
+        self.directory.clear()
+        self.selected_employee = None
+        self.roster_version += 1
+        self.schedule.clear()
+        self.workdays.clear()
+        self.repairer = None
+        if self.schedule_view is not None:
+            self.schedule_view.refresh(None)
 
 
 if __name__ == "__main__":
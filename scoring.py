@@ -0,0 +1,243 @@
+import numpy as np
+
+from engine import UNASSIGNED, Schedule
+
+MAX_REPORTED_VIOLATIONS = 50 # Messages listed by validate_schedule; the rest are only counted
+
+# Violation kinds, in the order validate_schedule lists them
+VIOLATION_KINDS = ("over_capacity", "over_workdays", "removed_employee", "unavailable", "rest",
+                   "consecutive_days", "understaffed", "missing_skill")
+
+
+def assignment_tensor(schedules):
+    """
+    Stacks the assigned_shift arrays of schedules on the same roster into an
+    N x employees x days int8 tensor (shift index per employee and day, or UNASSIGNED).
+    """
+    return np.stack([schedule.assigned_shift for schedule in schedules])
+
+
+def assignments_from_dict(roster, schedule_dict):
+    """
+    Converts a schedule in the GUI's format (schedule[day][shift] = [names]), e.g. one loaded
+    from storage or edited by hand, into an employees x days assignment array.
+    Returns (assigned, problems): problems lists names that are not on the roster and
+    employees booked on more than one shift of the same day, which the array cannot hold.
+    """
+    num_days = len(roster.days)
+    assigned = np.full((len(roster), num_days), UNASSIGNED, dtype=np.int8)
+    problems = []
+    for d, day in enumerate(roster.days):
+        for s, shift in enumerate(roster.shifts):
+            for name in schedule_dict.get(day, {}).get(shift, []):
+                e = roster.index_of.get(name)
+                if e is None:
+                    problems.append(f"{day} {shift}: '{name}' is not on the roster.")
+                elif assigned[e, d] != UNASSIGNED:
+                    problems.append(f"{day}: '{name}' is booked on both {roster.shifts[assigned[e, d]]} and {shift}.")
+                else:
+                    assigned[e, d] = s
+    return assigned, problems
+
+
+def score_assignments(roster, assigned, max_employees_per_shift, max_workdays_per_week, constraints=None):
+    """
+    Scores N candidate schedules of one roster at once. assigned is an N x employees x days
+    assignment tensor (a single employees x days array is treated as N = 1); constraints, if
+    given, are the CompiledConstraints of a schedule on this roster and limits.
+
+    Returns a dict of arrays, indexed by candidate first:
+        slot_counts        N x days x shifts  employees per shift
+        coverage           N                  fraction of shift slots filled
+        preference_cost    N                  total priority value of all assignments
+        workdays           N x employees      workdays per employee
+        satisfaction       N x employees      share of assigned shifts at the employee's best
+                                              priority for that day (1.0 with no shifts)
+        mean_satisfaction  N                  mean satisfaction of employees with shifts
+        workday_variance   N                  variance of workdays across active employees
+        violations         {kind: N}          counts per VIOLATION_KINDS entry
+    Everything is computed with array operations over the whole batch.
+    """
+    assigned = np.asarray(assigned)
+    if assigned.ndim == 2:
+        assigned = assigned[None]
+    num_candidates, num_employees, num_days = assigned.shape
+    num_shifts = len(roster.shifts)
+    if num_employees != len(roster) or num_days != len(roster.days):
+        raise ValueError(f"Assignment tensor of shape {assigned.shape} does not match the roster "
+                         f"({len(roster)} employees, {len(roster.days)} days).")
+    if assigned.size and (assigned.min() < UNASSIGNED or assigned.max() >= num_shifts):
+        raise ValueError(f"Shift indices must be between {UNASSIGNED} and {num_shifts - 1}.")
+
+    worked = assigned != UNASSIGNED
+    shift_index = np.where(worked, assigned, 0).astype(np.intp)
+
+    # Employees per candidate, day and shift, counted in one bincount over flattened slot ids.
+    candidate_ids, _, day_ids = np.nonzero(worked)
+    slot_ids = (candidate_ids * num_days + day_ids) * num_shifts + assigned[worked]
+    slot_counts = np.bincount(slot_ids, minlength=num_candidates * num_days * num_shifts)
+    slot_counts = slot_counts.reshape(num_candidates, num_days, num_shifts)
+    total_slots = num_days * num_shifts * max_employees_per_shift
+    coverage = (np.minimum(slot_counts, max_employees_per_shift).sum(axis=(1, 2)) / total_slots
+                if total_slots else np.ones(num_candidates))
+
+    priority = np.take_along_axis(roster.prefs[None], shift_index[..., None], axis=3)[..., 0]
+    priority = np.where(worked, priority, 0)
+    preference_cost = priority.sum(axis=(1, 2), dtype=np.int64)
+
+    workdays = worked.sum(axis=2)
+    at_best = worked & (priority == roster.prefs.min(axis=2)[None])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        satisfaction = np.where(workdays > 0, at_best.sum(axis=2) / workdays, 1.0)
+    active = roster.active
+    scheduled = (workdays > 0) & active[None]
+    mean_satisfaction = np.where(scheduled.any(axis=1),
+                                 (satisfaction * scheduled).sum(axis=1) / np.maximum(scheduled.sum(axis=1), 1), 1.0)
+    workday_variance = workdays[:, active].var(axis=1) if active.any() else np.zeros(num_candidates)
+
+    violations = dict.fromkeys(VIOLATION_KINDS, np.zeros(num_candidates, dtype=np.int64))
+    violations["over_capacity"] = (slot_counts > max_employees_per_shift).sum(axis=(1, 2))
+    violations["over_workdays"] = (workdays > max_workdays_per_week).sum(axis=1)
+    violations["removed_employee"] = (worked & ~active[None, :, None]).any(axis=2).sum(axis=1)
+    if constraints is not None:
+        violations.update(_constraint_violations(constraints, assigned, worked, shift_index, slot_counts))
+
+    return {
+        "slot_counts": slot_counts,
+        "coverage": coverage,
+        "preference_cost": preference_cost,
+        "workdays": workdays,
+        "satisfaction": satisfaction,
+        "mean_satisfaction": mean_satisfaction,
+        "workday_variance": workday_variance,
+        "violations": violations,
+    }
+
+
+def _constraint_violations(constraints, assigned, worked, shift_index, slot_counts):
+    """Counts the violations of each compiled rule kind per candidate, as arrays of shape N."""
+    num_candidates, num_employees, num_days = assigned.shape
+    num_shifts = slot_counts.shape[2]
+    violations = {}
+
+    blocked = constraints.blocked_slots()[:num_employees].reshape(num_employees, num_days, num_shifts)
+    on_blocked = np.take_along_axis(blocked[None], shift_index[..., None], axis=3)[..., 0] & worked
+    violations["unavailable"] = on_blocked.sum(axis=(1, 2))
+
+    rest = np.zeros(num_candidates, dtype=np.int64)
+    for before, after in constraints.rest_pairs:
+        rest += ((assigned[:, :, :-1] == before) & (assigned[:, :, 1:] == after)).sum(axis=(1, 2))
+    violations["rest"] = rest
+
+    limit = constraints.consecutive_limit
+    if limit is not None and limit < num_days:
+        # A run of limit + 1 worked days shows up as a window sum of limit + 1.
+        runs = np.cumsum(np.pad(worked, ((0, 0), (0, 0), (1, 0))).astype(np.int16), axis=2)
+        window = runs[:, :, limit + 1:] - runs[:, :, :-limit - 1]
+        violations["consecutive_days"] = (window > limit).any(axis=2).sum(axis=1)
+
+    minimum = np.array(constraints.minimum).reshape(num_days, num_shifts)
+    violations["understaffed"] = (slot_counts < minimum[None]).sum(axis=(1, 2))
+
+    missing = np.zeros((num_candidates, num_days, num_shifts), dtype=bool)
+    skill_bits = np.array(constraints.skill_bits[:num_employees], dtype=np.int64)
+    for bit in {bit for slot_requirements in constraints.requirements for bit, _ in slot_requirements}:
+        required = np.array([dict(slot_requirements).get(bit, 0) for slot_requirements in constraints.requirements])
+        holders = worked & (skill_bits & bit != 0)[None, :, None]
+        candidate_ids, _, day_ids = np.nonzero(holders)
+        slot_ids = (candidate_ids * num_days + day_ids) * num_shifts + assigned[holders]
+        held = np.bincount(slot_ids, minlength=num_candidates * num_days * num_shifts)
+        missing |= held.reshape(num_candidates, num_days, num_shifts) < required.reshape(num_days, num_shifts)[None]
+    violations["missing_skill"] = missing.sum(axis=(1, 2))
+    return violations
+
+
+def score_schedules(schedules):
+    """
+    Scores schedules that share one roster and limits, in a single batch, with the constraints
+    compiled for the first of them. Returns the arrays of score_assignments.
+    """
+    first = schedules[0]
+    return score_assignments(first.roster, assignment_tensor(schedules), first.max_employees_per_shift,
+                             first.max_workdays_per_week, first.constraints)
+
+
+def summarize(scores, i=0):
+    """Returns candidate i of a batch score as a flat dict of plain numbers, e.g. for JSON."""
+    return {
+        "coverage": float(scores["coverage"][i]),
+        "preference_cost": int(scores["preference_cost"][i]),
+        "workday_variance": float(scores["workday_variance"][i]),
+        "mean_satisfaction": float(scores["mean_satisfaction"][i]),
+        "violations": sum(int(counts[i]) for counts in scores["violations"].values()),
+    }
+
+
+def score_schedule(schedule):
+    """
+    Scores one schedule on coverage, preference satisfaction, fairness and rule violations.
+    coverage: fraction of shift slots filled.
+    preference_cost: total priority value of all assignments (lower is better).
+    workday_variance: variance of workdays across employees (lower is fairer).
+    mean_satisfaction: mean share of shifts at each employee's best priority for the day.
+    violations: number of broken limits and constraints (0 for solver output).
+    unresolved: employees the solver could not fully schedule.
+    """
+    score = summarize(score_schedules([schedule]))
+    score["unresolved"] = len(schedule.unresolved)
+    return score
+
+
+def validate_schedule(roster, assigned, max_employees_per_shift, max_workdays_per_week, constraints=None):
+    """
+    Checks one employees x days assignment array, e.g. an imported or hand-edited schedule.
+    constraints may be a ConstraintSet or CompiledConstraints. Returns a list of readable
+    messages, at most MAX_REPORTED_VIOLATIONS plus a line counting the rest; empty if valid.
+    """
+    if constraints is not None and hasattr(constraints, "compile"):
+        constraints = constraints.compile(Schedule(roster, max_employees_per_shift, max_workdays_per_week))
+    scores = score_assignments(roster, assigned, max_employees_per_shift, max_workdays_per_week, constraints)
+    assigned = np.asarray(assigned)
+    slot_counts = scores["slot_counts"][0]
+    workdays = scores["workdays"][0]
+    messages = []
+
+    for d, s in zip(*np.nonzero(slot_counts > max_employees_per_shift)):
+        messages.append(f"{roster.days[d]} {roster.shifts[s]}: {slot_counts[d, s]} employees, "
+                        f"limit {max_employees_per_shift}.")
+    for e in np.flatnonzero(workdays > max_workdays_per_week):
+        messages.append(f"'{roster.names[e]}' works {workdays[e]} days, limit {max_workdays_per_week}.")
+    for e in np.flatnonzero((workdays > 0) & ~roster.active):
+        messages.append(f"'{roster.names[e]}' was removed but still has shifts.")
+    if constraints is not None:
+        messages += _constraint_messages(roster, assigned, constraints, slot_counts, scores["violations"])
+
+    if len(messages) > MAX_REPORTED_VIOLATIONS:
+        hidden = len(messages) - MAX_REPORTED_VIOLATIONS
+        messages = messages[:MAX_REPORTED_VIOLATIONS] + [f"... and {hidden} more."]
+    return messages
+
+
+def _constraint_messages(roster, assigned, constraints, slot_counts, violations):
+    """Readable messages for the constraint violations of one schedule."""
+    messages = []
+    num_days, num_shifts = len(roster.days), len(roster.shifts)
+    if violations["unavailable"][0]:
+        blocked = constraints.blocked_slots()[:len(roster)].reshape(len(roster), num_days, num_shifts)
+        for e, d in zip(*np.nonzero(assigned != UNASSIGNED)):
+            if blocked[e, d, assigned[e, d]]:
+                messages.append(f"'{roster.names[e]}' is unavailable on {roster.days[d]} {roster.shifts[assigned[e, d]]}.")
+    for before, after in constraints.rest_pairs:
+        for e, d in zip(*np.nonzero((assigned[:, :-1] == before) & (assigned[:, 1:] == after))):
+            messages.append(f"'{roster.names[e]}' works {roster.shifts[after]} on {roster.days[d + 1]} "
+                            f"right after {roster.shifts[before]} on {roster.days[d]}.")
+    if violations["consecutive_days"][0]:
+        messages.append(f"{violations['consecutive_days'][0]} employees work more than "
+                        f"{constraints.consecutive_limit} days in a row.")
+    minimum = np.array(constraints.minimum).reshape(num_days, num_shifts)
+    for d, s in zip(*np.nonzero(slot_counts < minimum)):
+        messages.append(f"{roster.days[d]} {roster.shifts[s]}: {slot_counts[d, s]} employees, "
+                        f"minimum {minimum[d, s]}.")
+    if violations["missing_skill"][0]:
+        messages.append(f"{violations['missing_skill'][0]} shifts lack a required skill.")
+    return messages
@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import http.client
+import json
+import random
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+from constraints import ConstraintSet
+from engine import DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK, Schedule
+from roster_io import import_records
+from schedule_cache import schedule_key
+from scoring import score_schedule
+from solvers import SOLVER_MODES, solve_in_worker
+
+SERVICE_HOST = "127.0.0.1" # Loopback only: the service is for tools on the same machine
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 * 1024 * 1024
+ENDPOINTS = ("/schedule", "/metrics", "/health")
+LATENCY_WINDOW = 1024 # Latencies kept per endpoint for the percentiles in /metrics
+
+
+def _solve_request(roster, mode, max_employees_per_shift, max_workdays_per_week, seed, constraints=None):
+    """Runs in a pool worker: solves one request and returns the JSON response body."""
+    rng = random.Random(seed) if seed is not None else None
+    schedule = solve_in_worker(roster, mode, max_employees_per_shift, max_workdays_per_week, rng=rng,
+                               constraints=constraints)
+    return {
+        "mode": mode,
+        "seed": schedule.seed,
+        "schedule": {day: dict(shifts) for day, shifts in schedule.to_dict().items()},
+        "workdays": dict(schedule.workdays_by_name()),
+        "unresolved": sorted(schedule.unresolved_names()),
+        "score": score_schedule(schedule),
+        "phase_times": dict(schedule.phase_times),
+        "violations": [{"day": roster.days[d], "shift": roster.shifts[s], "reason": reason}
+                       for d, s, reason in schedule.constraints.violations()] if schedule.constraints else [],
+    }
+
+
+class RequestError(Exception):
+    """An error that is answered with the given HTTP status and message."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _is_integer(value):
+    """True for JSON integers; JSON true/false decode to bool, which is an int subclass."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _parse_request(body):
+    """Validates a /schedule request body. Returns (roster, mode, limits, seed, constraints, schedule key)."""
+    try:
+        request = json.loads(body)
+    except ValueError as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}")
+    if not isinstance(request, dict) or not isinstance(request.get("employees"), list):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "Expected an object with an 'employees' list.")
+    mode = request.get("mode", "greedy")
+    if mode not in SOLVER_MODES:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"Unknown solver mode '{mode}'. Choose from: {', '.join(SOLVER_MODES)}.")
+    limits = []
+    for field, default in (("max_employees_per_shift", DEFAULT_MAX_EMPLOYEES_PER_SHIFT),
+                           ("max_workdays_per_week", DEFAULT_MAX_WORKDAYS_PER_WEEK)):
+        value = request.get(field, default)
+        if not _is_integer(value) or value < 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'{field}' must be a non-negative integer.")
+        limits.append(value)
+    seed = request.get("seed")
+    if seed is not None and not _is_integer(seed):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'seed' must be an integer or null.")
+    records = request.get("constraints") or []
+    if not isinstance(records, list):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "'constraints' must be a list of rule objects.")
+
+    result = import_records(request["employees"])
+    if result.error_count:
+        raise RequestError(HTTPStatus.UNPROCESSABLE_ENTITY, f"{result.error_count} invalid employees:\n{result.error_summary()}")
+    roster = result.to_roster()
+    try:
+        constraints = ConstraintSet.from_records(records, roster.names) or None
+    except ValueError as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+    if constraints:
+        if mode == "optimal" and not constraints.is_static():
+            raise RequestError(HTTPStatus.BAD_REQUEST, "The optimal solver supports only 'unavailable' constraints.")
+        try:
+            constraints.compile(Schedule(roster, *limits)) # Checks day and shift names and counts up front
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+    return roster, mode, limits, seed, constraints, schedule_key(roster, mode, *limits, seed, constraints)
+
+
+class LatencyStats:
+    """Request counts, status codes and a sliding window of latencies for one endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = Counter()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, status, seconds):
+        self.requests += 1
+        self.statuses[status] += 1
+        self.latencies.append(seconds)
+
+    def to_record(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+
+        return {
+            "requests": self.requests,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "latency_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+            "latency_max": latencies[-1] if latencies else 0.0,
+        }
+
+
+class ScheduleService:
+    """
+    Local HTTP/JSON scheduling service on asyncio.
+
+        POST /schedule  {"employees": [{"name": ..., "preferences": {"Monday": {"Morning": 1, ...}}}],
+                         "mode": "greedy", "max_employees_per_shift": 2,
+                         "max_workdays_per_week": 5, "seed": null,
+                         "constraints": [{"rule": "rest", "before": "Evening", "after": "Morning"}, ...]}
+        GET /metrics    request counts and latency percentiles per endpoint
+        GET /health
+
+    Solves run in a process pool so the event loop keeps serving other requests. Identical
+    requests that arrive while one is being solved share its result: they are keyed by the
+    same content hash as the schedule cache and await the same future.
+    """
+
+    def __init__(self, port=DEFAULT_PORT, max_workers=None):
+        self.port = port
+        self.max_workers = max_workers
+        self.stats = {}
+        self.deduplicated = 0
+        self._in_flight = {} # schedule key -> future of the running solve
+        self._pool = None
+        self._server = None
+
+    async def start(self):
+        """Starts listening on the loopback interface and returns the bound port."""
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._server = await asyncio.start_server(self._handle_connection, SERVICE_HOST, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # Resolves port 0 to the one picked
+        return self.port
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                started = time.perf_counter()
+                try:
+                    status, response = await self._dispatch(method, path, body)
+                except RequestError as e:
+                    status, response = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+                endpoint = f"{method} {path}" if path in ENDPOINTS else "other" # Bounded set of stats keys
+                self.stats.setdefault(endpoint, LatencyStats()).record(int(status), time.perf_counter() - started)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except RequestError as e:
+            await self._write_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """Reads one HTTP/1.1 request; returns None when the client closed the connection."""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Content-Length must be a non-negative integer.")
+        if length > MAX_BODY_BYTES:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body over {MAX_BODY_BYTES} bytes.")
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], headers, body
+
+    async def _write_response(self, writer, status, response, keep_alive):
+        payload = json.dumps(response).encode("utf-8")
+        status = HTTPStatus(status)
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        if path == "/schedule":
+            if method != "POST":
+                raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST /schedule.")
+            return HTTPStatus.OK, await self._schedule(body)
+        if path == "/metrics" and method == "GET":
+            return HTTPStatus.OK, self.metrics()
+        if path == "/health" and method == "GET":
+            return HTTPStatus.OK, {"status": "ok"}
+        raise RequestError(HTTPStatus.NOT_FOUND, f"No endpoint {method} {path}.")
+
+    async def _schedule(self, body):
+        # Decoding and hashing a large roster takes a while; keep it off the event loop too.
+        roster, mode, limits, seed, constraints, key = await asyncio.get_running_loop().run_in_executor(None, _parse_request, body)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return await asyncio.shield(future)
+        loop = asyncio.get_running_loop()
+        future = asyncio.ensure_future(loop.run_in_executor(self._pool, _solve_request, roster, mode, *limits, seed,
+                                                           constraints))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(future)
+
+    def metrics(self):
+        """Returns request counts and latency percentiles (in seconds) per endpoint."""
+        return {
+            "endpoints": {endpoint: stats.to_record() for endpoint, stats in self.stats.items()},
+            "in_flight": len(self._in_flight),
+            "deduplicated": self.deduplicated,
+        }
+
+
+def client_request(method, path, payload=None, port=DEFAULT_PORT, timeout=None):
+    """Small local client: sends one request to the service and returns (status, decoded JSON body)."""
+    connection = http.client.HTTPConnection(SERVICE_HOST, port, timeout=timeout)
+    try:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=f"Serve schedules over HTTP/JSON on {SERVICE_HOST}. POST /schedule with a roster to "
+                    "get a schedule; GET /metrics for per-endpoint latency. Runs fully offline.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="Solver processes (default: one per CPU).")
+    args = parser.parse_args(argv)
+
+    service = ScheduleService(args.port, args.workers)
+    print(f"Serving on http://{SERVICE_HOST}:{args.port}")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
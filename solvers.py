@@ -0,0 +1,235 @@
+import numpy as np
+
+from engine import (DEFAULT_MAX_EMPLOYEES_PER_SHIFT, DEFAULT_MAX_WORKDAYS_PER_WEEK, UNASSIGNED,
+                    Schedule, generate_schedule)
+from multistart import DEFAULT_NUM_STARTS, multistart_schedule, run_multistart
+
+INFINITE_COST = float("inf")
+
+
+def optimal_schedule(roster, max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                     max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, rng=None, progress=None,
+                     constraints=None):
+    """
+    Assigns employees to shifts by solving a min-cost flow problem:
+        source -> employee (capacity MAX_WORKDAYS_PER_WEEK)
+               -> employee/day (capacity 1, i.e. one shift per day)
+               -> day/shift slot (cost = priority value)
+               -> sink (capacity MAX_EMPLOYEES_PER_SHIFT)
+    Successive shortest paths give the maximum number of filled slots at the lowest
+    total priority cost. rng is accepted for interface compatibility and unused.
+
+    Every augmenting path alternates between slots, so the shortest path search runs on a
+    small graph of day/shift slots: entering a slot means placing an employee who still has
+    capacity, and moving between slots means shifting an already placed employee to another
+    shift or day. Entry costs are computed with NumPy over the whole roster, so each of the
+    at most days * shifts * MAX_EMPLOYEES_PER_SHIFT augmentations costs O(employees * slots).
+    progress is reported after every augmentation, see generate_schedule.
+    Of the constraints, only rules that forbid fixed slots (unavailability) fit the flow
+    network; they remove the employee's edges to those slots. Other rules raise ValueError.
+    """
+    if constraints and not constraints.is_static():
+        raise ValueError("The optimal solver supports only unavailability constraints; "
+                         "use greedy or multistart for rest, consecutive-day, staffing and skill rules.")
+    schedule = Schedule(roster, max_employees_per_shift, max_workdays_per_week, constraints)
+    schedule.metrics.progress = progress
+    if len(roster) == 0:
+        return schedule
+
+    num_days, num_shifts = len(roster.days), len(roster.shifts)
+    metrics = schedule.metrics
+    augmentations = 0
+    with metrics.phase("min_cost_flow"):
+        while schedule.open_slots:
+            path = _shortest_augmenting_path(schedule, num_days, num_shifts)
+            if path is None:
+                break
+            _augment(schedule, path, num_shifts)
+            augmentations += 1
+            schedule.report_progress("min_cost_flow", 100 * (schedule.total_slots - schedule.open_slots)
+                                     // schedule.total_slots)
+    metrics.placed["min_cost_flow"] = augmentations
+    metrics.details["augmentations"] = augmentations
+    metrics.reject("min_cost_flow", "slot_left_open_no_augmenting_path", schedule.open_slots)
+    schedule.record_violations()
+
+    # Anyone left below their attainable number of workdays could not be fully scheduled.
+    attainable = min(max_workdays_per_week, num_days)
+    for e in roster.active_indices():
+        if schedule.index.workdays[e] < attainable:
+            schedule.mark_unresolved(e)
+    return schedule
+
+
+def _shortest_augmenting_path(schedule, num_days, num_shifts):
+    """
+    Finds the cheapest way to fill one more slot, as a list of (employee, from_slot, to_slot)
+    moves where from_slot is None for the newly placed employee. Returns None if no slot can
+    be filled anymore.
+    """
+    prefs = schedule.roster.prefs
+    num_slots = num_days * num_shifts
+    free_days = schedule.assigned_shift == UNASSIGNED
+    blocked = schedule.constraints.blocked_slots() if schedule.constraints is not None else None
+
+    # Entry costs: cheapest employee with remaining capacity who is free on the slot's day.
+    candidates = np.fromiter(sorted(schedule.index.pool), dtype=np.int64)
+    entry_cost = np.full(num_slots, INFINITE_COST)
+    entry_employee = np.full(num_slots, -1, dtype=np.int64)
+    if len(candidates):
+        costs = np.where(free_days[candidates][:, :, None], prefs[candidates], np.iinfo(np.int8).max)
+        costs = costs.reshape(len(candidates), num_slots)
+        if blocked is not None:
+            costs[blocked[candidates]] = np.iinfo(np.int8).max
+        best = costs.argmin(axis=0)
+        best_cost = costs[best, np.arange(num_slots)]
+        reachable = best_cost < np.iinfo(np.int8).max
+        entry_cost[reachable] = best_cost[reachable]
+        entry_employee[reachable] = candidates[best[reachable]]
+
+    # Move costs: cheapest employee in slot a who can move to slot b, priced as the priority change.
+    move_cost = np.full((num_slots, num_slots), INFINITE_COST)
+    move_employee = np.full((num_slots, num_slots), -1, dtype=np.int64)
+    slot_day = np.repeat(np.arange(num_days), num_shifts)
+    for a in range(num_slots):
+        d, s = divmod(a, num_shifts)
+        members = schedule.slots[d][s]
+        if not members:
+            continue
+        members = np.array(members, dtype=np.int64)
+        costs = prefs[members].reshape(len(members), num_slots).astype(np.float64)
+        costs -= prefs[members, d, s][:, None]
+        # A placed employee can take another shift on the same day, or any shift on a free day.
+        allowed = free_days[members][:, slot_day] | (slot_day == d)[None, :]
+        allowed[:, a] = False
+        if blocked is not None:
+            allowed &= ~blocked[members]
+        costs[~allowed] = INFINITE_COST
+        best = costs.argmin(axis=0)
+        move_cost[a] = costs[best, np.arange(num_slots)]
+        move_employee[a] = members[best]
+
+    # Bellman-Ford over the slots; move costs can be negative but the residual graph of a
+    # min-cost flow has no negative cycles, so this converges within num_slots rounds.
+    dist = entry_cost.copy()
+    previous = np.full(num_slots, -1, dtype=np.int64)
+    for _ in range(num_slots):
+        through = dist[:, None] + move_cost
+        best_from = through.argmin(axis=0)
+        best_through = through[best_from, np.arange(num_slots)]
+        improved = best_through < dist
+        if not improved.any():
+            break
+        dist[improved] = best_through[improved]
+        previous[improved] = best_from[improved]
+
+    has_room = np.array([len(schedule.slots[d][s]) < schedule.max_employees_per_shift
+                         for d in range(num_days) for s in range(num_shifts)])
+    exit_cost = np.where(has_room, dist, INFINITE_COST)
+    target = int(exit_cost.argmin())
+    if exit_cost[target] == INFINITE_COST:
+        return None
+
+    moves = []
+    slot = target
+    for _ in range(num_slots + 1):
+        if previous[slot] < 0:
+            moves.append((int(entry_employee[slot]), None, slot))
+            break
+        origin = int(previous[slot])
+        moves.append((int(move_employee[origin, slot]), origin, slot))
+        slot = origin
+    else:
+        return None
+    moves.reverse()
+    return moves
+
+
+def _augment(schedule, moves, num_shifts):
+    """
+    Applies an augmenting path. The path is first expanded into the underlying flow network
+    and loop-erased, because the per-slot choice of the cheapest employee can route the same
+    employee through twice; residual cycles never have negative cost, so erasing them keeps
+    the path shortest.
+    """
+    nodes = [("source",)]
+    for e, origin, target in moves:
+        target_day = target // num_shifts
+        if origin is None:
+            nodes += [("employee", e), ("employee_day", e, target_day), ("slot", target)]
+            continue
+        origin_day = origin // num_shifts
+        nodes.append(("employee_day", e, origin_day))
+        if origin_day != target_day:
+            nodes += [("employee", e), ("employee_day", e, target_day)]
+        nodes.append(("slot", target))
+
+    erased, position = [], {}
+    for node in nodes:
+        if node in position:
+            del erased[position[node] + 1:]
+            position = {n: i for i, n in enumerate(erased)}
+            continue
+        position[node] = len(erased)
+        erased.append(node)
+
+    removals, additions = [], []
+    for u, v in zip(erased, erased[1:]):
+        if u[0] == "slot" and v[0] == "employee_day":
+            removals.append((v[1], v[2], u[1] % num_shifts))
+        elif u[0] == "employee_day" and v[0] == "slot":
+            additions.append((u[1], u[2], v[1] % num_shifts))
+    for e, d, s in removals:
+        schedule.unplace(e, d, s)
+    for e, d, s in additions:
+        schedule.place(e, d, s)
+
+
+SOLVER_MODES = {
+    "greedy": generate_schedule,
+    "optimal": optimal_schedule,
+    "multistart": multistart_schedule, # Best of several seeded greedy variants, run in parallel
+}
+
+
+def solve(roster, mode="greedy", max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+          max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, rng=None, progress=None, constraints=None):
+    """
+    Runs the solver registered under the given mode name. progress, if given, receives
+    progress(phase, percent, placed) updates; raising from it cancels the run.
+    constraints is an optional constraints.ConstraintSet.
+    """
+    if mode not in SOLVER_MODES:
+        raise ValueError(f"Unknown solver mode '{mode}'. Choose from: {', '.join(SOLVER_MODES)}.")
+    return SOLVER_MODES[mode](roster, max_employees_per_shift, max_workdays_per_week, rng=rng, progress=progress,
+                              constraints=constraints)
+
+
+def solve_in_worker(roster, mode="greedy", max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                    max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, rng=None, constraints=None):
+    """
+    Like solve(), for code that already runs inside a pool worker: multistart scores its
+    variants in this process instead of starting a nested process pool.
+    """
+    if mode == "multistart":
+        base_seed = rng.getrandbits(32) if rng is not None else None
+        return run_multistart(roster, DEFAULT_NUM_STARTS, max_employees_per_shift, max_workdays_per_week,
+                              base_seed=base_seed, max_workers=1, constraints=constraints).best
+    return solve(roster, mode, max_employees_per_shift, max_workdays_per_week, rng=rng, constraints=constraints)
+
+
+def compare_solvers(roster, modes=tuple(SOLVER_MODES), max_employees_per_shift=DEFAULT_MAX_EMPLOYEES_PER_SHIFT,
+                    max_workdays_per_week=DEFAULT_MAX_WORKDAYS_PER_WEEK, rng=None):
+    """
+    Runs several solver modes on the same roster and returns
+    {mode: {"preference_cost": ..., "assignments": ..., "unresolved": ...}}.
+    """
+    report = {}
+    for mode in modes:
+        result = solve(roster, mode, max_employees_per_shift, max_workdays_per_week, rng=rng)
+        report[mode] = {
+            "preference_cost": result.preference_cost(),
+            "assignments": int(result.workdays.sum()),
+            "unresolved": len(result.unresolved),
+        }
+    return report
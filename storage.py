@@ -0,0 +1,335 @@
+import datetime
+import json
+import sqlite3
+import threading
+
+import numpy as np
+
+from engine import Roster
+from schedule_config import DAYS, SHIFTS, name_key
+
+STORAGE_SCHEMA_VERSION = 2
+LOAD_BATCH_ROWS = 10000 # Employees fetched per round trip when loading the roster
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS employees (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL UNIQUE,
+    prefs BLOB NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS employees_active ON employees (active, id);
+CREATE TABLE IF NOT EXISTS employee_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    employee_id INTEGER NOT NULL REFERENCES employees (id),
+    saved_at TEXT NOT NULL,
+    prefs BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS employee_versions_employee ON employee_versions (employee_id, id);
+CREATE TABLE IF NOT EXISTS roster_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    employees INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS roster_snapshot_members (
+    snapshot_id INTEGER NOT NULL REFERENCES roster_snapshots (id) ON DELETE CASCADE,
+    employee_id INTEGER NOT NULL REFERENCES employees (id),
+    name TEXT NOT NULL,
+    version_id INTEGER NOT NULL REFERENCES employee_versions (id)
+);
+CREATE INDEX IF NOT EXISTS roster_snapshot_members_snapshot ON roster_snapshot_members (snapshot_id);
+CREATE TABLE IF NOT EXISTS schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    week TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    seed INTEGER,
+    preference_cost INTEGER NOT NULL,
+    max_employees_per_shift INTEGER NOT NULL,
+    max_workdays_per_week INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedules_week ON schedules (week, id);
+CREATE TABLE IF NOT EXISTS assignments (
+    schedule_id INTEGER NOT NULL REFERENCES schedules (id) ON DELETE CASCADE,
+    employee_id INTEGER NOT NULL REFERENCES employees (id),
+    day INTEGER NOT NULL,
+    shift INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assignments_schedule ON assignments (schedule_id);
+CREATE INDEX IF NOT EXISTS assignments_employee ON assignments (employee_id, schedule_id);
+"""
+
+
+def iso_week(date=None):
+    """Returns the ISO week of date (default: today) as 'YYYY-Www', the key schedules are filed under."""
+    year, week, _ = (date or datetime.date.today()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class ScheduleStore:
+    """
+    Local SQLite persistence for the roster and the history of generated schedules.
+
+    The database runs in WAL mode, so reads never wait for a write in progress. Employees are
+    kept with their current preferences as a days x shifts int8 blob, and every save also adds
+    a row to employee_versions, so earlier preferences stay available. Removing an employee only
+    marks them inactive, so older schedules still resolve their names; adding the name again
+    starts a new employee with its own history. A reset or restore first records the active
+    roster as a snapshot (the employees and their preference versions) that restore_roster can
+    bring back. Every generated schedule is saved as a new version filed under its ISO week,
+    with one row per assignment, and can be looked up by week or by employee through indexes.
+
+    Each public method runs as a single transaction, with executemany for bulk writes. The
+    connection is opened on first use and may be used from any one thread at a time.
+    """
+
+    def __init__(self, path, days=DAYS, shifts=SHIFTS):
+        self.path = path
+        self.days = days
+        self.shifts = shifts
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL") # Durable at checkpoints; safe with WAL
+            connection.execute("PRAGMA foreign_keys=ON")
+            with connection:
+                connection.executescript(_SCHEMA)
+                stored = dict(connection.execute("SELECT key, value FROM meta"))
+                layout = {"schema_version": str(STORAGE_SCHEMA_VERSION), "days": json.dumps(self.days),
+                          "shifts": json.dumps(self.shifts)}
+                if not stored:
+                    connection.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", layout.items())
+                elif stored == dict(layout, schema_version="1"):
+                    # Version 1 kept no preference history; start it from the current preferences.
+                    connection.execute("INSERT INTO employee_versions (employee_id, saved_at, prefs) "
+                                       "SELECT id, ?, prefs FROM employees ORDER BY id", (_now(),))
+                    connection.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'",
+                                       (str(STORAGE_SCHEMA_VERSION),))
+                elif stored != layout:
+                    connection.close()
+                    raise ValueError(f"Database '{self.path}' was created for a different schema or week layout.")
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        """Closes the connection; the next call reopens it."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def load_roster(self):
+        """
+        Returns the active employees as a Roster, in the order they were added.
+        Rows are fetched in batches and the preference blobs are decoded straight into the
+        roster's array, without building per-employee dicts.
+        """
+        with self._lock:
+            connection = self._connect()
+            cursor = connection.execute("SELECT name, prefs FROM employees WHERE active = 1 ORDER BY id")
+            names, blobs = [], []
+            while True:
+                rows = cursor.fetchmany(LOAD_BATCH_ROWS)
+                if not rows:
+                    break
+                for name, blob in rows:
+                    names.append(name)
+                    blobs.append(blob)
+        prefs = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(len(names), len(self.days), len(self.shifts))
+        return Roster(names, prefs.copy(), self.days, self.shifts)
+
+    def save_employees(self, employees):
+        """
+        Inserts or updates employees from (name, days x shifts preference array) pairs in one
+        transaction, and records the saved preferences as a new version of each. A previously
+        removed employee with the same name is not reused: the name starts a new employee.
+        """
+        rows = [(name, name_key(name), np.ascontiguousarray(prefs, dtype=np.int8).tobytes())
+                for name, prefs in employees]
+        saved_at = _now()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                _free_name_keys(connection, [(key,) for _, key, _ in rows])
+                connection.executemany(
+                    "INSERT INTO employees (name, name_key, prefs, active) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT (name_key) DO UPDATE SET name = excluded.name, prefs = excluded.prefs",
+                    rows)
+                connection.executemany(
+                    "INSERT INTO employee_versions (employee_id, saved_at, prefs) "
+                    "SELECT id, ?, prefs FROM employees WHERE name_key = ?",
+                    ((saved_at, key) for _, key, _ in rows))
+
+    def remove_employee(self, name):
+        """Marks an employee as removed; their past assignments are kept."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("UPDATE employees SET active = 0 WHERE name_key = ?", (name_key(name),))
+
+    def rename_employee(self, old_name, new_name):
+        """Renames an employee; past schedules show the new name."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                _free_name_keys(connection, [(name_key(new_name),)])
+                connection.execute("UPDATE employees SET name = ?, name_key = ? WHERE name_key = ?",
+                                   (new_name, name_key(new_name), name_key(old_name)))
+
+    def remove_all_employees(self):
+        """
+        Marks every employee as removed, after recording the roster as a "reset" snapshot, and
+        returns the snapshot id (None if the roster was empty). The schedule history is kept.
+        """
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                snapshot_id = _snapshot_roster(connection, "reset")
+                connection.execute("UPDATE employees SET active = 0 WHERE active = 1")
+        return snapshot_id
+
+    def roster_snapshots(self, limit=50):
+        """Returns the newest roster snapshots as dicts with id, created_at, reason and employees."""
+        columns = ("id", "created_at", "reason", "employees")
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT id, created_at, reason, employees FROM roster_snapshots ORDER BY id DESC LIMIT ?",
+                (limit,)).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def restore_roster(self, snapshot_id):
+        """
+        Makes the roster of a snapshot the active roster again, with the names and preferences
+        it had then, and returns it like load_roster. The roster it replaces is first recorded as
+        a "restore" snapshot, so a restore can be undone the same way. The restored employees keep
+        their ids, so their schedule history stays with them.
+        """
+        saved_at = _now()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                members = connection.execute(
+                    "SELECT m.employee_id, m.name, v.prefs FROM roster_snapshot_members m "
+                    "JOIN employee_versions v ON v.id = m.version_id WHERE m.snapshot_id = ?", (snapshot_id,)).fetchall()
+                if not members and not connection.execute("SELECT 1 FROM roster_snapshots WHERE id = ?",
+                                                          (snapshot_id,)).fetchone():
+                    raise ValueError(f"There is no roster snapshot {snapshot_id}.")
+                _snapshot_roster(connection, "restore")
+                connection.execute("UPDATE employees SET active = 0 WHERE active = 1")
+                connection.executemany("UPDATE employees SET name_key = name_key || '#' || id "
+                                       "WHERE name_key = ? AND id != ?",
+                                       ((name_key(name), employee_id) for employee_id, name, _ in members))
+                connection.executemany("UPDATE employees SET name = ?, name_key = ?, prefs = ?, active = 1 WHERE id = ?",
+                                       ((name, name_key(name), prefs, employee_id) for employee_id, name, prefs in members))
+                connection.executemany("INSERT INTO employee_versions (employee_id, saved_at, prefs) VALUES (?, ?, ?)",
+                                       ((employee_id, saved_at, prefs) for employee_id, _, prefs in members))
+        return self.load_roster()
+
+    def employee_versions(self, name, limit=20):
+        """
+        Returns the saved preferences of the active employee with this name, newest first, as
+        (saved_at, {day: {shift: priority}}) pairs, with the priorities as strings like the GUI's.
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT v.saved_at, v.prefs FROM employees e JOIN employee_versions v ON v.employee_id = e.id "
+                "WHERE e.name_key = ? AND e.active = 1 ORDER BY v.id DESC LIMIT ?", (name_key(name), limit)).fetchall()
+        versions = []
+        for saved_at, blob in rows:
+            prefs = np.frombuffer(blob, dtype=np.int8).reshape(len(self.days), len(self.shifts))
+            versions.append((saved_at, {day: {shift: str(level) for shift, level in zip(self.shifts, row)}
+                                        for day, row in zip(self.days, prefs.tolist())}))
+        return versions
+
+    def save_schedule(self, snapshot, mode, preference_cost, max_employees_per_shift, max_workdays_per_week,
+                      seed=None, week=None):
+        """
+        Saves a ScheduleSnapshot as a new version filed under week (default: the current ISO
+        week) and returns its id. Assignments are written in one executemany.
+        """
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                employee_ids = dict(connection.execute("SELECT name_key, id FROM employees WHERE active = 1"))
+                cursor = connection.execute(
+                    "INSERT INTO schedules (week, created_at, mode, seed, preference_cost, "
+                    "max_employees_per_shift, max_workdays_per_week) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (week or iso_week(), _now(), mode, seed,
+                     preference_cost, max_employees_per_shift, max_workdays_per_week))
+                schedule_id = cursor.lastrowid
+                ids = {e: employee_ids[name_key(snapshot.names[e])] for e in set(snapshot.employee.tolist())}
+                connection.executemany(
+                    "INSERT INTO assignments (schedule_id, employee_id, day, shift) VALUES (?, ?, ?, ?)",
+                    ((schedule_id, ids[e], d, s) for e, d, s in zip(snapshot.employee.tolist(), snapshot.day.tolist(),
+                                                                    snapshot.shift.tolist())))
+        return schedule_id
+
+    def schedule_versions(self, week=None, limit=50):
+        """
+        Returns the newest saved schedules, optionally only those of one week, as dicts with
+        id, week, created_at, mode, seed and preference_cost.
+        """
+        query = "SELECT id, week, created_at, mode, seed, preference_cost FROM schedules"
+        params = ()
+        if week is not None:
+            query += " WHERE week = ?"
+            params = (week,)
+        query += " ORDER BY id DESC LIMIT ?"
+        columns = ("id", "week", "created_at", "mode", "seed", "preference_cost")
+        with self._lock:
+            rows = self._connect().execute(query, params + (limit,)).fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def load_schedule(self, schedule_id):
+        """Returns a saved schedule in the GUI's format: schedule[day][shift] = [employee1, employee2, ...]."""
+        schedule = {day: {shift: [] for shift in self.shifts} for day in self.days}
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT a.day, a.shift, e.name FROM assignments a JOIN employees e ON e.id = a.employee_id "
+                "WHERE a.schedule_id = ? ORDER BY a.rowid", (schedule_id,)).fetchall()
+        for d, s, name in rows:
+            schedule[self.days[d]][self.shifts[s]].append(name)
+        return schedule
+
+    def employee_history(self, name, limit=50):
+        """Returns the newest assignments of one employee as (schedule id, week, day, shift) tuples."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT a.schedule_id, s.week, a.day, a.shift FROM employees e "
+                "JOIN assignments a ON a.employee_id = e.id JOIN schedules s ON s.id = a.schedule_id "
+                "WHERE e.name_key = ? AND e.active = 1 ORDER BY a.schedule_id DESC, a.day LIMIT ?",
+                (name_key(name), limit)).fetchall()
+        return [(schedule_id, week, self.days[d], self.shifts[s]) for schedule_id, week, d, s in rows]
+
+
+def _free_name_keys(connection, keys):
+    """Moves removed employees aside from the given (name_key,) rows, so the names can be used again."""
+    connection.executemany("UPDATE employees SET name_key = name_key || '#' || id WHERE name_key = ? AND active = 0", keys)
+
+
+def _snapshot_roster(connection, reason):
+    """Records the active employees with their latest preference versions; returns the snapshot id or None."""
+    count = connection.execute("SELECT COUNT(*) FROM employees WHERE active = 1").fetchone()[0]
+    if not count:
+        return None
+    snapshot_id = connection.execute("INSERT INTO roster_snapshots (created_at, reason, employees) VALUES (?, ?, ?)",
+                                     (_now(), reason, count)).lastrowid
+    connection.execute(
+        "INSERT INTO roster_snapshot_members (snapshot_id, employee_id, name, version_id) "
+        "SELECT ?, e.id, e.name, (SELECT MAX(v.id) FROM employee_versions v WHERE v.employee_id = e.id) "
+        "FROM employees e WHERE e.active = 1", (snapshot_id,))
+    return snapshot_id
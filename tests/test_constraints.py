@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from constraints import ConstraintSet, MaxConsecutiveDays, MinStaffing, RequiredSkill, RestRule, Unavailable
+from engine import Roster, Schedule
+
+
+@pytest.mark.parametrize("record", [
+    {"rule": "min_staffing", "minimum": "2"},
+    {"rule": "min_staffing", "minimum": True},
+    {"rule": "max_consecutive_days", "limit": 0},
+    {"rule": "required_skill", "skill": "first aid", "holders": "Ann"},
+    {"rule": "required_skill", "skill": "first aid", "holders": ["Ann"], "count": 1.5},
+    {"rule": "unavailable", "name": "Ann", "day": 3},
+    {"rule": "rest", "before": None},
+    {"rule": "min_staffing", "minimum": 1, "days": "Monday"},
+])
+def test_mistyped_fields_are_rejected_with_the_record(record):
+    with pytest.raises(ValueError) as error:
+        ConstraintSet.from_records([record])
+    assert "Constraint 1" in str(error.value)
+    assert record["rule"] in str(error.value)
+
+
+@pytest.mark.parametrize("record", [
+    {"rule": "unavailable", "name": "Anm", "day": "Monday"},
+    {"rule": "required_skill", "skill": "first aid", "holders": ["Ann", "Bobb"]},
+])
+def test_unknown_employee_names_are_rejected(record):
+    ConstraintSet.from_records([record]) # Names are only checked against a roster
+    with pytest.raises(ValueError, match="unknown employees"):
+        ConstraintSet.from_records([record], names=["Ann", "Bob"])
+
+
+DAYS = ["Mon", "Tue", "Wed", "Thu"]
+SHIFTS = ["Early", "Late"]
+
+
+def _schedule(constraints, names=("Ann", "Bob", "Cid"), max_per_shift=2, max_workdays=4):
+    roster = Roster(list(names), np.ones((len(names), len(DAYS), len(SHIFTS)), dtype=np.int8), DAYS, SHIFTS)
+    return Schedule(roster, max_per_shift, max_workdays, ConstraintSet(constraints))
+
+
+def test_unavailability_blocks_slots():
+    schedule = _schedule([Unavailable("Ann", "Tue"), Unavailable("Bob", "Wed", "Late")])
+    compiled = schedule.constraints
+
+    blocked = compiled.blocked_slots()
+    assert blocked.shape == (3, len(DAYS) * len(SHIFTS))
+    assert np.flatnonzero(blocked[0]).tolist() == [2, 3] # Tue Early and Late
+    assert np.flatnonzero(blocked[1]).tolist() == [5] # Wed Late
+    assert not blocked[2].any()
+    assert not schedule.can_place(0, 1, 0) and not schedule.can_place(1, 2, 1)
+    assert schedule.can_place(1, 2, 0)
+
+
+def test_rest_rule_forbids_the_next_morning_until_unplaced():
+    schedule = _schedule([RestRule("Late", "Early")])
+    schedule.place(0, 0, 1) # Ann works Mon Late
+    assert not schedule.can_place(0, 1, 0)
+    assert schedule.can_place(0, 1, 1)
+    assert schedule.can_place(1, 1, 0) # Other employees are not affected
+    schedule.unplace(0, 0, 1)
+    assert schedule.can_place(0, 1, 0)
+
+
+def test_max_consecutive_days():
+    schedule = _schedule([MaxConsecutiveDays(2)])
+    schedule.place(0, 0, 0)
+    schedule.place(0, 1, 0)
+    assert not schedule.can_place(0, 2, 0)
+    assert schedule.can_place(0, 3, 0)
+    schedule.place(0, 3, 0)
+    assert not schedule.can_place(0, 2, 1) # Would join both runs into four days
+
+
+def test_staffing_and_skill_violations():
+    schedule = _schedule([MinStaffing(2, shifts=["Early"], days=["Mon"]),
+                          RequiredSkill("first aid", ["Cid"], shifts=["Late"], days=["Tue"])])
+    compiled = schedule.constraints
+    assert sorted(compiled.violations()) == [(0, 0, "understaffed"), (1, 1, "missing_skill")]
+
+    # With one seat left on Tue Late, only the skill holder may take it
+    schedule.place(0, 1, 1)
+    assert not schedule.can_place(1, 1, 1)
+    assert schedule.can_place(2, 1, 1)
+    schedule.place(2, 1, 1)
+    schedule.place(0, 0, 0)
+    assert compiled.shortfall(0, 0) == 1
+    schedule.place(1, 0, 0)
+    assert compiled.violations() == []
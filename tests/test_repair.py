@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+from engine import UNASSIGNED, Roster, generate_schedule
+from repair import ScheduleRepairer
+from schedule_config import DAYS, SHIFTS
+
+MAX_PER_SHIFT = 3
+MAX_WORKDAYS = 5
+
+
+def _repairer(num_employees=40, seed=0):
+    prefs = np.random.default_rng(seed).integers(1, 4, size=(num_employees, len(DAYS), len(SHIFTS)), dtype=np.int8)
+    roster = Roster([f"P{i}" for i in range(num_employees)], prefs)
+    return ScheduleRepairer(generate_schedule(roster, MAX_PER_SHIFT, MAX_WORKDAYS, rng=random.Random(seed)))
+
+
+def _check_invariants(schedule):
+    assigned = schedule.assigned_shift
+    for d in range(len(DAYS)):
+        for s in range(len(SHIFTS)):
+            slot = schedule.slots[d][s]
+            assert len(slot) <= MAX_PER_SHIFT
+            # slots and assigned_shift agree, so nobody works two shifts on one day
+            assert sorted(slot) == np.flatnonzero(assigned[:, d] == s).tolist()
+    workdays = (assigned != UNASSIGNED).sum(axis=1)
+    assert (workdays <= MAX_WORKDAYS).all()
+    assert np.array_equal(schedule.index.workdays[:len(workdays)], workdays)
+    assert not (assigned[~schedule.roster.active] != UNASSIGNED).any()
+
+
+def _unchanged_except(before, after, touched):
+    others = np.setdiff1d(np.arange(len(before)), list(touched))
+    return np.array_equal(before[others], after[others])
+
+
+def test_remove_employee_frees_and_refills_only_their_slots():
+    repairer = _repairer()
+    schedule = repairer.schedule
+    before = schedule.assigned_shift.copy()
+    e = int(np.flatnonzero((before != UNASSIGNED).any(axis=1))[0])
+
+    touched = repairer.remove_employee(e)
+    _check_invariants(schedule)
+    assert (schedule.assigned_shift[e] == UNASSIGNED).all()
+    assert f"P{e}" not in schedule.roster.index_of
+    assert _unchanged_except(before, schedule.assigned_shift[:len(before)], touched)
+
+
+def test_add_employee_keeps_invariants():
+    repairer = _repairer()
+    schedule = repairer.schedule
+    before = schedule.assigned_shift.copy()
+
+    touched = repairer.add_employee("New", np.ones((len(DAYS), len(SHIFTS)), dtype=np.int8))
+    _check_invariants(schedule)
+    e = schedule.roster.index_of["New"]
+    assert e in touched and (schedule.assigned_shift[e] != UNASSIGNED).any()
+    assert _unchanged_except(before, schedule.assigned_shift[:len(before)], touched)
+
+
+def test_update_preferences_keeps_the_index():
+    repairer = _repairer()
+    schedule = repairer.schedule
+    e = schedule.roster.index_of["P3"]
+    size = len(schedule.roster)
+    prefs = np.full((len(DAYS), len(SHIFTS)), 3, dtype=np.int8)
+    prefs[:, 0] = 1
+
+    repairer.update_preferences(e, prefs)
+    _check_invariants(schedule)
+    assert schedule.roster.index_of["P3"] == e and len(schedule.roster) == size
+    assert np.array_equal(schedule.roster.prefs[e], prefs)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_random_edits_keep_invariants(seed):
+    repairer = _repairer(seed=seed)
+    schedule = repairer.schedule
+    rng = random.Random(seed)
+    for step in range(60):
+        active = schedule.roster.active_indices()
+        action = rng.choice(["remove", "add", "update"])
+        if action == "remove" and len(active) > 5:
+            repairer.remove_employee(rng.choice(active))
+        elif action == "add":
+            repairer.add_employee(f"N{step}", np.array([[rng.randint(1, 3) for _ in SHIFTS] for _ in DAYS], dtype=np.int8))
+        else:
+            repairer.update_preferences(rng.choice(active),
+                                        np.array([[rng.randint(1, 3) for _ in SHIFTS] for _ in DAYS], dtype=np.int8))
+        _check_invariants(schedule)
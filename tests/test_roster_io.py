@@ -0,0 +1,13 @@
+from roster_io import DEFAULT_PRIORITY, import_records
+from schedule_config import DAYS, SHIFTS
+
+
+def test_null_and_missing_preferences_default_like_blank_ones():
+    result = import_records([{"name": "Ann", "preferences": {DAYS[0]: {SHIFTS[0]: None, SHIFTS[1]: 2}}}])
+
+    assert result.error_count == 0
+    (name, prefs), = result.employees
+    assert name == "Ann"
+    assert prefs[DAYS[0]][SHIFTS[0]] == DEFAULT_PRIORITY
+    assert prefs[DAYS[0]][SHIFTS[1]] == "2"
+    assert prefs[DAYS[1]][SHIFTS[0]] == DEFAULT_PRIORITY
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+
+from constraints import ConstraintSet, Unavailable
+from engine import Roster
+from repair import ScheduleRepairer
+from schedule_cache import ScheduleCache, schedule_key
+from schedule_config import DAYS, SHIFTS
+
+
+def _roster(num_employees=20, seed=0):
+    prefs = np.random.default_rng(seed).integers(1, 4, size=(num_employees, len(DAYS), len(SHIFTS)), dtype=np.int8)
+    return Roster([f"P{i}" for i in range(num_employees)], prefs)
+
+
+def test_key_is_stable_for_equal_inputs():
+    key = schedule_key(_roster(), "greedy", 2, 5, seed=1)
+    assert schedule_key(_roster(), "greedy", 2, 5, seed=1) == key
+
+    # Removed employees do not count; the remaining roster is what gets scheduled
+    with_removal = _roster(21)
+    with_removal.remove(20)
+    assert schedule_key(with_removal, "greedy", 2, 5, seed=1) == key
+
+
+@pytest.mark.parametrize("change", [
+    lambda: (_roster(seed=1), "greedy", 2, 5, 1, None),
+    lambda: (_roster(), "optimal", 2, 5, 1, None),
+    lambda: (_roster(), "greedy", 3, 5, 1, None),
+    lambda: (_roster(), "greedy", 2, 4, 1, None),
+    lambda: (_roster(), "greedy", 2, 5, 2, None),
+    lambda: (_roster(), "greedy", 2, 5, 1, ConstraintSet([Unavailable("P0", DAYS[0])])),
+])
+def test_key_changes_with_any_input(change):
+    assert schedule_key(*change()) != schedule_key(_roster(), "greedy", 2, 5, 1, None)
+
+
+@pytest.mark.parametrize("disk", [False, True])
+def test_repairing_a_returned_schedule_leaves_the_cache_entry_alone(tmp_path, disk):
+    cache = ScheduleCache(disk_dir=str(tmp_path) if disk else None)
+    first = cache.solve(_roster(), "greedy", 2, 5, seed=1)
+    original = first.assigned_shift.copy()
+    key = schedule_key(_roster(), "greedy", 2, 5, seed=1)
+    payload = json.dumps(cache.get(key))
+
+    ScheduleRepairer(first).remove_employee(int(np.flatnonzero((original >= 0).any(axis=1))[0]))
+    hit = cache.solve(_roster(), "greedy", 2, 5, seed=1)
+    assert hit is not first
+    assert np.array_equal(hit.assigned_shift, original)
+
+    repairer = ScheduleRepairer(hit)
+    repairer.add_employee("New", np.ones((len(DAYS), len(SHIFTS)), dtype=np.int8))
+    repairer.remove_employee(0)
+    again = cache.solve(_roster(), "greedy", 2, 5, seed=1)
+    assert np.array_equal(again.assigned_shift, original)
+    assert json.dumps(cache.get(key)) == payload
+    if disk:
+        cache.clear()
+        from_disk = cache.solve(_roster(), "greedy", 2, 5, seed=1)
+        assert np.array_equal(from_disk.assigned_shift, original)
+        assert cache.stats()["disk_hits"] >= 1
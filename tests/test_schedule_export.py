@@ -0,0 +1,50 @@
+import csv
+import random
+from collections import Counter
+
+import numpy as np
+
+from engine import Roster
+from horizon import generate_horizon
+from schedule_config import DAYS, SHIFTS
+from schedule_export import ScheduleSnapshot, _index_dtype, export_schedule
+
+
+def _roster(num_employees=20):
+    rng = np.random.default_rng(1)
+    prefs = rng.integers(1, 4, size=(num_employees, len(DAYS), len(SHIFTS)), dtype=np.int8)
+    return Roster([f"P{i}" for i in range(num_employees)], prefs)
+
+
+def test_snapshot_keeps_day_indices_of_long_horizons():
+    weeks = 20 # 140 days, more than int8 can index
+    horizon = generate_horizon(_roster(), weeks * len(DAYS), rng=random.Random(1))
+    snapshot = ScheduleSnapshot(horizon)
+
+    assignments = np.array(list(horizon.assignments())).reshape(-1, 3)
+    assert snapshot.day.max() == weeks * len(DAYS) - 1
+    assert np.array_equal(snapshot.day, assignments[:, 1])
+    assert np.array_equal(snapshot.shift, assignments[:, 2])
+    assert np.array_equal(snapshot.priority, horizon.roster.prefs[assignments[:, 0], assignments[:, 1],
+                                                                  assignments[:, 2]])
+
+
+def test_long_csv_export_of_long_horizon(tmp_path):
+    weeks = 20
+    horizon = generate_horizon(_roster(), weeks * len(DAYS), rng=random.Random(1))
+    path = tmp_path / "horizon.csv"
+    _, rows = export_schedule(ScheduleSnapshot(horizon), str(path), "long csv")
+
+    with open(path, newline="", encoding="utf-8") as file:
+        days = Counter(row[1] for row in list(csv.reader(file))[1:])
+    assert sum(days.values()) == rows
+    assert f"Week {weeks} {DAYS[-1]}" in days
+    expected = Counter({label: sum(map(len, shifts.values())) for label, shifts in horizon.to_dict().items()})
+    assert days == +expected # Every day keeps all its rows under its own label
+
+
+def test_index_dtype_holds_every_index():
+    for count in (1, 127, 128, 129, 32768, 32769, 100000):
+        assert np.iinfo(_index_dtype(count)).max >= count - 1
+    assert _index_dtype(128) == np.int8
+    assert _index_dtype(129) == np.int16
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+import pytest
+
+from service import RequestError, ScheduleService, _parse_request
+
+
+async def _raw_request(request):
+    """Sends raw request bytes to a fresh service on a free port and returns the status line and body."""
+    service = ScheduleService(port=0, max_workers=1)
+    port = await service.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout=10)
+        writer.close()
+    finally:
+        await service.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head.split(b"\r\n", 1)[0].decode("latin-1"), json.loads(body)
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1.5"])
+def test_invalid_content_length_is_answered_with_400(length):
+    request = f"POST /schedule HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode("latin-1")
+    status, body = asyncio.run(_raw_request(request))
+    assert status.startswith("HTTP/1.1 400")
+    assert "Content-Length" in body["error"]
+
+
+@pytest.mark.parametrize("field", ["max_employees_per_shift", "max_workdays_per_week", "seed"])
+@pytest.mark.parametrize("value", [True, False])
+def test_booleans_are_not_accepted_as_integers(field, value):
+    with pytest.raises(RequestError) as error:
+        _parse_request(json.dumps({"employees": [], field: value}))
+    assert error.value.status == 400
+    assert field in str(error.value)
+
+
+def _employee(name):
+    return {"name": name, "preferences": {}}
+
+
+@pytest.mark.parametrize("constraint", [
+    {"rule": "min_staffing", "minimum": "2"},
+    {"rule": "unavailable", "name": "Anm", "day": "Monday"},
+])
+def test_invalid_constraints_are_answered_with_400(constraint):
+    body = json.dumps({"employees": [_employee("Ann"), _employee("Bob")], "constraints": [constraint]})
+    with pytest.raises(RequestError) as error:
+        _parse_request(body)
+    assert error.value.status == 400
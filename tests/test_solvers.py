@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from constraints import ConstraintSet, Unavailable
+from engine import UNASSIGNED, Roster
+from solvers import optimal_schedule
+
+DAYS = ["Mon", "Tue", "Wed"]
+SHIFTS = ["Early", "Late"]
+
+
+def _brute_force(prefs, max_per_shift, max_workdays, blocked=()):
+    """Returns (filled slots, cost) of the best assignment: most slots filled, then lowest priority sum."""
+    num_employees, num_days, num_shifts = prefs.shape
+    best = (0, 0)
+    choices = [UNASSIGNED] + list(range(num_shifts))
+    for assignment in itertools.product(choices, repeat=num_employees * num_days):
+        shifts = np.array(assignment).reshape(num_employees, num_days)
+        if ((shifts >= 0).sum(axis=1) > max_workdays).any():
+            continue
+        if any((shifts[:, d] == s).sum() > max_per_shift for d in range(num_days) for s in range(num_shifts)):
+            continue
+        if any(shifts[e, d] == s for e, d, s in blocked):
+            continue
+        e, d = np.nonzero(shifts >= 0)
+        filled, cost = len(e), int(prefs[e, d, shifts[e, d]].sum())
+        if filled > best[0] or (filled == best[0] and cost < best[1]):
+            best = (filled, cost)
+    return best
+
+
+def _result(schedule):
+    assigned = schedule.assigned_shift
+    e, d = np.nonzero(assigned >= 0)
+    return len(e), int(schedule.roster.prefs[e, d, assigned[e, d]].sum())
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("max_per_shift, max_workdays", [(1, 1), (1, 2), (2, 2)])
+def test_optimal_schedule_matches_brute_force(seed, max_per_shift, max_workdays):
+    prefs = np.random.default_rng(seed).integers(1, 4, size=(3, len(DAYS), len(SHIFTS)), dtype=np.int8)
+    roster = Roster(["A", "B", "C"], prefs, DAYS, SHIFTS)
+
+    schedule = optimal_schedule(roster, max_per_shift, max_workdays)
+    assert _result(schedule) == _brute_force(prefs, max_per_shift, max_workdays)
+    assert schedule.preference_cost() == _result(schedule)[1]
+
+
+def test_optimal_schedule_respects_unavailability():
+    prefs = np.ones((3, len(DAYS), len(SHIFTS)), dtype=np.int8)
+    prefs[0] = 3
+    prefs[0, 0, 0] = 1 # A strongly wants the slot they are unavailable for
+    roster = Roster(["A", "B", "C"], prefs, DAYS, SHIFTS)
+    constraints = ConstraintSet([Unavailable("A", "Mon", "Early"), Unavailable("B", "Tue")])
+
+    schedule = optimal_schedule(roster, 1, 2, constraints=constraints)
+    assert schedule.assigned_shift[0, 0] != 0
+    assert schedule.assigned_shift[1, 1] == UNASSIGNED
+    blocked = [(0, 0, 0), (1, 1, 0), (1, 1, 1)]
+    assert _result(schedule) == _brute_force(prefs, 1, 2, blocked)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from schedule_config import DAYS, PRIORITY_LEVELS, SHIFTS
+from storage import ScheduleStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScheduleStore(str(tmp_path / "scheduler.db"))
+    yield store
+    store.close()
+
+
+def _prefs(level):
+    return np.full((len(DAYS), len(SHIFTS)), level, dtype=np.int8)
+
+
+def test_employee_versions_use_the_gui_priority_levels(store):
+    store.save_employees([("Ann", _prefs(1))])
+    store.save_employees([("Ann", _prefs(3))])
+
+    versions = store.employee_versions("ann")
+    assert [prefs[DAYS[0]][SHIFTS[0]] for _, prefs in versions] == ["3", "1"]
+    assert all(level in PRIORITY_LEVELS for _, prefs in versions for shifts in prefs.values()
+               for level in shifts.values())
+
+
+def test_saved_version_round_trips_through_the_preference_grid(store):
+    tkinter = pytest.importorskip("tkinter")
+    from preference_grid import PreferenceGrid
+
+    try:
+        root = tkinter.Tk()
+    except tkinter.TclError:
+        pytest.skip("No display available")
+    try:
+        prefs = _prefs(1)
+        prefs[2, 1] = 2
+        store.save_employees([("Ann", prefs)])
+        _, saved = store.employee_versions("Ann")[0]
+
+        grid = PreferenceGrid(root, DAYS, SHIFTS, PRIORITY_LEVELS)
+        grid.set(saved)
+        assert grid.get() == saved
+    finally:
+        root.destroy()
+
+
+def test_reset_can_be_restored(store):
+    store.save_employees([("Ann", _prefs(1)), ("Bob", _prefs(2))])
+    snapshot_id = store.remove_all_employees()
+    store.save_employees([("ann", _prefs(3))]) # A new employee with the same name
+
+    assert len(store.employee_versions("Ann")) == 1
+    roster = store.restore_roster(snapshot_id)
+    assert roster.names == ["Ann", "Bob"]
+    assert roster.prefs[:, 0, 0].tolist() == [1, 2]